@@ -1,15 +1,19 @@
 import os
+import io
 import csv
 import re
 import html
 import logging
 import qrcode
 import json  # Import for safer JSON handling
+import multiprocessing
+import tempfile
+import zipfile
+from xml.sax.saxutils import escape as xml_escape
+from concurrent.futures import ProcessPoolExecutor
 from flask import Flask, request, jsonify, send_file, render_template
 from werkzeug.utils import secure_filename
 from docx import Document
-from docx.shared import Pt
-from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.shared import Inches
 from PIL import Image
 from reportlab.pdfgen import canvas
@@ -33,6 +37,9 @@ os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(DOC_FOLDER, exist_ok=True)
 os.makedirs(QR_FOLDER, exist_ok=True)
 
+# Worker processes for parsing several uploaded CSVs at once
+INGEST_WORKERS = int(os.environ.get("LABEL_INGEST_WORKERS") or min(os.cpu_count() or 1, 8))
+
 def load_label_dimensions(json_path):
     """
     Load and process label dimensions from a JSON file.
@@ -310,11 +317,104 @@ def draw_label(c, x, y, sku, name, price, label_width, label_height, config):
     )
 
 
+def parse_uploaded_csv(upload_path, filename):
+    """
+    Parse one saved CSV upload into a per-SKU aggregate.
+
+    Returns (aggregated_content, total_labels, invalid_files) for this file only;
+    rows read before a fatal error are kept, as in sequential processing.
+    Module-level so it can run in a worker process.
+    """
+    aggregated_content = {}
+    total_labels = 0
+    invalid_files = []
+
+    try:
+        with open(upload_path, 'r') as csv_file:
+            reader = csv.reader(csv_file)
+            header = next(reader, None)
+
+            if not header:
+                invalid_files.append({"file": filename, "reason": "Empty or invalid file"})
+                return aggregated_content, total_labels, invalid_files
+
+            # Convert header to a mapping of column names to indices
+            header_map = {col.strip(): idx for idx, col in enumerate(header)}
+
+            if {'product', 'sku', 'quantity', 'display_price'}.issubset(header_map):
+                # Process File Type 1
+                for row in reader:
+                    try:
+                        sku = row[header_map['sku']]
+                        product = sanitize_text(row[header_map['product']])
+                        display_price = "{:.2f}".format(float(row[header_map['display_price']]))
+                        quantity = int(row[header_map['quantity']])
+
+                        if sku not in aggregated_content:
+                            aggregated_content[sku] = {
+                                "sku": sku,
+                                "product": product,
+                                "display_price": display_price,
+                                "quantity": 0
+                            }
+                        aggregated_content[sku]["quantity"] += quantity
+                        total_labels += quantity
+
+                    except ValueError as e:
+                        invalid_files.append({"file": filename, "reason": f"Invalid quantity value in row: {row}"})
+
+
+            elif {'name', 'sku', 'retail_price'}.issubset(header_map):
+                # Process File Type 2
+                inventory_columns = [col for col in header if re.match(r'^inventory_.*', col)]
+                if not inventory_columns:
+                    invalid_files.append({"file": filename, "reason": "Missing inventory_* columns"})
+                    return aggregated_content, total_labels, invalid_files
+
+                for row in reader:
+                    try:
+                        sku = row[header_map['sku']]
+                        # Build product name from name and variant columns (if they exist)
+                        name_parts = [row[header_map['name']]]
+                        for variant_col in ['variant_option_one_value', 'variant_option_two_value', 'variant_option_three_value']:
+                            if variant_col in header_map:
+                                col_idx = header_map[variant_col]
+                                if col_idx < len(row) and row[col_idx]:
+                                    name_parts.append(row[col_idx])
+                        product_name = sanitize_text(" ".join(name_parts).strip())
+                        display_price = "{:.2f}".format(float(row[header_map['retail_price']]))
+                        quantity = sum(
+                            int(row[header_map[col]]) for col in inventory_columns if row[header_map[col]].isdigit()
+                        )
+
+                        if sku not in aggregated_content:
+                            aggregated_content[sku] = {
+                                "sku": sku,
+                                "product": product_name,
+                                "display_price": display_price,
+                                "quantity": 0
+                            }
+                        aggregated_content[sku]["quantity"] += quantity
+                        total_labels += quantity
+
+                    except ValueError as e:
+                        invalid_files.append({"file": filename, "reason": f"Invalid inventory value in row: {row}"})
+
+
+    except Exception as e:
+        invalid_files.append({"file": filename, "reason": f"Error reading file: {str(e)}"})
+
+    return aggregated_content, total_labels, invalid_files
+
+
 @app.route('/upload', methods=['POST'])
 def upload_and_process():
     """
     Handle file upload, validate, and preprocess data for label generation.
 
+    Several files are parsed concurrently in a process pool; per-file results are
+    merged in upload order, so the outcome matches parsing them one by one.
+
     Returns:
         Response: Rendered preview page or validation error messages.
     """
@@ -327,94 +427,54 @@ def upload_and_process():
     valid_files = []
     aggregated_content = {}  # Dictionary to aggregate content by SKU
     total_labels=0
+
+    # Save uploads first; rejected files keep their place in upload order
+    results = []
+    uploads = []
     for file in files:
         if not file.filename.endswith('.csv'):
-            invalid_files.append({"file": file.filename, "reason": "Not a CSV file"})
+            results.append((None, {"file": file.filename, "reason": "Not a CSV file"}))
             continue
 
         # Sanitize filename to prevent path traversal attacks
         safe_filename = secure_filename(file.filename)
         if not safe_filename:
-            invalid_files.append({"file": file.filename, "reason": "Invalid filename"})
+            results.append((None, {"file": file.filename, "reason": "Invalid filename"}))
             continue
 
-        upload_path = os.path.join(UPLOAD_FOLDER, safe_filename)
-        file.save(upload_path)
+        # Every upload gets its own file, so uploads sharing a name are parsed separately;
+        # the original name is only used in error reports
+        fd, upload_path = tempfile.mkstemp(dir=UPLOAD_FOLDER, suffix=".csv")
+        with os.fdopen(fd, "wb") as upload_file:
+            file.save(upload_file)
+        results.append((len(uploads), None))
+        uploads.append((upload_path, file.filename))
 
-        try:
-            with open(upload_path, 'r') as csv_file:
-                reader = csv.reader(csv_file)
-                header = next(reader, None)
-
-                if not header:
-                    invalid_files.append({"file": file.filename, "reason": "Empty or invalid file"})
-                    continue
-
-                # Convert header to a mapping of column names to indices
-                header_map = {col.strip(): idx for idx, col in enumerate(header)}
-
-                if {'product', 'sku', 'quantity', 'display_price'}.issubset(header_map):
-                    # Process File Type 1
-                    for row in reader:
-                        try:
-                            sku = row[header_map['sku']]
-                            product = sanitize_text(row[header_map['product']])
-                            display_price = "{:.2f}".format(float(row[header_map['display_price']]))
-                            quantity = int(row[header_map['quantity']])
-
-                            if sku not in aggregated_content:
-                                aggregated_content[sku] = {
-                                    "sku": sku,
-                                    "product": product,
-                                    "display_price": display_price,
-                                    "quantity": 0
-                                }
-                            aggregated_content[sku]["quantity"] += quantity
-                            total_labels += quantity
-
-                        except ValueError as e:
-                            invalid_files.append({"file": file.filename, "reason": f"Invalid quantity value in row: {row}"})
-
-
-                elif {'name', 'sku', 'retail_price'}.issubset(header_map):
-                    # Process File Type 2
-                    inventory_columns = [col for col in header if re.match(r'^inventory_.*', col)]
-                    if not inventory_columns:
-                        invalid_files.append({"file": file.filename, "reason": "Missing inventory_* columns"})
-                        continue
-
-                    for row in reader:
-                        try:
-                            sku = row[header_map['sku']]
-                            # Build product name from name and variant columns (if they exist)
-                            name_parts = [row[header_map['name']]]
-                            for variant_col in ['variant_option_one_value', 'variant_option_two_value', 'variant_option_three_value']:
-                                if variant_col in header_map:
-                                    col_idx = header_map[variant_col]
-                                    if col_idx < len(row) and row[col_idx]:
-                                        name_parts.append(row[col_idx])
-                            product_name = sanitize_text(" ".join(name_parts).strip())
-                            display_price = "{:.2f}".format(float(row[header_map['retail_price']]))
-                            quantity = sum(
-                                int(row[header_map[col]]) for col in inventory_columns if row[header_map[col]].isdigit()
-                            )
-
-                            if sku not in aggregated_content:
-                                aggregated_content[sku] = {
-                                    "sku": sku,
-                                    "product": product_name,
-                                    "display_price": display_price,
-                                    "quantity": 0
-                                }
-                            aggregated_content[sku]["quantity"] += quantity
-                            total_labels += quantity
-                            
-                        except ValueError as e:
-                            invalid_files.append({"file": file.filename, "reason": f"Invalid inventory value in row: {row}"})
-
-
-        except Exception as e:
-            invalid_files.append({"file": file.filename, "reason": f"Error reading file: {str(e)}"})
+    try:
+        if len(uploads) > 1 and INGEST_WORKERS > 1:
+            with ProcessPoolExecutor(max_workers=min(INGEST_WORKERS, len(uploads)),
+                                     mp_context=multiprocessing.get_context("spawn")) as pool:
+                parsed = list(pool.map(parse_uploaded_csv, *zip(*uploads)))
+        else:
+            parsed = [parse_uploaded_csv(upload_path, filename) for upload_path, filename in uploads]
+    finally:
+        for upload_path, _filename in uploads:
+            os.remove(upload_path)
+
+    # Merge in upload order: first occurrence of a SKU keeps its product and price
+    for index, rejected in results:
+        if rejected:
+            invalid_files.append(rejected)
+            continue
+
+        file_content, file_labels, file_invalid = parsed[index]
+        for sku, item in file_content.items():
+            if sku in aggregated_content:
+                aggregated_content[sku]["quantity"] += item["quantity"]
+            else:
+                aggregated_content[sku] = item
+        total_labels += file_labels
+        invalid_files.extend(file_invalid)
 
     if invalid_files:
         return jsonify({"message": "Some files failed validation", "invalid_files": invalid_files, "valid_files": valid_files}), 400
@@ -467,10 +527,90 @@ def generate_labels():
     except Exception as e:
         return jsonify({"message": "Error generating labels", "error": str(e)}), 500
 
+# Picture size on a Word label, as a fraction of the label's width and height
+WORD_QR_SCALE = 0.4
+
+# Package parts of python-docx's default document, loaded once per process
+_docx_template = None
+
+
+def _get_docx_template():
+    """
+    Return the parts of python-docx's default document (styles, theme, settings...)
+    as {part name: bytes}. create_labels_word copies them into every file so the
+    output looks the same as a document built with python-docx.
+    """
+    global _docx_template
+    if _docx_template is None:
+        buffer = io.BytesIO()
+        Document().save(buffer)
+        with zipfile.ZipFile(buffer) as package:
+            _docx_template = {name: package.read(name) for name in package.namelist()}
+    return _docx_template
+
+
+def _docx_text(text):
+    """Run content for text: tabs and line breaks become <w:tab/> and <w:br/>, as python-docx's add_run writes them"""
+    # Characters XML 1.0 does not allow are dropped
+    text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]', '', text)
+    parts = []
+    for line_index, line in enumerate(text.replace("\r\n", "\n").replace("\r", "\n").split("\n")):
+        if line_index:
+            parts.append("<w:br/>")
+        for tab_index, chunk in enumerate(line.split("\t")):
+            if tab_index:
+                parts.append("<w:tab/>")
+            if chunk:
+                preserve = ' xml:space="preserve"' if chunk != chunk.strip() else ''
+                parts.append(f"<w:t{preserve}>{xml_escape(chunk)}</w:t>")
+    return "".join(parts)
+
+
+def _docx_paragraph(text, bold=False):
+    """A centered paragraph with one 8pt run"""
+    bold_xml = "<w:b/>" if bold else '<w:b w:val="0"/>'
+    return (f'<w:p><w:pPr><w:jc w:val="center"/></w:pPr><w:r><w:rPr>{bold_xml}<w:sz w:val="16"/></w:rPr>'
+            f'{_docx_text(text)}</w:r></w:p>')
+
+
+def _docx_picture(rel_id, picture_id, name, cx, cy):
+    """A centered paragraph with an inline picture of the image part rel_id, sized cx x cy EMU"""
+    name = xml_escape(name, {'"': "&quot;"})
+    return (
+        '<w:p><w:pPr><w:jc w:val="center"/></w:pPr><w:r><w:drawing>'
+        '<wp:inline xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+        'xmlns:pic="http://schemas.openxmlformats.org/drawingml/2006/picture">'
+        f'<wp:extent cx="{cx}" cy="{cy}"/><wp:docPr id="{picture_id}" name="Picture {picture_id}"/>'
+        '<wp:cNvGraphicFramePr><a:graphicFrameLocks noChangeAspect="1"/></wp:cNvGraphicFramePr>'
+        '<a:graphic><a:graphicData uri="http://schemas.openxmlformats.org/drawingml/2006/picture"><pic:pic>'
+        f'<pic:nvPicPr><pic:cNvPr id="0" name="{name}"/><pic:cNvPicPr/></pic:nvPicPr>'
+        f'<pic:blipFill><a:blip r:embed="{rel_id}"/><a:stretch><a:fillRect/></a:stretch></pic:blipFill>'
+        f'<pic:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+        '<a:prstGeom prst="rect"/></pic:spPr></pic:pic></a:graphicData></a:graphic></wp:inline></w:drawing></w:r></w:p>'
+    )
+
+
+def _get_word_qr(sku):
+    """Path of the QR code PNG for a SKU, generated on first use"""
+    qr_path = os.path.join(QR_FOLDER, f"{sku}.png")
+    if not os.path.exists(qr_path):
+        qr = qrcode.QRCode(box_size=10, border=1)
+        qr.add_data(sku)
+        qr.make(fit=True)
+        qr_img = qr.make_image(fill="black", back_color="white")
+        qr_img.save(qr_path)
+    return qr_path
+
+
 def create_labels_word(file_code, labels_data, label_type, config):
     """
     Generate a Word document with labels based on the specified label type and product data.
 
+    The document XML is written straight into the .docx package: one table per
+    page, generated in a single pass and streamed into the zip, with each SKU's
+    QR code stored once as an image part and referenced by relationship id.
+    Styles and settings come from python-docx's default document.
+
     Args:
         file_code (str): Identifier for the file.
         labels_data (list): List of product details for the labels.
@@ -481,9 +621,6 @@ def create_labels_word(file_code, labels_data, label_type, config):
         str: Path to the generated Word file.
     """
     try:
-        # Create a new Word document
-        doc = Document()
-
         # Extract label configuration
         labels_per_row = config["labels_per_row"]
         labels_per_column = config["labels_per_column"]
@@ -493,89 +630,110 @@ def create_labels_word(file_code, labels_data, label_type, config):
         page_height_inch = config["page_height_inch"]
         margin_top_inch = config["margin_top"]
         margin_left_inch = config["margin_left"]
+        labels_per_page = labels_per_row * labels_per_column
 
-        # Adjust page margins
-        section = doc.sections[0]
-        section.page_width = Inches(page_width_inch)
-        section.page_height = Inches(page_height_inch)
-        section.top_margin = Inches(margin_top_inch)
-        section.bottom_margin = Inches(margin_top_inch)
-        section.left_margin = Inches(margin_left_inch)
-        section.right_margin = Inches(margin_left_inch)
+        template = _get_docx_template()
+        document_head = template["word/document.xml"].split(b"<w:body>")[0] + b"<w:body>"
+        rels = template["word/_rels/document.xml.rels"].decode("utf-8")
+        next_rel = max(int(rel_id) for rel_id in re.findall(r'Id="rId(\d+)"', rels)) + 1
 
-        # Create a table to hold labels
-        table = doc.add_table(rows=labels_per_column, cols=labels_per_row)
-        table.allow_autofit = False
-
-        # Set column widths
-        for col in table.columns:
-            col.width = Inches(label_width_inch)
-
-        # Add labels to the table
-        label_count = 0
+        # One image part per SKU, shared by all of its labels
+        images = {}
         for item in labels_data:
-            sku = item["sku"]
-            product = item["product"]
-            price = item["display_price"]
-            quantity = item["quantity"]
-
-            for _ in range(quantity):
-                row_index = label_count // labels_per_row
-                col_index = label_count % labels_per_row
-
-                # Start a new page if needed
-                if label_count > 0 and label_count % (labels_per_row * labels_per_column) == 0:
-                    doc.add_page_break()
-                    table = doc.add_table(rows=labels_per_column, cols=labels_per_row)
-                    table.allow_autofit = False
-                    for col in table.columns:
-                        col.width = Inches(label_width_inch)
-
-                # Get the cell for the current label
-                cell = table.cell(row_index, col_index)
-
-                # Add QR code
-                qr_path = os.path.join("qr_codes", f"{sku}.png")
-                if not os.path.exists(qr_path):
-                    qr = qrcode.QRCode(box_size=10, border=1)
-                    qr.add_data(sku)
-                    qr.make(fit=True)
-                    qr_img = qr.make_image(fill="black", back_color="white")
-                    qr_img.save(qr_path)
-
-                qr_paragraph = cell.add_paragraph()
-                qr_paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                qr_paragraph.add_run().add_picture(qr_path, width=Inches(label_width_inch * 0.4), height=Inches(label_height_inch * 0.4))
-
-                # Add SKU
-                sku_paragraph = cell.add_paragraph()
-                sku_paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                sku_run = sku_paragraph.add_run(f"SKU: {sku}")
-                sku_run.bold = True
-                sku_run.font.size = Pt(8)
-
-                # Add product name
-                product_paragraph = cell.add_paragraph()
-                product_paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                product_run = product_paragraph.add_run(product)
-                product_run.font.size = Pt(8)
-
-                # Add price
-                price_paragraph = cell.add_paragraph()
-                price_paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                price_run = price_paragraph.add_run(f"Price: ${float(price):.2f}")
-                price_run.bold = True
-                price_run.font.size = Pt(8)
+            if item["sku"] not in images:
+                images[item["sku"]] = (f"rId{next_rel + len(images)}", f"media/image{len(images) + 1}.png")
+
+        column_width = Inches(label_width_inch).twips
+        qr_cx = Inches(label_width_inch * WORD_QR_SCALE)
+        qr_cy = Inches(label_height_inch * WORD_QR_SCALE)
+        empty_cell = f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{column_width}"/></w:tcPr><w:p/></w:tc>'
+        table_head = (
+            '<w:tbl><w:tblPr><w:tblW w:type="auto" w:w="0"/><w:tblLayout w:type="fixed"/>'
+            '<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" w:lastRow="0" w:noHBand="0" '
+            'w:noVBand="1" w:val="04A0"/></w:tblPr><w:tblGrid>'
+            + f'<w:gridCol w:w="{column_width}"/>' * labels_per_row + '</w:tblGrid>'
+        )
 
-                label_count += 1
+        def label_cell(sku, product, price, picture_id):
+            rel_id, _target = images[sku]
+            return (
+                f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{column_width}"/></w:tcPr><w:p/>'
+                + _docx_picture(rel_id, picture_id, f"{sku}.png", qr_cx, qr_cy)
+                + _docx_paragraph(f"SKU: {sku}", bold=True)
+                + _docx_paragraph(str(product))
+                + _docx_paragraph(f"Price: ${float(price):.2f}", bold=True)
+                + '</w:tc>'
+            )
+
+        def page_table(cells):
+            cells += [empty_cell] * (labels_per_page - len(cells))
+            rows = (
+                '<w:tr>' + "".join(cells[row:row + labels_per_row]) + '</w:tr>'
+                for row in range(0, labels_per_page, labels_per_row)
+            )
+            return table_head + "".join(rows) + '</w:tbl>'
 
         # Ensure the directory exists
         word_folder = os.path.join(os.getcwd(), "word_ready_files")
         os.makedirs(word_folder, exist_ok=True)
-
-        # Save the Word file
         word_path = os.path.join(word_folder, f"Labels_{file_code}_{label_type}.docx")
-        doc.save(word_path)
+
+        content_types = template["[Content_Types].xml"].decode("utf-8")
+        if 'Extension="png"' not in content_types:
+            content_types = content_types.replace(
+                '<Default Extension="rels"', '<Default Extension="png" ContentType="image/png"/><Default Extension="rels"')
+
+        with zipfile.ZipFile(word_path, "w", zipfile.ZIP_DEFLATED) as package:
+            package.writestr("[Content_Types].xml", content_types)
+            for name, data in template.items():
+                if name not in ("[Content_Types].xml", "word/document.xml", "word/_rels/document.xml.rels"):
+                    package.writestr(name, data)
+
+            for sku, (_rel_id, target) in images.items():
+                with open(_get_word_qr(sku), "rb") as qr_file:
+                    package.writestr(f"word/{target}", qr_file.read())
+
+            # Write the body a page at a time
+            with package.open("word/document.xml", "w") as document:
+                document.write(document_head)
+                cells = []
+                pages = 0
+                for item in labels_data:
+                    sku = item["sku"]
+                    product = item["product"]
+                    price = item["display_price"]
+                    quantity = item["quantity"]
+
+                    for _ in range(quantity):
+                        cells.append(label_cell(sku, product, price, pages * labels_per_page + len(cells) + 1))
+                        if len(cells) == labels_per_page:
+                            if pages:
+                                document.write(b'<w:p><w:r><w:br w:type="page"/></w:r></w:p>')
+                            document.write(page_table(cells).encode("utf-8"))
+                            cells = []
+                            pages += 1
+
+                if cells or not pages:
+                    if pages:
+                        document.write(b'<w:p><w:r><w:br w:type="page"/></w:r></w:p>')
+                    document.write(page_table(cells).encode("utf-8"))
+
+                document.write((
+                    '<w:sectPr>'
+                    f'<w:pgSz w:w="{Inches(page_width_inch).twips}" w:h="{Inches(page_height_inch).twips}"/>'
+                    f'<w:pgMar w:top="{Inches(margin_top_inch).twips}" w:right="{Inches(margin_left_inch).twips}" '
+                    f'w:bottom="{Inches(margin_top_inch).twips}" w:left="{Inches(margin_left_inch).twips}" '
+                    'w:header="720" w:footer="720" w:gutter="0"/>'
+                    '<w:cols w:space="720"/><w:docGrid w:linePitch="360"/></w:sectPr></w:body></w:document>'
+                ).encode("utf-8"))
+
+            image_rels = "".join(
+                f'<Relationship Id="{rel_id}" '
+                f'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/image" Target="{target}"/>'
+                for rel_id, target in images.values()
+            )
+            package.writestr("word/_rels/document.xml.rels", rels.replace("</Relationships>", image_rels + "</Relationships>"))
+
         return word_path
 
     except Exception as e:
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Label Creator - NumPy barcode rasterizer check and benchmark
+
+Renders random SKUs with render_barcode for every barcode type, at full
+resolution and bi-level, and compares each image pixel for pixel with what
+qrcode's make_image and python-barcode's ImageWriter draw. Then times a cold
+render of --skus unique SKUs per barcode type both ways (PIL: stock
+qrcode and ImageWriter, as render_barcode drew them before).
+
+Usage:
+    python benchmarks/bench_barcode_raster.py                   # check 2000 SKUs, time 20k
+    python benchmarks/bench_barcode_raster.py --check-skus 20000 --skus 100000
+    python benchmarks/bench_barcode_raster.py --skip-check
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "benchmarks"))
+sys.path.insert(0, REPO_ROOT)
+
+import frappe_stub  # noqa: E402
+from bench_labels import BARCODE_TYPES  # noqa: E402
+
+frappe_stub.install(tempfile.mkdtemp(prefix="label_bench_"))
+
+import barcode  # noqa: E402
+import numpy as np  # noqa: E402
+import qrcode  # noqa: E402
+from barcode.writer import ImageWriter  # noqa: E402
+
+from label_creator.utils import barcodes  # noqa: E402
+from label_creator.utils.barcodes import LINEAR_BARCODES, QR_BORDER, barcode_data, render_barcode  # noqa: E402
+
+# Characters every symbology here can encode (Code 39 has no lower case)
+ALPHABET = string.ascii_uppercase + string.digits + "-./ $+%"
+
+
+def random_skus(count, rng):
+    """Unique SKUs from 1 to 300 characters, so QR codes span versions 1 to 10"""
+    skus = set()
+    while len(skus) < count:
+        length = rng.choice([1, 4, 8, 12, 14, 20, 26, 34, 45, 60, 90, 150, 220, 300])
+        skus.add("".join(rng.choice(ALPHABET) for _ in range(length)).strip() or "0")
+    return sorted(skus)
+
+
+def reference_barcode(sku, barcode_type, bilevel):
+    """The image as drawn before the rasterizer: qrcode's make_image, or ImageWriter's rectangles"""
+    if barcode_type in LINEAR_BARCODES and not bilevel:
+        barcode_class = barcode.get_barcode_class(LINEAR_BARCODES[barcode_type][0])
+        return barcode_class(barcode_data(sku, barcode_type), writer=ImageWriter()).render().convert("L")
+    if barcode_type in LINEAR_BARCODES:
+        # The bi-level writer's edge snapping, painted by ImageWriter one module at a time
+        barcodes.HAS_NUMPY = False
+        try:
+            return render_barcode(sku, barcode_type, bilevel=True)
+        finally:
+            barcodes.HAS_NUMPY = True
+    qr = qrcode.QRCode(box_size=barcodes.BILEVEL_QR_BOX_SIZE if bilevel else barcodes.QR_BOX_SIZE, border=QR_BORDER)
+    qr.add_data(sku)
+    qr.make(fit=True)
+    return qr.make_image(fill_color="black", back_color="white").get_image()
+
+
+def check_image(sku, barcode_type, bilevel):
+    """Problem with one rendered image, or None when it matches the reference pixel for pixel"""
+    expected = reference_barcode(sku, barcode_type, bilevel)
+    actual = render_barcode(sku, barcode_type, bilevel=bilevel)
+    if actual.mode != expected.mode or actual.size != expected.size:
+        return f"{actual.mode} {actual.size} != {expected.mode} {expected.size}"
+    if actual.tobytes() != expected.tobytes():
+        diff = np.argwhere(np.asarray(actual) != np.asarray(expected))
+        return f"{len(diff)} pixels differ, first at {tuple(diff[0][::-1])}"
+    return None
+
+
+def time_renders(skus, render):
+    """Seconds to render every SKU once"""
+    start = time.perf_counter()
+    for sku in skus:
+        render(sku)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and time the NumPy barcode rasterizer")
+    parser.add_argument("--check-skus", type=int, default=2000, help="random SKUs compared per barcode type")
+    parser.add_argument("--skus", type=int, default=20000, help="unique SKUs in the timed cold render")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-check", action="store_true")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    failures = 0
+
+    if not args.skip_check:
+        skus = random_skus(args.check_skus, rng)
+        for barcode_type in BARCODE_TYPES:
+            for bilevel in (False, True):
+                for sku in skus:
+                    problem = check_image(sku, barcode_type, bilevel)
+                    if problem:
+                        failures += 1
+                        print(f"  {barcode_type}{' bilevel' if bilevel else ''} {sku!r}: {problem}")
+        print(f"{len(skus)} SKUs checked pixel for pixel for {len(BARCODE_TYPES)} barcode types")
+
+    skus = [f"SKU-{index:08d}-{rng.randint(0, 99999):05d}" for index in range(args.skus)]
+    print(f"{'barcode type':12} {'PIL s':>8} {'NumPy s':>8} {'speedup':>8} {'NumPy ms/SKU':>13}")
+    for barcode_type in BARCODE_TYPES:
+        pil = time_renders(skus, lambda sku: reference_barcode(sku, barcode_type, False))
+        array = time_renders(skus, lambda sku: render_barcode(sku, barcode_type))
+        print(f"{barcode_type:12} {pil:8.2f} {array:8.2f} {pil / array:7.1f}x {array / len(skus) * 1000:13.3f}")
+
+    if failures:
+        print(f"{failures} problems")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Label Creator - Format 2 CSV ingest differential check and benchmark
+
+Parses random Format 2 files with both engines of csv_ingest.parse_labels_csv
+("python" row by row, "columnar" pyarrow) and compares the aggregates, then
+times both on a generated wide inventory export.
+
+Usage:
+    python benchmarks/bench_csv_ingest.py                       # check 3000 files, then 100k x 60 columns
+    python benchmarks/bench_csv_ingest.py --rows 500000 --columns 60
+    python benchmarks/bench_csv_ingest.py --skip-check
+"""
+
+import argparse
+import io
+import os
+import random
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from label_creator.utils import csv_ingest  # noqa: E402
+
+INVENTORY_CELLS = ["", "0", "5", "12", "007", "x", "-1", "+4", "1e3", " 3", "3.5", "99999999999999999"]
+ODD_INVENTORY_CELLS = ["²", "٣", "99999999999999999999"]
+PRICES = ["1", "2.5", "x", "", " 3 ", "1_0", "inf", "nan", "-0.005", "19.99"]
+SKUS = ["A", "B", " A", "A ", "", "  ", "é", '"a,b"', '"q""q"', '"line\nbreak"']
+NAMES = ["n1", '"Shirt, blue"', '12" ruler', "  pad", "ü", '"multi\nline"']
+
+
+def random_csv(rng, messy):
+    """A random Format 2 file; messy files add ragged/blank rows and odd digits"""
+    columns = ["name", "sku", "retail_price"] + [f"inventory_{i}" for i in range(rng.choice([1, 3, 8, 12]))]
+    if rng.random() < 0.3:
+        columns.append("other")
+    rng.shuffle(columns)
+
+    inventory_cells = INVENTORY_CELLS + (ODD_INVENTORY_CELLS if messy else [])
+    lines = [",".join(columns)]
+    for _ in range(rng.randint(0, 60)):
+        if messy and rng.random() < 0.03:
+            lines.append(rng.choice(["", "  ", "x"]))
+            continue
+        row = []
+        for column in columns:
+            if column.startswith("inventory_"):
+                row.append(rng.choice(inventory_cells) if rng.random() < 0.3 else str(rng.randint(0, 50)))
+            elif column == "retail_price":
+                row.append(rng.choice(PRICES))
+            elif column == "sku":
+                row.append(rng.choice(SKUS))
+            elif column == "name":
+                row.append(rng.choice(NAMES))
+            else:
+                row.append("o")
+        if messy and rng.random() < 0.05:
+            row = row[:rng.randint(0, len(row))]
+        lines.append(",".join(row))
+
+    newline = rng.choice(["\n", "\r\n", "\r"])
+    return newline.join(lines) + rng.choice(["", newline])
+
+
+def parse(text, engine):
+    stream = csv_ingest.open_text_stream(io.BytesIO(text.encode("utf-8")))
+    return csv_ingest.parse_labels_csv(stream, "check.csv", engine=engine)
+
+
+def check(cases, seed):
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    for n in range(cases):
+        text = random_csv(rng, messy=rng.random() < 0.3)
+        # Small blocks so files span several record batches
+        csv_ingest.COLUMNAR_BLOCK_SIZE = rng.choice([64, 256, 1 << 20])
+        expected = parse(text, "python")
+        actual = parse(text, "columnar")
+        if actual != expected or list(actual["items"]) != list(expected["items"]):
+            print(f"MISMATCH after {n} files: {text!r}")
+            print(f"  python:   {expected!r}")
+            print(f"  columnar: {actual!r}")
+            return False
+    print(f"{cases} random files identical ({time.perf_counter() - start:.1f}s)")
+    return True
+
+
+def inventory_export(rows, columns, seed):
+    """A wide inventory export as uploaded: CRLF, quoted product names, mostly small counts"""
+    rng = random.Random(seed)
+    header = ["name", "sku", "retail_price"] + [f"inventory_{i}" for i in range(columns)]
+    lines = [",".join(header)]
+    for i in range(rows):
+        product = i % 20000
+        cells = [rng.choice(["", "0", str(rng.randint(0, 20))]) for _ in range(columns)]
+        lines.append(",".join([f'"Product {product}, size M"', f"SKU{product}", f"{rng.random() * 50:.2f}"] + cells))
+    return ("\r\n".join(lines) + "\r\n").encode()
+
+
+def benchmark(rows, columns, seed):
+    csv_ingest.COLUMNAR_BLOCK_SIZE = 1 << 20
+    data = inventory_export(rows, columns, seed)
+    print(f"{rows} rows x {columns} inventory columns ({len(data) / 1e6:.1f} MB)")
+    results = {}
+    for engine in ("python", "columnar"):
+        start = time.perf_counter()
+        results[engine] = csv_ingest.parse_labels_csv(csv_ingest.open_text_stream(io.BytesIO(data)), "export.csv", engine=engine)
+        elapsed = time.perf_counter() - start
+        print(f"  {engine:9} {elapsed:7.2f}s {rows / elapsed:>10.0f} rows/s")
+    if results["python"] != results["columnar"]:
+        print("  results differ")
+        return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Differential check and benchmark for Format 2 CSV ingest")
+    parser.add_argument("--cases", type=int, default=3000, help="random files to compare")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--columns", type=int, default=60, help="inventory_* columns in the benchmark file")
+    parser.add_argument("--skip-check", action="store_true")
+    args = parser.parse_args()
+
+    if not csv_ingest.HAS_PYARROW:
+        print("pyarrow is not installed; only the row-by-row engine is available")
+        sys.exit(1)
+    if not args.skip_check and not check(args.cases, args.seed):
+        sys.exit(1)
+    if not benchmark(args.rows, args.columns, args.seed):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Label Creator - Word output differential check and benchmark
+
+Builds .docx label sheets for the Flask app (application.py) two ways: with the
+bulk writer in create_labels_word and with the original python-docx cell-by-cell
+builder, kept below as reference_labels_word. The reference resets its row index
+on each new page so it can get past page one, and turns autofit off through
+table.autofit (the original set a nonexistent allow_autofit attribute).
+
+Both files are opened with python-docx and compared page by page: section size
+and margins, column widths, and every cell's paragraphs (text, alignment, bold,
+size) and picture bytes. Then both are timed; python-docx slows down with every
+page added, so it only gets --reference-labels labels.
+
+Usage:
+    python benchmarks/bench_docx_writer.py                      # check, then 20k labels
+    python benchmarks/bench_docx_writer.py --labels 100000 --reference-labels 500
+    python benchmarks/bench_docx_writer.py --skip-check
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+# application.py creates its upload, output and QR folders in the working directory
+os.chdir(tempfile.mkdtemp(prefix="label_bench_"))
+
+import docx  # noqa: E402
+from docx.enum.text import WD_ALIGN_PARAGRAPH  # noqa: E402
+from docx.shared import Inches, Pt  # noqa: E402
+
+import application  # noqa: E402
+
+NAMES = ["Widget", "Blue Shirt, XL", "  padded  ", "tab\tseparated", "two\nlines", "A & B <C>",
+         'quote "q"', "Crème brûlée", "ü€✓", ""]
+
+
+def reference_labels_word(path, labels_data, config):
+    """create_labels_word as it was before the bulk writer (python-docx, one cell at a time)"""
+    doc = docx.Document()
+    labels_per_row = config["labels_per_row"]
+    labels_per_column = config["labels_per_column"]
+    label_width_inch = config["label_width"]
+    label_height_inch = config["label_height"]
+
+    section = doc.sections[0]
+    section.page_width = Inches(config["page_width_inch"])
+    section.page_height = Inches(config["page_height_inch"])
+    section.top_margin = Inches(config["margin_top"])
+    section.bottom_margin = Inches(config["margin_top"])
+    section.left_margin = Inches(config["margin_left"])
+    section.right_margin = Inches(config["margin_left"])
+
+    def new_table():
+        table = doc.add_table(rows=labels_per_column, cols=labels_per_row)
+        table.autofit = False
+        for col in table.columns:
+            col.width = Inches(label_width_inch)
+        return table
+
+    table = new_table()
+    label_count = 0
+    for item in labels_data:
+        sku, product, price = item["sku"], item["product"], item["display_price"]
+        for _ in range(item["quantity"]):
+            if label_count > 0 and label_count % (labels_per_row * labels_per_column) == 0:
+                doc.add_page_break()
+                table = new_table()
+            page_index = label_count % (labels_per_row * labels_per_column)
+            cell = table.cell(page_index // labels_per_row, page_index % labels_per_row)
+
+            qr_paragraph = cell.add_paragraph()
+            qr_paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+            qr_paragraph.add_run().add_picture(application._get_word_qr(sku), width=Inches(label_width_inch * 0.4),
+                                               height=Inches(label_height_inch * 0.4))
+            for text, bold in ((f"SKU: {sku}", True), (product, False), (f"Price: ${float(price):.2f}", True)):
+                paragraph = cell.add_paragraph()
+                paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+                run = paragraph.add_run(text)
+                run.bold = bold
+                run.font.size = Pt(8)
+            label_count += 1
+
+    doc.save(path)
+
+
+def random_labels(count, rng):
+    """Label rows adding up to count labels, with repeated SKUs and awkward product names"""
+    labels = []
+    while count > 0:
+        quantity = min(count, rng.choice([1, 1, 2, 5, 13, 40]))
+        sku = f"SKU-{rng.randint(0, 300):04d}"
+        labels.append({"sku": sku, "product": rng.choice(NAMES), "display_price": f"{rng.uniform(0.5, 900):.2f}",
+                       "quantity": quantity})
+        count -= quantity
+    return labels
+
+
+def describe(path):
+    """Everything the comparison looks at, as plain data"""
+    doc = docx.Document(path)
+    section = doc.sections[0]
+    pages = [(section.page_width, section.page_height, section.top_margin, section.bottom_margin,
+              section.left_margin, section.right_margin)]
+    for table in doc.tables:
+        grid = [col.width for col in table.columns]
+        cells = []
+        for row in table.rows:
+            for cell in row.cells:
+                paragraphs = []
+                for paragraph in cell.paragraphs:
+                    runs = [(run.text, run.bold, run.font.size) for run in paragraph.runs]
+                    blips = paragraph._p.xpath(".//a:blip/@r:embed")
+                    images = [doc.part.related_parts[rel_id].blob for rel_id in blips]
+                    paragraphs.append((paragraph.alignment, runs, images))
+                cells.append(paragraphs)
+        pages.append((table.autofit, grid, cells))
+    shapes = [(shape.width, shape.height) for shape in doc.inline_shapes]
+    return pages, shapes, len(doc.part.package.image_parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Differential check and benchmark for the bulk Word writer")
+    parser.add_argument("--labels", type=int, default=20000, help="labels in the timed run")
+    parser.add_argument("--reference-labels", type=int, default=2000, help="labels in the timed python-docx run")
+    parser.add_argument("--check-runs", type=int, default=20, help="random documents to compare")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-check", action="store_true")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    label_types = application.LABEL_DIMENSIONS
+    output = tempfile.mkdtemp(prefix="label_docx_")
+
+    if not args.skip_check:
+        for run in range(args.check_runs):
+            label_type = rng.choice(sorted(label_types))
+            config = label_types[label_type]
+            per_page = config["labels_per_row"] * config["labels_per_column"]
+            labels = random_labels(rng.choice([0, 1, per_page, per_page + 1, 3 * per_page - 1, 250]), rng)
+
+            expected_path = os.path.join(output, f"reference_{run}.docx")
+            reference_labels_word(expected_path, labels, config)
+            actual_path = application.create_labels_word(f"check{run}", labels, label_type, config)
+            if describe(expected_path) != describe(actual_path):
+                print(f"MISMATCH: {label_type}, {sum(item['quantity'] for item in labels)} labels "
+                      f"({expected_path} vs {actual_path})")
+                sys.exit(1)
+        print(f"{args.check_runs} documents match")
+
+    label_type = "S-16987" if "S-16987" in label_types else sorted(label_types)[0]
+    config = label_types[label_type]
+    labels = random_labels(args.labels, rng)
+
+    # Generate the QR code files first so both sides are timed on the document alone
+    for item in labels:
+        application._get_word_qr(item["sku"])
+
+    start = time.perf_counter()
+    application.create_labels_word("bench", labels, label_type, config)
+    bulk = time.perf_counter() - start
+    print(f"bulk writer: {args.labels} labels ({label_type}) in {bulk:.2f}s, {args.labels / bulk:,.0f} labels/s")
+
+    reference_count = min(args.labels, args.reference_labels)
+    reference_labels = random_labels(reference_count, rng)
+    for item in reference_labels:
+        application._get_word_qr(item["sku"])
+    start = time.perf_counter()
+    reference_labels_word(os.path.join(output, "reference_bench.docx"), reference_labels, config)
+    reference = time.perf_counter() - start
+    print(f"python-docx: {reference_count} labels in {reference:.2f}s, {reference_count / reference:,.0f} labels/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Label Creator - Rendering Benchmarks
+
+Drives create_labels_pdf, draw_label, wrap_text and get_or_create_barcode with
+generated catalogs and reports wall time, labels/sec, peak RSS and output bytes
+per scenario. Frappe is replaced by benchmarks/frappe_stub.py, and Label Types
+come from label_creator/data/labels_types.json.
+
+Every scenario runs in a fresh subprocess so peak RSS and the in-process caches
+are per scenario.
+
+Usage:
+    python benchmarks/bench_labels.py                       # full matrix
+    python benchmarks/bench_labels.py --sizes 100 --kinds pdf wrap_text
+    python benchmarks/bench_labels.py --compare old.json new.json
+"""
+
+import argparse
+import io
+import itertools
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LABEL_TYPES_JSON = os.path.join(REPO_ROOT, "label_creator", "data", "labels_types.json")
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+
+SIZES = [100, 10_000, 100_000]
+NAME_STYLES = ["short", "long"]
+BARCODE_TYPES = ["QR Code", "Code 39", "Code 128", "EAN-13", "EAN-8", "UPC-A"]
+KINDS = ["pdf", "draw_label", "wrap_text", "barcode"]
+
+# Average copies per SKU in a generated catalog (receiving runs print several of each)
+LABELS_PER_SKU = 4
+
+WORDS = [
+    "Organic", "Cotton", "Crew", "Neck", "T-Shirt", "Stainless", "Steel", "Water", "Bottle",
+    "Wireless", "Ergonomic", "Mouse", "Ceramic", "Coffee", "Mug", "Premium", "Leather",
+    "Wallet", "Bamboo", "Cutting", "Board", "Scented", "Soy", "Candle", "Hand-Poured",
+]
+LONG_WORDS = ["Extraordinarilylongproductword", "Multi-Purpose-Heavy-Duty", "Antibacterial"]
+
+
+# ---------------------------------------------------------------------------
+# Environment
+# ---------------------------------------------------------------------------
+
+def load_label_types():
+    """Label Type documents built from data/labels_types.json (offsets in inches)"""
+    with open(LABEL_TYPES_JSON) as f:
+        types = json.load(f)
+
+    docs = {}
+    for key, lt in types.items():
+        docs[key] = dict(
+            lt,
+            name=key,
+            label_type_name=key,
+            display_name=lt.get("name"),
+            offset_input_mode="Inches",
+            show_product_name=1 if lt.get("show_product_name") else 0,
+            show_qr_code=1,
+            show_sku=1,
+            show_price=1,
+            currency="CAD",
+            modified="2025-01-01 00:00:00",
+        )
+    return docs
+
+
+def setup_frappe(site_path, label_type, barcode_type):
+    """Install the frappe stub with one Label Type document and the CAD currency"""
+    sys.path.insert(0, os.path.join(REPO_ROOT, "benchmarks"))
+    sys.path.insert(0, REPO_ROOT)
+    import frappe_stub
+
+    doc = dict(load_label_types()[label_type], barcode_type=barcode_type)
+    docs = {
+        ("Label Type", label_type): doc,
+        ("Currency", "CAD"): {"name": "CAD", "symbol": "$", "symbol_on_right": 0, "number_format": "#,###.##"},
+    }
+    return frappe_stub.install(site_path, docs)
+
+
+def generate_catalog(size, name_style, seed=0):
+    """Item list (sku, product, display_price, quantity) totalling `size` labels"""
+    rng = random.Random(seed)
+    items = []
+    remaining = size
+    index = 0
+    while remaining > 0:
+        quantity = min(remaining, rng.randint(1, 2 * LABELS_PER_SKU - 1))
+        if name_style == "long":
+            words = rng.sample(WORDS, rng.randint(8, 12)) + [rng.choice(LONG_WORDS)]
+            rng.shuffle(words)
+        else:
+            words = rng.sample(WORDS, rng.randint(1, 2))
+        items.append({
+            "sku": f"SKU-{index:08d}-{rng.randint(0, 99999):05d}",
+            "product": " ".join(words),
+            "display_price": f"{rng.uniform(0.5, 2500):.2f}",
+            "quantity": quantity,
+        })
+        remaining -= quantity
+        index += 1
+    return items
+
+
+def expand(items):
+    """One (sku, product, price) tuple per printed label"""
+    for item in items:
+        for _ in range(item["quantity"]):
+            yield item["sku"], item["product"], item["display_price"]
+
+
+# ---------------------------------------------------------------------------
+# Scenarios
+# ---------------------------------------------------------------------------
+
+def bench_pdf(scenario, items, site_path):
+    from label_creator.utils.label_generator import create_labels_pdf
+
+    path = create_labels_pdf(items, scenario["label_type"], workers=1)
+    return os.path.getsize(path)
+
+
+def bench_draw_label(scenario, items, site_path):
+    from reportlab.pdfgen import canvas
+    from label_creator.utils.label_generator import build_label_layout, draw_label, get_label_config, get_qr_dir
+
+    layout = build_label_layout(get_label_config(scenario["label_type"]))
+    qr_dir = get_qr_dir()
+
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=(layout.width, layout.height))
+    for sku, product, price in expand(items):
+        draw_label(c, 0, layout.height, sku, product, price, layout, qr_dir)
+        c.showPage()
+    c.save()
+    return buffer.tell()
+
+
+def bench_wrap_text(scenario, items, site_path):
+    from reportlab.pdfgen import canvas
+    from label_creator.utils.label_generator import build_label_layout, get_label_config, wrap_text
+
+    layout = build_label_layout(get_label_config(scenario["label_type"]))
+    text = layout.product_name or layout.sku
+    c = canvas.Canvas(io.BytesIO())
+    for _sku, product, _price in expand(items):
+        wrap_text(c, product, text.font_name, text.font_size, text.available_width, text.max_word_length)
+    return 0
+
+
+def bench_barcode(scenario, items, site_path):
+    from label_creator.utils.barcodes import get_or_create_barcode
+
+    barcode_dir = os.path.join(site_path, "barcodes")
+    os.makedirs(barcode_dir, exist_ok=True)
+    for sku, _product, _price in expand(items):
+        get_or_create_barcode(sku, barcode_dir, scenario["barcode_type"])
+    return sum(entry.stat().st_size for entry in os.scandir(barcode_dir))
+
+
+BENCHMARKS = {
+    "pdf": bench_pdf,
+    "draw_label": bench_draw_label,
+    "wrap_text": bench_wrap_text,
+    "barcode": bench_barcode,
+}
+
+
+def peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_scenario(scenario):
+    """Run one scenario in this process and return its metrics"""
+    with tempfile.TemporaryDirectory(prefix="label_bench_") as site_path:
+        setup_frappe(site_path, scenario["label_type"], scenario["barcode_type"])
+        items = generate_catalog(scenario["size"], scenario["names"])
+
+        # Keep import time (reportlab, PyMuPDF, ...) out of the measurement
+        import label_creator.utils.barcodes  # noqa: F401
+        import label_creator.utils.label_generator  # noqa: F401
+
+        # Count barcode bitmaps encoded into the output: inline images drawn into forms,
+        # and bitmaps ReportLab decodes out of an ImageReader (drawImage then hashes them)
+        from reportlab.lib.utils import ImageReader
+        from reportlab.pdfgen.canvas import Canvas
+        image_reads = [0]
+        get_rgb_data = ImageReader.getRGBData
+        draw_inline_image = Canvas.drawInlineImage
+
+        def counting_get_rgb_data(self):
+            if self._data is None:
+                image_reads[0] += 1
+            return get_rgb_data(self)
+
+        def counting_draw_inline_image(self, *args, **kwargs):
+            image_reads[0] += 1
+            return draw_inline_image(self, *args, **kwargs)
+
+        ImageReader.getRGBData = counting_get_rgb_data
+        Canvas.drawInlineImage = counting_draw_inline_image
+
+        start = time.perf_counter()
+        output_bytes = BENCHMARKS[scenario["kind"]](scenario, items, site_path)
+        wall_time = time.perf_counter() - start
+
+    return {
+        "wall_time": round(wall_time, 4),
+        "labels_per_sec": round(scenario["size"] / wall_time, 1) if wall_time else None,
+        "peak_rss_mb": peak_rss_mb(),
+        "output_bytes": output_bytes,
+        "image_reads": image_reads[0],
+        "unique_skus": len({item["sku"] for item in items}),
+    }
+
+
+def build_scenarios(args):
+    """
+    Expand the requested matrix. Dimensions a benchmark does not depend on are
+    collapsed: barcode ignores label type and names, wrap_text ignores barcodes.
+    """
+    label_types = args.label_types or list(load_label_types())
+    scenarios = []
+    for kind, size in itertools.product(args.kinds, args.sizes):
+        types = label_types if kind != "barcode" else label_types[:1]
+        names = args.names if kind != "barcode" else ["short"]
+        barcodes = args.barcodes if kind in ("pdf", "barcode") else ["QR Code"]
+        for label_type, name_style, barcode_type in itertools.product(types, names, barcodes):
+            scenarios.append({
+                "kind": kind,
+                "size": size,
+                "label_type": label_type,
+                "barcode_type": barcode_type,
+                "names": name_style,
+            })
+    return scenarios
+
+
+def scenario_id(scenario):
+    return "{kind}/{size}/{label_type}/{barcode_type}/{names}".format(**scenario)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_all(args):
+    scenarios = build_scenarios(args)
+    results = []
+    print(f"Running {len(scenarios)} scenarios")
+    print("-" * 100)
+
+    for scenario in scenarios:
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--run-scenario", json.dumps(scenario)],
+            capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            metrics = {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"}
+            print(f"{scenario_id(scenario):70} ERROR {metrics['error']}")
+        else:
+            metrics = json.loads(proc.stdout.strip().splitlines()[-1])
+            print(f"{scenario_id(scenario):70} {metrics['wall_time']:9.3f}s "
+                  f"{metrics['labels_per_sec']:>11} labels/s {metrics['peak_rss_mb']:>8} MB "
+                  f"{metrics['output_bytes']:>12} B {metrics['image_reads']:>8} image reads "
+                  f"({metrics['unique_skus']} SKUs)")
+        results.append(dict(scenario, **metrics))
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scenarios": results,
+    }
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"bench_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print("-" * 100)
+    print(f"Results saved to {output}")
+
+
+def compare(old_path, new_path):
+    """Print labels/sec of matching scenarios in two result files"""
+    with open(old_path) as f:
+        old = {scenario_id(s): s for s in json.load(f)["scenarios"]}
+    with open(new_path) as f:
+        new = {scenario_id(s): s for s in json.load(f)["scenarios"]}
+
+    print(f"{'scenario':70} {'old/s':>11} {'new/s':>11} {'speedup':>8} {'RSS MB':>15}")
+    for key in new:
+        if key not in old or "error" in old[key] or "error" in new[key]:
+            continue
+        before, after = old[key], new[key]
+        speedup = after["labels_per_sec"] / before["labels_per_sec"] if before["labels_per_sec"] else 0
+        print(f"{key:70} {before['labels_per_sec']:>11} {after['labels_per_sec']:>11} {speedup:>7.2f}x "
+              f"{before['peak_rss_mb']:>7}>{after['peak_rss_mb']:<7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Label Creator rendering pipeline")
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=KINDS)
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES, help="labels per scenario")
+    parser.add_argument("--names", nargs="+", choices=NAME_STYLES, default=NAME_STYLES)
+    parser.add_argument("--barcodes", nargs="+", choices=BARCODE_TYPES, default=BARCODE_TYPES)
+    parser.add_argument("--label-types", nargs="+", help="keys of data/labels_types.json (default: all)")
+    parser.add_argument("--output", help="results JSON path (default: benchmarks/results/bench_<time>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files")
+    parser.add_argument("--run-scenario", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_scenario:
+        print(json.dumps(run_scenario(json.loads(args.run_scenario))))
+    elif args.compare:
+        compare(*args.compare)
+    else:
+        run_all(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Label Creator - standard vs compact PDF profile check and size comparison
+
+Writes the same catalog with the "standard" and "compact" PDF profiles for every
+label type in data/labels_types.json and every barcode type, and checks that
+both have the same pages, the same text on every page and a barcode image in
+the same place for every label. Then checks the compact profile's 1-bit
+barcodes module by module: every QR bitmap against qr.modules, and one row of
+every linear barcode against python-barcode's module pattern. Reports output
+size and time per profile.
+
+Usage:
+    python benchmarks/bench_pdf_profiles.py                     # 2000 labels per job
+    python benchmarks/bench_pdf_profiles.py --labels 20000 --catalog long
+"""
+
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "benchmarks"))
+sys.path.insert(0, REPO_ROOT)
+
+import frappe_stub  # noqa: E402
+from bench_labels import BARCODE_TYPES, generate_catalog, load_label_types  # noqa: E402
+
+frappe_stub.install(tempfile.mkdtemp(prefix="label_bench_"))
+
+import barcode  # noqa: E402
+import fitz  # noqa: E402  PyMuPDF
+import qrcode  # noqa: E402
+
+from label_creator.utils.barcodes import (  # noqa: E402
+    BILEVEL_LINEAR_DPI, BILEVEL_QR_BOX_SIZE, LINEAR_BARCODES, LINEAR_MODULE_SIZES, QR_BORDER, barcode_data,
+    get_bilevel_barcode
+)
+from label_creator.utils.label_config import build_label_config  # noqa: E402
+from label_creator.utils.label_generator import write_labels_pdf  # noqa: E402
+
+
+def compare_documents(standard, compact):
+    """Problems found between the two profiles' PDFs (empty when they agree)"""
+    problems = []
+    with fitz.open(stream=standard, filetype="pdf") as a, fitz.open(stream=compact, filetype="pdf") as b:
+        if len(a) != len(b):
+            return [f"{len(a)} pages vs {len(b)}"]
+        for number, (page_a, page_b) in enumerate(zip(a, b), 1):
+            if page_a.get_text() != page_b.get_text():
+                problems.append(f"page {number}: text differs")
+            # Barcodes keep the aspect ratio inside the same box, so their centres must agree
+            centres_a = [fitz.Rect(info["bbox"]) for info in page_a.get_image_info()]
+            centres_b = [fitz.Rect(info["bbox"]) for info in page_b.get_image_info()]
+            if len(centres_a) != len(centres_b):
+                problems.append(f"page {number}: {len(centres_a)} barcodes vs {len(centres_b)}")
+                continue
+            for rect_a, rect_b in zip(centres_a, centres_b):
+                if abs((rect_a.x0 + rect_a.x1) - (rect_b.x0 + rect_b.x1)) > 2 or \
+                        abs((rect_a.y0 + rect_a.y1) - (rect_b.y0 + rect_b.y1)) > 2:
+                    problems.append(f"page {number}: barcode at {rect_a} vs {rect_b}")
+                    break
+    return problems
+
+
+def check_symbol(sku, barcode_type):
+    """Problem with one SKU's 1-bit barcode, or None when every module matches"""
+    _name, image = get_bilevel_barcode(sku, barcode_type)
+    if barcode_type not in LINEAR_BARCODES:
+        qr = qrcode.QRCode(box_size=BILEVEL_QR_BOX_SIZE, border=QR_BORDER)
+        qr.add_data(sku)
+        qr.make(fit=True)
+        size = qr.modules_count + 2 * QR_BORDER
+        if image.size != (size, size):
+            return f"{image.size} for {size}x{size} modules"
+        for y in range(size):
+            for x in range(size):
+                module = qr.modules[y - QR_BORDER][x - QR_BORDER] if \
+                    QR_BORDER <= x < size - QR_BORDER and QR_BORDER <= y < size - QR_BORDER else False
+                if bool(module) != (image.getpixel((x, y)) == 0):
+                    return f"module {x},{y} differs"
+        return None
+
+    symbol = barcode.get_barcode_class(LINEAR_BARCODES[barcode_type][0])(barcode_data(sku, barcode_type))
+    pattern = symbol.build()[0].strip("0")
+    module_px = round(LINEAR_MODULE_SIZES[barcode_type][0] * BILEVEL_LINEAR_DPI / 25.4)
+    # A quarter of the way down crosses every bar, above the human-readable text
+    row = [image.getpixel((x, image.height // 4)) == 0 for x in range(image.width)]
+    first = row.index(True)
+    last = len(row) - row[::-1].index(True)
+    bars = "".join("1" if row[x] else "0" for x in range(first, last, module_px))
+    if (last - first) != len(pattern) * module_px or bars != pattern:
+        return f"bars {bars[:24]}... != {pattern[:24]}..."
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the standard and compact PDF profiles")
+    parser.add_argument("--labels", type=int, default=2000, help="labels per job")
+    parser.add_argument("--catalog", choices=["short", "long"], default="short")
+    args = parser.parse_args()
+
+    items = generate_catalog(args.labels, args.catalog)
+    failures = 0
+
+    print(f"{'label type / barcode':40} {'std KB':>8} {'compact KB':>10} {'ratio':>6} {'std s':>7} {'compact s':>9}")
+    for key, doc in load_label_types().items():
+        for barcode_type in BARCODE_TYPES:
+            config = build_label_config(frappe_stub._Dict(doc, barcode_type=barcode_type))
+            outputs, times = {}, {}
+            for profile in ("standard", "compact"):
+                buffer = io.BytesIO()
+                start = time.perf_counter()
+                write_labels_pdf(buffer, items, config, workers=1, profile=profile)
+                times[profile] = time.perf_counter() - start
+                outputs[profile] = buffer.getvalue()
+
+            for problem in compare_documents(outputs["standard"], outputs["compact"]):
+                failures += 1
+                print(f"  {key} / {barcode_type}: {problem}")
+
+            standard, compact = len(outputs["standard"]), len(outputs["compact"])
+            print(f"{key + ' / ' + barcode_type:40} {standard / 1024:8.1f} {compact / 1024:10.1f} "
+                  f"{standard / compact:6.2f} {times['standard']:7.2f} {times['compact']:9.2f}")
+
+    skus = sorted({item["sku"] for item in items})
+    for barcode_type in BARCODE_TYPES:
+        for sku in skus:
+            problem = check_symbol(sku, barcode_type)
+            if problem:
+                failures += 1
+                print(f"  {barcode_type} {sku}: {problem}")
+    print(f"{len(skus)} SKUs checked module by module for {len(BARCODE_TYPES)} barcode types")
+
+    if failures:
+        print(f"{failures} problems")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Label Creator - raster preview pixel-diff check and benchmark
+
+Renders label thumbnails both ways preview_single_label can: through a PDF
+(ReportLab canvas -> PyMuPDF pixmap) and straight to a bitmap with
+label_raster.RasterCanvas, for every label type in data/labels_types.json, every
+barcode type and a few font/rotation variants, then compares the images.
+
+The raster canvas places glyphs on whole pixels and resamples barcode bitmaps
+with PIL, so edges may move by up to a pixel. A pixel only counts as different
+when it falls outside the 3x3 neighbourhood range of the other image by more
+than --tolerance gray levels; the check fails when any thumbnail has more than
+--max-bad of such pixels, or a different size.
+
+Usage:
+    python benchmarks/bench_preview_raster.py                   # 40 labels per variant
+    python benchmarks/bench_preview_raster.py --labels 200 --seed 3
+    python benchmarks/bench_preview_raster.py --save-diffs /tmp/raster_diffs
+"""
+
+import argparse
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "benchmarks"))
+sys.path.insert(0, REPO_ROOT)
+
+import frappe_stub  # noqa: E402
+from bench_labels import BARCODE_TYPES, LONG_WORDS, WORDS, load_label_types  # noqa: E402
+
+frappe_stub.install(tempfile.mkdtemp(prefix="label_bench_"))
+
+import fitz  # noqa: E402
+from PIL import Image, ImageChops, ImageFilter  # noqa: E402
+from reportlab.pdfgen import canvas  # noqa: E402
+
+from label_creator.utils import label_raster  # noqa: E402
+from label_creator.utils.label_config import build_config_from_label_type  # noqa: E402
+from label_creator.utils.label_generator import build_label_layout, draw_label, get_qr_dir  # noqa: E402
+from label_creator.utils.label_preview import PREVIEW_ZOOM  # noqa: E402
+
+# Extra variants of the landscape label type: (name suffix, overrides)
+VARIANTS = [
+    ("", {}),
+    ("times", {"sku_font_type": "Times-Bold", "product_name_font_type": "Times-Roman",
+               "price_font_type": "Times-Bold"}),
+    ("courier-270", {"sku_font_type": "Courier", "product_name_font_type": "Courier",
+                     "price_font_type": "Courier-Bold", "price_rotation": 270}),
+    ("rotate-45", {"price_rotation": 45}),
+]
+
+
+def label_configs():
+    """(name, config) for every label type x barcode type, plus font/rotation variants"""
+    configs = []
+    for key, doc in load_label_types().items():
+        for barcode_type in BARCODE_TYPES:
+            variants = VARIANTS if doc.get("price_rotation") else VARIANTS[:1]
+            for suffix, overrides in variants:
+                name = " / ".join(part for part in (key, barcode_type, suffix) if part)
+                doc_variant = frappe_stub._Dict(doc, barcode_type=barcode_type, **overrides)
+                configs.append((name, build_config_from_label_type(doc_variant)))
+    return configs
+
+
+def random_items(count, seed):
+    rng = random.Random(seed)
+    items = []
+    for index in range(count):
+        words = rng.sample(WORDS, rng.randint(1, 6)) + ([rng.choice(LONG_WORDS)] if rng.random() < 0.3 else [])
+        items.append((f"{rng.randint(100000000000, 999999999999)}" if index % 3 == 0 else f"SKU-{index:05d}",
+                       " ".join(words), f"{rng.uniform(0.5, 2500):.2f}"))
+    return items
+
+
+def render_pdf(layout, sku, product_name, price, qr_dir):
+    """The PDF path of preview_single_label: one label-sized page rasterized by PyMuPDF"""
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=(layout.width, layout.height))
+    draw_label(c, 0, layout.height, sku, product_name, price, layout, qr_dir)
+    c.save()
+    document = fitz.open(stream=buffer.getvalue(), filetype="pdf")
+    png = document[0].get_pixmap(matrix=fitz.Matrix(PREVIEW_ZOOM, PREVIEW_ZOOM)).tobytes("png")
+    document.close()
+    return png
+
+
+def bad_pixels(expected, actual, tolerance):
+    """Pixels of actual outside the 3x3 min/max range of expected, widened by tolerance"""
+    low = ImageChops.subtract(expected.filter(ImageFilter.MinFilter(3)), Image.new("L", expected.size, tolerance))
+    high = ImageChops.add(expected.filter(ImageFilter.MaxFilter(3)), Image.new("L", expected.size, tolerance))
+    outside = ImageChops.lighter(ImageChops.subtract(low, actual), ImageChops.subtract(actual, high))
+    return outside.point(lambda value: 255 if value else 0)
+
+
+def compare(pdf_png, raster_png, tolerance):
+    """Fraction of differing pixels (both directions), the diff mask, or None on a size mismatch"""
+    expected = Image.open(io.BytesIO(pdf_png)).convert("L")
+    actual = Image.open(io.BytesIO(raster_png)).convert("L")
+    if expected.size != actual.size:
+        return None, None
+    mask = ImageChops.lighter(bad_pixels(expected, actual, tolerance), bad_pixels(actual, expected, tolerance))
+    return mask.histogram()[255] / (mask.width * mask.height), mask
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pixel-diff check and benchmark for raster label previews")
+    parser.add_argument("--labels", type=int, default=40, help="labels per label type variant")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tolerance", type=int, default=48, help="gray levels allowed outside the neighbourhood range")
+    parser.add_argument("--max-bad", type=float, default=0.01, help="largest fraction of differing pixels per label")
+    parser.add_argument("--save-diffs", help="directory for PDF / raster / diff images of failing labels")
+    args = parser.parse_args()
+
+    if not label_raster.HAS_PYMUPDF:
+        print("PyMuPDF is not installed; both renderers need it")
+        sys.exit(1)
+
+    qr_dir = get_qr_dir()
+    items = random_items(args.labels, args.seed)
+    failures = 0
+    pdf_time = raster_time = 0.0
+    rendered = 0
+
+    print(f"{'label type':56} {'pdf ms':>8} {'raster ms':>10} {'worst':>8}")
+    for name, config in label_configs():
+        layout = build_label_layout(config)
+        if not label_raster.raster_supported(layout):
+            print(f"{name:56} (not supported by the raster canvas)")
+            continue
+
+        # Warm the barcode and glyph caches so both sides are timed on drawing alone
+        for sku, product_name, price in items:
+            render_pdf(layout, sku, product_name, price, qr_dir)
+        label_raster.render_label_raster(layout, *items[0], PREVIEW_ZOOM, qr_dir)
+
+        start = time.perf_counter()
+        pdf_pngs = [render_pdf(layout, sku, product_name, price, qr_dir) for sku, product_name, price in items]
+        elapsed_pdf = time.perf_counter() - start
+        start = time.perf_counter()
+        raster_pngs = [label_raster.render_label_raster(layout, sku, product_name, price, PREVIEW_ZOOM, qr_dir)
+                       for sku, product_name, price in items]
+        elapsed_raster = time.perf_counter() - start
+
+        worst = 0.0
+        for item, pdf_png, raster_png in zip(items, pdf_pngs, raster_pngs):
+            fraction, mask = compare(pdf_png, raster_png, args.tolerance)
+            if fraction is not None and fraction <= args.max_bad:
+                worst = max(worst, fraction)
+                continue
+            failures += 1
+            worst = 1.0 if fraction is None else max(worst, fraction)
+            print(f"  DIFF {name} {item[0]}: " + ("size mismatch" if fraction is None else f"{fraction:.3%} pixels"))
+            if args.save_diffs and mask is not None:
+                os.makedirs(args.save_diffs, exist_ok=True)
+                stem = os.path.join(args.save_diffs, f"{failures:03d}")
+                for suffix, data in (("pdf", pdf_png), ("raster", raster_png)):
+                    with open(f"{stem}_{suffix}.png", "wb") as f:
+                        f.write(data)
+                mask.save(f"{stem}_diff.png")
+
+        pdf_time += elapsed_pdf
+        raster_time += elapsed_raster
+        rendered += len(items)
+        print(f"{name:56} {elapsed_pdf / len(items) * 1000:8.2f} {elapsed_raster / len(items) * 1000:10.2f} {worst:8.3%}")
+
+    if rendered:
+        print(f"{rendered} labels: pdf {pdf_time / rendered * 1000:.2f} ms, raster {raster_time / rendered * 1000:.2f} ms "
+              f"per thumbnail ({pdf_time / raster_time:.1f}x)")
+    if failures:
+        print(f"{failures} labels differ beyond tolerance")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Label Creator - ZPL/EPL output check and size comparison
+
+Writes the same catalog as PDF, ZPL and EPL for every label type in
+data/labels_types.json and every barcode type, then checks the printer
+commands: one format per distinct label whose print quantities add up to the
+job, and every field origin inside the label. Reports output size and time
+per format.
+
+Usage:
+    python benchmarks/bench_thermal.py                          # 2000 labels per job
+    python benchmarks/bench_thermal.py --labels 20000 --dpi 300
+    python benchmarks/bench_thermal.py --print-sample zpl       # show one label's commands
+"""
+
+import argparse
+import io
+import os
+import re
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "benchmarks"))
+sys.path.insert(0, REPO_ROOT)
+
+import frappe_stub  # noqa: E402
+from bench_labels import BARCODE_TYPES, generate_catalog, load_label_types  # noqa: E402
+
+frappe_stub.install(tempfile.mkdtemp(prefix="label_bench_"))
+
+from label_creator.utils.label_config import build_label_config  # noqa: E402
+from label_creator.utils.label_generator import write_labels_pdf  # noqa: E402
+from label_creator.utils.label_thermal import write_labels_thermal  # noqa: E402
+
+# Field origins: ZPL ^FOx,y; EPL unrotated text (A), barcode (B) and QR (b) commands.
+# Rotated EPL text starts from its bottom or right corner, so it is not checked.
+ORIGINS = {
+    "zpl": re.compile(r"\^FO(\d+),(\d+)"),
+    "epl": re.compile(r"^[ABb](\d+),(\d+),(?:0|Q),", re.M),
+}
+QUANTITIES = {
+    "zpl": re.compile(r"\^PQ(\d+)"),
+    "epl": re.compile(r"^P(\d+)$", re.M),
+}
+FORMAT_STARTS = {
+    "zpl": re.compile(r"\^XA"),
+    "epl": re.compile(r"^N$", re.M),
+}
+
+
+def check_commands(output_format, text, config, items, dpi):
+    """Problems found in a job's printer commands (empty when it is consistent)"""
+    problems = []
+    quantities = [int(q) for q in QUANTITIES[output_format].findall(text)]
+    expected = [item["quantity"] for item in items if item["quantity"] > 0]
+    if quantities != expected:
+        problems.append(f"quantities {quantities[:5]}... != {expected[:5]}...")
+    if len(FORMAT_STARTS[output_format].findall(text)) != len(expected):
+        problems.append("one label format per distinct label expected")
+
+    width = round(config["label_width"] * dpi)
+    height = round(config["label_height"] * dpi)
+    for x, y in ORIGINS[output_format].findall(text):
+        if not (0 <= int(x) <= width and 0 <= int(y) <= height):
+            problems.append(f"field at {x},{y} outside the {width}x{height} label")
+            break
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check ZPL/EPL output and compare its size with the PDF")
+    parser.add_argument("--labels", type=int, default=2000, help="labels per job")
+    parser.add_argument("--dpi", type=int, default=203)
+    parser.add_argument("--print-sample", choices=["zpl", "epl"], help="print the first label of each job")
+    args = parser.parse_args()
+
+    items = generate_catalog(args.labels, "short")
+    failures = 0
+
+    print(f"{'label type / barcode':40} {'pdf KB':>9} {'zpl KB':>8} {'epl KB':>8} {'pdf s':>7} {'zpl s':>7}")
+    for key, doc in load_label_types().items():
+        for barcode_type in BARCODE_TYPES:
+            config = build_label_config(frappe_stub._Dict(doc, barcode_type=barcode_type))
+            sizes, times = {}, {}
+            for output_format in ("pdf", "zpl", "epl"):
+                buffer = io.BytesIO()
+                start = time.perf_counter()
+                if output_format == "pdf":
+                    write_labels_pdf(buffer, items, config, workers=1)
+                else:
+                    write_labels_thermal(buffer, items, config, output_format, args.dpi)
+                times[output_format] = time.perf_counter() - start
+                sizes[output_format] = buffer.tell()
+                if output_format == "pdf":
+                    continue
+
+                text = buffer.getvalue().decode("utf-8" if output_format == "zpl" else "cp437")
+                for problem in check_commands(output_format, text, config, items, args.dpi):
+                    failures += 1
+                    print(f"  {key} / {barcode_type} {output_format}: {problem}")
+                if args.print_sample == output_format:
+                    end = text.index("^XZ") + 3 if output_format == "zpl" else text.index("\nP") + 1
+                    print(text[:end])
+
+            print(f"{key + ' / ' + barcode_type:40} {sizes['pdf'] / 1024:9.1f} {sizes['zpl'] / 1024:8.1f} "
+                  f"{sizes['epl'] / 1024:8.1f} {times['pdf']:7.2f} {times['zpl']:7.2f}")
+
+    if failures:
+        print(f"{failures} problems")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
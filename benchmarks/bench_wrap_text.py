@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Label Creator - wrap_text differential check and micro-benchmark
+
+Compares the single-pass line breaker in label_generator against the original
+re-measuring implementation (kept below as reference_wrap_text) over a random
+corpus, then times both on short and long product names.
+
+Usage:
+    python benchmarks/bench_wrap_text.py                 # check 200k cases, then benchmark
+    python benchmarks/bench_wrap_text.py --cases 1000000 --seed 7
+    python benchmarks/bench_wrap_text.py --skip-check
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "benchmarks"))
+sys.path.insert(0, REPO_ROOT)
+
+import frappe_stub  # noqa: E402
+
+frappe_stub.install(tempfile.mkdtemp(prefix="label_bench_"))
+
+from reportlab.pdfbase import pdfmetrics  # noqa: E402
+from label_creator.utils import label_generator  # noqa: E402
+
+FONTS = ["Helvetica", "Helvetica-Bold", "Times-Roman", "Times-Bold", "Courier", "Courier-Bold"]
+FONT_SIZES = [5, 6, 6.5, 7, 8, 9.5, 10, 12]
+MAX_WORD_LENGTHS = [None, 0, 1, 3, 9, 12]
+ALPHABET = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-.,'&/()éüßñ€–“”✓"
+
+
+def reference_wrap_text(text, font_name, font_size, max_width_pts, max_word_length=None):
+    """wrap_text as it was before the single-pass breaker (measures every test line)"""
+    words = text.split()
+    lines = []
+    current_line = ""
+
+    for word in words:
+        test_line = current_line + (" " if current_line else "") + word
+        test_width = pdfmetrics.stringWidth(test_line, font_name, font_size)
+
+        if test_width <= max_width_pts:
+            current_line = test_line
+        else:
+            if current_line:
+                lines.append(current_line)
+                current_line = ""
+
+            if '-' in word:
+                parts = word.split('-')
+                hyphen_parts = [p + '-' for p in parts[:-1]] + [parts[-1]]
+
+                if max_word_length:
+                    final_parts = []
+                    for part in hyphen_parts:
+                        if len(part) > max_word_length:
+                            for i in range(0, len(part), max_word_length):
+                                final_parts.append(part[i:i+max_word_length])
+                        else:
+                            final_parts.append(part)
+                    hyphen_parts = final_parts
+
+                for part in hyphen_parts:
+                    test_line = current_line + (" " if current_line else "") + part
+                    test_width = pdfmetrics.stringWidth(test_line, font_name, font_size)
+
+                    if test_width <= max_width_pts:
+                        current_line = test_line
+                    else:
+                        if current_line:
+                            lines.append(current_line)
+                        current_line = part
+            else:
+                if max_word_length and len(word) > max_word_length:
+                    word_chunks = [word[i:i+max_word_length] for i in range(0, len(word), max_word_length)]
+
+                    for chunk in word_chunks:
+                        test_line = current_line + (" " if current_line else "") + chunk
+                        test_width = pdfmetrics.stringWidth(test_line, font_name, font_size)
+
+                        if test_width <= max_width_pts:
+                            current_line = test_line
+                        else:
+                            if current_line:
+                                lines.append(current_line)
+                            current_line = chunk
+                else:
+                    current_line = word
+
+    if current_line:
+        lines.append(current_line)
+
+    return lines if lines else [text]
+
+
+def random_case(rng):
+    """Random text and wrapping parameters, biased towards the edge cases"""
+    style = rng.random()
+    if style < 0.1:
+        # Degenerate hyphenation: "-", "a--b", trailing/leading hyphens
+        words = [rng.choice(["-", "--", "a--b", "-x", "x-", "ab-", "-", "a-b-c"]) for _ in range(rng.randint(0, 6))]
+    else:
+        words = ["".join(rng.choice(ALPHABET) for _ in range(rng.randint(1, 30))) for _ in range(rng.randint(0, 14))]
+    text = rng.choice([" ", "  ", " \t"]).join(words)
+    if rng.random() < 0.05:
+        text = " " + text + " "
+
+    font_name = rng.choice(FONTS)
+    font_size = rng.choice(FONT_SIZES)
+    max_word_length = rng.choice(MAX_WORD_LENGTHS)
+
+    if words and rng.random() < 0.3:
+        # Exactly the width of a line prefix, to exercise the <= boundary
+        k = rng.randint(1, len(words))
+        max_width = pdfmetrics.stringWidth(" ".join(words[:k]), font_name, font_size)
+    else:
+        max_width = rng.choice([rng.uniform(1, 250), float(rng.randint(1, 250))])
+
+    return text, font_name, font_size, max_width, max_word_length
+
+
+def check(cases, seed):
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    for n in range(cases):
+        args = random_case(rng)
+        expected = reference_wrap_text(*args)
+        actual = label_generator._wrap_text(*args)
+        if actual != expected:
+            print(f"MISMATCH after {n} cases: {args!r}")
+            print(f"  reference: {expected!r}")
+            print(f"  wrap_text: {actual!r}")
+            return False
+    print(f"{cases} random cases identical ({time.perf_counter() - start:.1f}s)")
+    return True
+
+
+def product_names(count, long_names, seed):
+    rng = random.Random(seed)
+    words = ["Organic", "Cotton", "Crew", "Neck", "T-Shirt", "Stainless", "Steel", "Water", "Bottle",
+             "Wireless", "Ergonomic", "Mouse", "Hand-Poured", "Soy", "Candle", "Extraordinarilylongword"]
+    return [" ".join(rng.choices(words, k=rng.randint(10, 20) if long_names else rng.randint(1, 3)))
+            for _ in range(count)]
+
+
+def timed(fn, names, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for name in names:
+            fn(name, "Helvetica", 6, 90, 9)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark(count, repeat, seed):
+    print(f"{'names':8} {'implementation':22} {'calls/s':>12} {'speedup':>8}")
+    for long_names in (False, True):
+        names = product_names(count, long_names, seed)
+        reference = timed(reference_wrap_text, names, repeat)
+        single_pass = timed(label_generator._wrap_text, names, repeat)
+        label = "long" if long_names else "short"
+        print(f"{label:8} {'reference':22} {count / reference:>12.0f} {1:>7.2f}x")
+        print(f"{label:8} {'single-pass':22} {count / single_pass:>12.0f} {reference / single_pass:>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Differential check and micro-benchmark for wrap_text")
+    parser.add_argument("--cases", type=int, default=200_000, help="random cases to compare")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--names", type=int, default=5_000, help="product names per benchmark run")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--skip-check", action="store_true")
+    args = parser.parse_args()
+
+    if not args.skip_check and not check(args.cases, args.seed):
+        sys.exit(1)
+    benchmark(args.names, args.repeat, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Minimal stand-in for the frappe module so the label rendering pipeline can be
+benchmarked outside a bench. Only what label_creator.utils touches is provided.
+"""
+
+import os
+import sys
+import time
+import traceback
+import types
+
+
+class _Dict(dict):
+    """frappe._dict: attribute access to keys, missing keys read as None"""
+
+    def __getattr__(self, key):
+        return self.get(key)
+
+    def __setattr__(self, key, value):
+        self[key] = value
+
+
+class _DB:
+    def __init__(self, docs):
+        self._docs = docs
+
+    def exists(self, doctype, name):
+        return (doctype, name) in self._docs
+
+    def get_value(self, doctype, name, fieldname, *args, **kwargs):
+        doc = self._docs.get((doctype, name)) or {}
+        if isinstance(fieldname, (list, tuple)):
+            return [doc.get(f) for f in fieldname]
+        return doc.get(fieldname)
+
+
+class _Cache:
+    """In-memory replacement for frappe.cache() (redis)"""
+
+    def __init__(self):
+        self._data = {}
+
+    def get_value(self, key, *args, **kwargs):
+        return self._data.get(key)
+
+    def set_value(self, key, value, *args, **kwargs):
+        self._data[key] = value
+
+    def delete_value(self, keys, *args, **kwargs):
+        for key in keys if isinstance(keys, (list, tuple)) else [keys]:
+            self._data.pop(key, None)
+
+    def hget(self, name, key, *args, **kwargs):
+        return self._data.get((name, key))
+
+    def hset(self, name, key, value, *args, **kwargs):
+        self._data[(name, key)] = value
+
+    def hdel(self, name, key, *args, **kwargs):
+        self._data.pop((name, key), None)
+
+
+class DoesNotExistError(Exception):
+    pass
+
+
+class ValidationError(Exception):
+    pass
+
+
+def install(site_path, docs=None):
+    """
+    Register a stub frappe module in sys.modules.
+
+    site_path becomes the site directory (public/files etc. are created below it);
+    docs maps (doctype, name) -> field dict and backs get_doc/get_all/db.
+    """
+    docs = docs if docs is not None else {}
+    frappe = types.ModuleType("frappe")
+
+    def get_site_path(*parts):
+        return os.path.join(site_path, *parts)
+
+    def get_doc(doctype, name=None):
+        if isinstance(doctype, dict):
+            return _Dict(doctype)
+        if (doctype, name) not in docs:
+            raise DoesNotExistError(f"{doctype} {name} not found")
+        return _Dict(docs[(doctype, name)])
+
+    def get_all(doctype, fields=None, filters=None, order_by=None, **kwargs):
+        return [_Dict(doc) for (dt, _name), doc in sorted(docs.items()) if dt == doctype]
+
+    def whitelist(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
+    def throw(msg, exc=ValidationError, *args, **kwargs):
+        raise exc(msg)
+
+    def generate_hash(*args, length=10, **kwargs):
+        return os.urandom(length).hex()[:length]
+
+    def init(site=None, sites_path=None, **kwargs):
+        frappe.local.site = site
+        frappe.local.sites_path = sites_path
+
+    cache = _Cache()
+
+    frappe._ = lambda text, *args: text
+    frappe._dict = _Dict
+    frappe.DoesNotExistError = DoesNotExistError
+    frappe.ValidationError = ValidationError
+    frappe.whitelist = whitelist
+    frappe.throw = throw
+    frappe.msgprint = lambda *args, **kwargs: None
+    frappe.log_error = lambda *args, **kwargs: None
+    frappe.publish_realtime = lambda *args, **kwargs: None
+    frappe.enqueue = lambda *args, **kwargs: None
+    frappe.get_traceback = traceback.format_exc
+    frappe.generate_hash = generate_hash
+    frappe.get_site_path = get_site_path
+    frappe.get_doc = get_doc
+    frappe.get_all = get_all
+    frappe.cache = lambda: cache
+    frappe.init = init
+    frappe.connect = lambda *args, **kwargs: None
+    frappe.db = _DB(docs)
+    frappe.conf = _Dict(developer_mode=0)
+    frappe.session = _Dict(user="Administrator")
+    frappe.response = _Dict()
+    frappe.local = types.SimpleNamespace(
+        site="benchmark", sites_path=os.path.dirname(site_path), response=frappe.response, flags=_Dict()
+    )
+    frappe.utils = types.SimpleNamespace(
+        get_site_path=get_site_path, now=lambda: time.strftime("%Y-%m-%d %H:%M:%S")
+    )
+    frappe._docs = docs
+
+    sys.modules["frappe"] = frappe
+    sys.modules["frappe.utils"] = frappe.utils
+    return frappe
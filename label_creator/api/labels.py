@@ -1,140 +1,96 @@
 import frappe
 from frappe import _
+import io
 import os
-import csv
 import json
 import qrcode
 from datetime import datetime
+from urllib.parse import urlencode
 from reportlab.pdfgen import canvas
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.platypus import Paragraph
 
-@frappe.whitelist(allow_guest=False)
-def upload_and_process(files_json):
+# PDFs up to this size are spooled in memory before being sent
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
+
+# Below this many uploaded bytes, parsing files in a process pool costs more than it saves
+PARALLEL_INGEST_MIN_BYTES = 4 * 1024 * 1024
+
+# Preview responses are revalidated on every use; their ETag changes with the Label Type
+PREVIEW_CACHE_CONTROL = "private, no-cache"
+
+
+def _get_ingest_workers():
+    """Process pool size for parsing several CSVs at once (label_creator_ingest_workers site config)"""
+    return int(frappe.conf.get("label_creator_ingest_workers") or min(os.cpu_count() or 1, 8))
+
+
+def _uploaded_csv_sources(files_json, spool):
     """
-    Process uploaded CSV files and return product data
+    Return (kind, value, filename) sources for csv_ingest.parse_source.
+    Multipart uploads ("files" fields) are streamed from the request, or copied
+    to temporary files when spool is set so worker processes can read them;
+    files_json (a JSON list of {filename, content}) is still accepted from older clients.
     """
-    try:
-        files_data = json.loads(files_json)
-        aggregated_content = {}
-        total_labels = 0
-        skipped_rows = []  # Track rows that were skipped due to parsing errors
-
-        for file_data in files_data:
-            content = file_data.get('content', '')
-            filename = file_data.get('filename', '')
-
-            # Parse CSV content
-            lines = content.strip().split('\n')
-            if not lines:
-                return {
-                    "success": False,
-                    "message": f"File '{filename}' is empty"
-                }
+    import tempfile
 
-            reader = csv.reader(lines)
-            header = next(reader, None)
+    if files_json:
+        return [("text", f.get('content', ''), f.get('filename', '')) for f in json.loads(files_json)]
 
-            if not header:
-                return {
-                    "success": False,
-                    "message": f"File '{filename}' has no header row"
-                }
+    uploads = frappe.request.files.getlist('files')
+    if not spool or len(uploads) < 2:
+        return [("stream", upload.stream, upload.filename) for upload in uploads]
 
-            # Normalize header names (strip whitespace, lowercase)
-            header_map = {col.strip().lower(): idx for idx, col in enumerate(header)}
+    sources = []
+    for upload in uploads:
+        with tempfile.NamedTemporaryFile(prefix="label_upload_", suffix=".csv", delete=False) as tmp:
+            upload.save(tmp)
+        sources.append(("path", tmp.name, upload.filename))
+    return sources
 
-            # Check for required fields
-            # Format 1: product, sku, quantity, display_price
-            format1_fields = {'product', 'sku', 'quantity', 'display_price'}
-            # Format 2: name, sku, retail_price
-            format2_fields = {'name', 'sku', 'retail_price'}
 
-            has_format1 = format1_fields.issubset(header_map)
-            has_format2 = format2_fields.issubset(header_map)
+def _source_size(source):
+    kind, value, _filename = source
+    return os.path.getsize(value) if kind == "path" else len(value) if kind == "text" else 0
 
-            if not has_format1 and not has_format2:
-                # Neither format matches - provide helpful error message
-                missing_from_format1 = format1_fields - set(header_map.keys())
-                missing_from_format2 = format2_fields - set(header_map.keys())
 
-                return {
-                    "success": False,
-                    "message": f"File '{filename}' is missing required columns.\n\n"
-                               f"Expected Format 1 columns: product, sku, quantity, display_price\n"
-                               f"Missing: {', '.join(missing_from_format1)}\n\n"
-                               f"OR\n\n"
-                               f"Expected Format 2 columns: name, sku, retail_price\n"
-                               f"Missing: {', '.join(missing_from_format2)}\n\n"
-                               f"Found columns: {', '.join(header_map.keys())}"
-                }
-
-            # Process File Type 1: product, sku, quantity, display_price
-            if has_format1:
-                row_number = 1  # Start after header
-                for row in reader:
-                    row_number += 1
-                    try:
-                        sku = row[header_map['sku']].strip()
-                        product = row[header_map['product']].strip()
-                        display_price = "{:.2f}".format(float(row[header_map['display_price']]))
-                        quantity = int(row[header_map['quantity']])
-
-                        if not sku:  # Skip rows with empty SKU
-                            skipped_rows.append(f"{filename}:row {row_number} - empty SKU")
-                            continue
-
-                        if sku not in aggregated_content:
-                            aggregated_content[sku] = {
-                                "sku": sku,
-                                "product": product,
-                                "display_price": display_price,
-                                "quantity": 0
-                            }
-                        aggregated_content[sku]["quantity"] += quantity
-                        total_labels += quantity
-                    except ValueError as e:
-                        skipped_rows.append(f"{filename}:row {row_number} - invalid value: {str(e)}")
-                        continue
-                    except IndexError as e:
-                        skipped_rows.append(f"{filename}:row {row_number} - missing column")
-                        continue
-
-            # Process File Type 2: name, sku, retail_price
-            elif has_format2:
-                inventory_columns = [col for col in header_map.keys() if col.startswith('inventory_')]
-                row_number = 1  # Start after header
-
-                for row in reader:
-                    row_number += 1
-                    try:
-                        sku = row[header_map['sku']].strip()
-                        product_name = row[header_map['name']].strip()
-                        display_price = "{:.2f}".format(float(row[header_map['retail_price']]))
-                        quantity = sum(
-                            int(row[header_map[col]]) for col in inventory_columns
-                            if col in header_map and row[header_map[col]].isdigit()
-                        )
-
-                        if not sku:  # Skip rows with empty SKU
-                            skipped_rows.append(f"{filename}:row {row_number} - empty SKU")
-                            continue
-
-                        if sku not in aggregated_content:
-                            aggregated_content[sku] = {
-                                "sku": sku,
-                                "product": product_name,
-                                "display_price": display_price,
-                                "quantity": 0
-                            }
-                        aggregated_content[sku]["quantity"] += quantity
-                        total_labels += quantity
-                    except ValueError as e:
-                        skipped_rows.append(f"{filename}:row {row_number} - invalid value: {str(e)}")
-                        continue
-                    except IndexError:
-                        skipped_rows.append(f"{filename}:row {row_number} - missing column")
-                        continue
+@frappe.whitelist(allow_guest=False)
+def upload_and_process(files_json=None):
+    """
+    Process uploaded CSV files and return product data
+
+    Files are parsed row by row and aggregated by SKU as they stream in,
+    so memory use follows the number of unique SKUs rather than file size.
+    Several large files are parsed concurrently in a process pool and merged
+    in upload order, giving the same result as parsing them one by one.
+    """
+    sources = []
+    try:
+        from label_creator.utils.csv_ingest import merge_aggregates, parse_source, parse_sources_parallel
+
+        workers = _get_ingest_workers()
+        sources = _uploaded_csv_sources(files_json, spool=workers > 1)
+
+        if (workers > 1 and len(sources) > 1
+                and sum(_source_size(source) for source in sources) >= PARALLEL_INGEST_MIN_BYTES):
+            aggregates = parse_sources_parallel(sources, workers)
+        else:
+            aggregates = []
+            for source in sources:
+                aggregates.append(parse_source(source))
+                if aggregates[-1]["error"]:
+                    break
+
+        result = merge_aggregates(aggregates)
+        if result["error"]:
+            return {
+                "success": False,
+                "message": result["error"]
+            }
+
+        aggregated_content = result["items"]
+        total_labels = result["total_labels"]
+        skipped_rows = result["skipped_rows"]
 
         if not aggregated_content:
             return {
@@ -166,26 +122,55 @@ def upload_and_process(files_json):
             "message": str(e)
         }
 
+    finally:
+        for kind, value, _filename in sources:
+            if kind == "path" and os.path.exists(value):
+                os.remove(value)
+
 
 @frappe.whitelist(allow_guest=False)
-def generate_labels(label_type, processed_content_json):
+def generate_labels(label_type, processed_content_json, output_format="pdf", dpi=None, bitmap_mode=None,
+                    pdf_profile=None):
     """
-    Generate PDF labels and return file path
+    Generate labels and return a download URL (see download_cached_labels).
+    output_format is "pdf" (default), "zpl" / "epl" for thermal printers (see label_thermal),
+    or "tiff" / "png" for bitmap pages at dpi, black and white (bitmap_mode "1") or
+    grayscale ("L") (see label_bitmaps). pdf_profile "compact" writes smaller PDFs
+    (see label_generator.PDF_PROFILES).
     """
     try:
-        from label_creator.utils.label_generator import create_labels_pdf
+        from label_creator.utils.label_bitmaps import BITMAP_FORMATS, create_labels_bitmaps, labels_bitmap_filename
+        from label_creator.utils.label_generator import create_labels_pdf, get_label_config, labels_pdf_filename
+        from label_creator.utils.label_thermal import THERMAL_FORMATS, create_labels_thermal, labels_thermal_filename
 
         processed_content = json.loads(processed_content_json)
+        output_format = (output_format or "pdf").lower()
+
+        if output_format in BITMAP_FORMATS:
+            file_path = create_labels_bitmaps(processed_content, label_type, output_format, dpi, bitmap_mode or "1")
+            filename = labels_bitmap_filename(get_label_config(label_type), output_format)
+        elif output_format in THERMAL_FORMATS:
+            # Printer commands, cached next to the PDFs
+            file_path = create_labels_thermal(processed_content, label_type, output_format)
+            filename = labels_thermal_filename(get_label_config(label_type), output_format)
+        elif output_format == "pdf":
+            # Generate PDF (or reuse the cached one for an identical batch)
+            file_path = create_labels_pdf(processed_content, label_type, profile=pdf_profile)
+
+            # Download name; the stored file is named by its content hash
+            filename = labels_pdf_filename(get_label_config(label_type))
+        else:
+            return {
+                "success": False,
+                "message": _("Unsupported output format: {0}").format(output_format)
+            }
 
-        # Generate PDF
-        pdf_path = create_labels_pdf(processed_content, label_type)
-
-        # Get filename
-        filename = os.path.basename(pdf_path)
-
-        # Create proper file URL for Frappe
-        # Files in public/files are accessible via /files/
-        file_url = f"/files/label_creator/{filename}"
+        # The cache is private; files are sent by download_cached_labels after a permission check
+        file_url = "/api/method/label_creator.api.labels.download_cached_labels?" + urlencode({
+            "label_type": label_type,
+            "file": os.path.basename(file_path),
+            "filename": filename
+        })
 
         return {
             "success": True,
@@ -201,6 +186,197 @@ def generate_labels(label_type, processed_content_json):
         }
 
 
+def _download_response(f, filename):
+    """
+    Stream an open file object back as an attachment. The body is read in
+    blocks as it is sent (or handed to the server's file wrapper) and f is
+    closed when the response is done.
+    """
+    import mimetypes
+    from werkzeug.wrappers import Response
+    from werkzeug.wsgi import wrap_file
+
+    size = f.seek(0, os.SEEK_END)
+    f.seek(0)
+    response = Response(
+        wrap_file(frappe.local.request.environ, f),
+        mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+        direct_passthrough=True
+    )
+    response.headers["Content-Length"] = str(size)
+    response.headers.set("Content-Disposition", "attachment", filename=filename)
+    return response
+
+
+@frappe.whitelist(allow_guest=False)
+def download_cached_labels(label_type, file, filename=None):
+    """
+    Send a file from the PDF cache, as linked by generate_labels.
+    Requires read permission on the Label Type it was generated for.
+    """
+    import re
+    from label_creator.utils.pdf_cache import CACHED_EXTENSIONS, get_cached_pdf
+
+    frappe.has_permission("Label Type", "read", doc=label_type, throw=True)
+
+    # Cache entries are named {sha256}.{extension}; anything else is not ours to send
+    key, extension = os.path.splitext(file)
+    if not re.fullmatch(r"[0-9a-f]{64}", key) or extension not in CACHED_EXTENSIONS:
+        frappe.throw(_("Invalid labels file"))
+
+    path = get_cached_pdf(key, extension[1:])
+    if not path:
+        frappe.throw(_("Labels file not found, it may have expired. Please generate the labels again."),
+                     frappe.DoesNotExistError)
+
+    return _download_response(open(path, "rb"), os.path.basename(filename or file))
+
+
+@frappe.whitelist(allow_guest=False)
+def download_labels(label_type, processed_content_json, output_format="pdf", dpi=None, bitmap_mode=None,
+                    pdf_profile=None):
+    """
+    Generate labels and stream them back as the response body.
+    Output is rendered into a spooled temp file and sent from there, so nothing is
+    copied into the response in one piece. Batches already in the PDF cache (written
+    by generate_labels and background jobs) are streamed from it; this path does not
+    add to the cache.
+    output_format "zpl" / "epl" returns printer commands and "tiff" / "png" bitmap
+    pages instead of a PDF (see generate_labels).
+    """
+    import tempfile
+    from label_creator.utils.label_bitmaps import BITMAP_FORMATS, labels_bitmap_filename, write_labels_bitmaps
+    from label_creator.utils.label_generator import get_label_config, get_pdf_profile, labels_pdf_filename, write_labels_pdf
+    from label_creator.utils.label_thermal import THERMAL_FORMATS, labels_thermal_filename, write_labels_thermal
+    from label_creator.utils.pdf_cache import get_cached_pdf, pdf_cache_key
+
+    processed_content = json.loads(processed_content_json)
+    config = get_label_config(label_type)
+    output_format = (output_format or "pdf").lower()
+
+    if output_format in THERMAL_FORMATS:
+        # A few hundred bytes per distinct label: rendered in memory, not cached
+        buffer = io.BytesIO()
+        try:
+            write_labels_thermal(buffer, processed_content, config, output_format)
+        except Exception:
+            frappe.log_error(frappe.get_traceback(), "Label Creator Generation Error")
+            raise
+        return _download_response(buffer, labels_thermal_filename(config, output_format))
+
+    if output_format in BITMAP_FORMATS:
+        filename = labels_bitmap_filename(config, output_format)
+    elif output_format == "pdf":
+        try:
+            pdf_profile = get_pdf_profile(pdf_profile)
+        except ValueError as e:
+            frappe.throw(str(e))
+
+        filename = labels_pdf_filename(config)
+        cached_path = get_cached_pdf(pdf_cache_key(label_type, config, processed_content, pdf_profile=pdf_profile))
+        if cached_path:
+            return _download_response(open(cached_path, "rb"), filename)
+    else:
+        frappe.throw(_("Unsupported output format: {0}").format(output_format))
+
+    # Small jobs stay in memory; large ones spill to a private temp file.
+    # The response owns the buffer from here and closes it once sent.
+    buffer = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    try:
+        if output_format == "pdf":
+            write_labels_pdf(buffer, processed_content, config, profile=pdf_profile)
+        else:
+            # Pages are written as they are rasterized
+            write_labels_bitmaps(buffer, processed_content, config, output_format, dpi, bitmap_mode or "1")
+    except Exception:
+        buffer.close()
+        frappe.log_error(frappe.get_traceback(), "Label Creator Generation Error")
+        raise
+    return _download_response(buffer, filename)
+
+
+@frappe.whitelist(allow_guest=False)
+def enqueue_labels(label_type, processed_content_json, pdf_profile=None):
+    """
+    Queue PDF label generation as a background job and return its job id.
+    Progress is published on the "label_creator_progress" realtime event
+    and can be polled with get_label_job_status; the finished job's stats
+    include the PDF size.
+    """
+    try:
+        from label_creator.utils.label_jobs import enqueue_label_job
+
+        processed_content = json.loads(processed_content_json)
+        job_id = enqueue_label_job(processed_content, label_type, pdf_profile)
+
+        return {
+            "success": True,
+            "job_id": job_id
+        }
+
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), "Label Creator Enqueue Error")
+        return {
+            "success": False,
+            "message": str(e)
+        }
+
+
+def _get_own_job_status(job_id):
+    from label_creator.utils.label_jobs import get_job_status
+
+    status = get_job_status(job_id)
+    if not status or status.get('user') != frappe.session.user:
+        frappe.throw(_("Label job {0} not found or expired").format(job_id), frappe.DoesNotExistError)
+    return status
+
+
+@frappe.whitelist(allow_guest=False)
+def get_label_job_status(job_id):
+    """
+    Return status (queued/running/finished/failed) and progress of a label job
+    """
+    try:
+        status = _get_own_job_status(job_id)
+        result = {
+            "success": True,
+            "job_id": job_id,
+            "status": status.get('status'),
+            "labels_done": status.get('labels_done', 0),
+            "labels_total": status.get('labels_total', 0),
+            "pages_done": status.get('pages_done', 0),
+            "message": status.get('message')
+        }
+        if status.get('status') == "finished":
+            result["filename"] = status.get('filename')
+            result["stats"] = status.get('stats')
+            result["download_url"] = f"/api/method/label_creator.api.labels.download_label_job?job_id={job_id}"
+        return result
+
+    except Exception as e:
+        return {
+            "success": False,
+            "message": str(e)
+        }
+
+
+@frappe.whitelist(allow_guest=False)
+def download_label_job(job_id):
+    """
+    Send the PDF produced by a finished label job
+    """
+    from label_creator.utils.label_jobs import get_job_pdf_path
+
+    status = _get_own_job_status(job_id)
+    if status.get('status') != "finished":
+        frappe.throw(_("Label job {0} has not finished yet").format(job_id))
+
+    with open(get_job_pdf_path(job_id), "rb") as f:
+        frappe.response.filecontent = f.read()
+    frappe.response.filename = status.get('filename') or f"{job_id}.pdf"
+    frappe.response.type = "download"
+
+
 @frappe.whitelist(allow_guest=False)
 def get_label_types():
     """
@@ -232,6 +408,7 @@ def get_label_types():
                 "margin_left": lt.margin_left or 0,
                 "margin_right": lt.margin_right or 0,
                 "barcode_type": lt.get("barcode_type") or "QR Code",
+                "barcode_render_mode": lt.get("barcode_render_mode") or "raster",
                 "qrcode_x_offset": lt.qrcode_x_offset or 0,
                 "qrcode_y_offset": lt.qrcode_y_offset or 0,
                 "qrcode_x_offset_pct": lt.get("qrcode_x_offset_pct") or 0,
@@ -279,117 +456,187 @@ def get_label_types():
         }
 
 
-@frappe.whitelist(allow_guest=False)
-def preview_single_label(label_type, sku, product_name, price):
+def _preview_not_modified(etag):
+    """Return an empty 304 response when the request's If-None-Match already names etag"""
+    request = getattr(frappe.local, "request", None)
+    if request is None or not request.if_none_match.contains(etag):
+        return None
+
+    from werkzeug.wrappers import Response
+    return Response(status=304, headers={"ETag": f'"{etag}"', "Cache-Control": PREVIEW_CACHE_CONTROL})
+
+
+def _preview_response(result, etag):
     """
-    Generate a preview image of a single label for a specific product
-    Used for showing individual product label previews in the Label Creator UI
-    Uses the same draw_label function as actual label generation
+    Send a preview result as the usual {"message": ...} JSON body with ETag and
+    Cache-Control headers. Outside an HTTP request the result is returned as-is.
     """
-    try:
-        import io
-        import base64
-        from label_creator.utils.label_generator import draw_label, build_config_from_label_type
-        from reportlab.lib.units import inch
+    if getattr(frappe.local, "request", None) is None:
+        return result
 
-        # Try to import PyMuPDF for PDF to image conversion
-        try:
-            import fitz  # PyMuPDF
-            has_pymupdf = True
-        except ImportError:
-            has_pymupdf = False
+    from werkzeug.wrappers import Response
+    return Response(
+        frappe.as_json({"message": result}),
+        mimetype="application/json",
+        headers={"ETag": f'"{etag}"', "Cache-Control": PREVIEW_CACHE_CONTROL}
+    )
 
-        # Get label type configuration using shared function
-        label_type_doc = frappe.get_doc("Label Type", label_type)
-        config = build_config_from_label_type(label_type_doc)
 
-        # Get label dimensions
-        label_width_inch = config.get('label_width', 1)
-        label_height_inch = config.get('label_height', 1)
+def _preview_file_response(data, image_type, etag):
+    """Send preview bytes as image/png or application/pdf with ETag and Cache-Control headers"""
+    from werkzeug.wrappers import Response
+    return Response(
+        data,
+        mimetype="image/png" if image_type == "png" else "application/pdf",
+        headers={"ETag": f'"{etag}"', "Cache-Control": PREVIEW_CACHE_CONTROL}
+    )
 
-        # Convert to points for ReportLab canvas
-        label_width = label_width_inch * inch
-        label_height = label_height_inch * inch
 
-        # Create a temporary directory for QR codes
-        qr_dir = frappe.get_site_path('public', 'files', 'label_creator', 'qr_codes')
-        os.makedirs(qr_dir, exist_ok=True)
+def _single_preview_key(label_type, sku, product_name, price):
+    """Return (preview config, preview cache key) of one label of a Label Type"""
+    from label_creator.utils.label_config import get_label_type_preview_config
+    from label_creator.utils.label_preview import preview_cache_keys
 
-        # Create canvas in memory with just the label size
-        buffer = io.BytesIO()
-        c = canvas.Canvas(buffer, pagesize=(label_width, label_height))
+    # Get label type configuration from the per-type config cache
+    config = get_label_type_preview_config(label_type)
+    return config, preview_cache_keys(label_type, config, [(sku, product_name, price)])[0]
 
-        # Draw the label at (0, label_height) - top-left corner
+
+def _render_single_preview(config, cache_key, sku, product_name, price):
+    """
+    Render one label thumbnail, or take it from the preview cache
+    Returns ("png", PNG bytes), ("pdf", the label's PDF) when it cannot be
+    rasterized, or ("error", message) when the label cannot be drawn
+    """
+    from label_creator.utils.label_generator import draw_label, build_label_layout, get_qr_dir
+    from label_creator.utils.label_preview import PREVIEW_ZOOM, get_cached_preview, preview_renderer, store_preview
+    from label_creator.utils.label_raster import render_label_raster
+    from reportlab.lib.units import inch
+
+    # Try to import PyMuPDF for PDF to image conversion
+    try:
+        import fitz  # PyMuPDF
+        has_pymupdf = True
+    except ImportError:
+        has_pymupdf = False
+
+    img_data = get_cached_preview(cache_key)
+    if img_data is not None:
+        return "png", img_data
+
+    # Get label dimensions
+    label_width_inch = config.get('label_width', 1)
+    label_height_inch = config.get('label_height', 1)
+
+    # Convert to points for ReportLab canvas
+    label_width = label_width_inch * inch
+    label_height = label_height_inch * inch
+
+    # Barcode disk tier, when enabled in site config
+    qr_dir = get_qr_dir()
+
+    # Resolve the label layout once
+    layout = build_label_layout(config)
+
+    # Draw the thumbnail straight to a bitmap unless the layout needs the PDF path
+    if preview_renderer(layout) == "raster":
         try:
-            draw_label(
-                c,
-                0,  # x position
-                label_height,  # y position (top of label)
-                sku,
-                product_name,
-                str(price),
-                label_width_inch,
-                label_height_inch,
-                config,
-                qr_dir
-            )
+            img_data = render_label_raster(layout, sku, product_name, price, PREVIEW_ZOOM, qr_dir)
         except Exception as label_error:
             frappe.log_error(f"Error drawing single label: {str(label_error)}\n{frappe.get_traceback()}", "Single Label Draw Error")
-            return {
-                "success": False,
-                "message": f"Error drawing label: {str(label_error)}"
-            }
+            return "error", f"Error drawing label: {str(label_error)}"
 
-        c.save()
+        store_preview(cache_key, img_data)
+        return "png", img_data
 
-        # Get the PDF data
-        pdf_data = buffer.getvalue()
-        buffer.close()
+    # Create canvas in memory with just the label size
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=(label_width, label_height))
 
-        # Convert PDF to image if PyMuPDF is available
-        if has_pymupdf:
-            try:
-                # Open PDF from bytes
-                pdf_document = fitz.open(stream=pdf_data, filetype="pdf")
-                page = pdf_document[0]  # Get first page
+    # Draw the label at (0, label_height) - top-left corner
+    try:
+        draw_label(
+            c,
+            0,  # x position
+            label_height,  # y position (top of label)
+            sku,
+            product_name,
+            str(price),
+            layout,
+            qr_dir
+        )
+    except Exception as label_error:
+        frappe.log_error(f"Error drawing single label: {str(label_error)}\n{frappe.get_traceback()}", "Single Label Draw Error")
+        return "error", f"Error drawing label: {str(label_error)}"
 
-                # Use high zoom for small labels to ensure clarity
-                zoom_factor = 4
+    c.save()
 
-                # Render page to image
-                mat = fitz.Matrix(zoom_factor, zoom_factor)
-                pix = page.get_pixmap(matrix=mat)
+    # Get the PDF data
+    pdf_data = buffer.getvalue()
+    buffer.close()
 
-                # Convert to PNG
-                img_data = pix.tobytes("png")
-                pdf_document.close()
+    # Fall back to the PDF if the conversion library is not available
+    if not has_pymupdf:
+        return "pdf", pdf_data
 
-                # Convert to base64
-                img_base64 = base64.b64encode(img_data).decode('utf-8')
+    # Convert PDF to image
+    try:
+        # Open PDF from bytes
+        pdf_document = fitz.open(stream=pdf_data, filetype="pdf")
+        page = pdf_document[0]  # Get first page
 
-                return {
-                    "success": True,
-                    "image_data": img_base64,
-                    "image_type": "png"
-                }
-            except Exception as conv_error:
-                frappe.log_error(f"PDF to image conversion error: {str(conv_error)}\n{frappe.get_traceback()}", "Single Label Preview Conversion Error")
-                # Fall back to PDF
-                pdf_base64 = base64.b64encode(pdf_data).decode('utf-8')
-                return {
-                    "success": True,
-                    "pdf_data": pdf_base64,
-                    "image_type": "pdf"
-                }
-        else:
-            # Fallback to PDF if conversion library not available
-            pdf_base64 = base64.b64encode(pdf_data).decode('utf-8')
+        # Use high zoom for small labels to ensure clarity
+        mat = fitz.Matrix(PREVIEW_ZOOM, PREVIEW_ZOOM)
+        pix = page.get_pixmap(matrix=mat)
+
+        # Convert to PNG
+        img_data = pix.tobytes("png")
+        pdf_document.close()
+    except Exception as conv_error:
+        frappe.log_error(f"PDF to image conversion error: {str(conv_error)}\n{frappe.get_traceback()}", "Single Label Preview Conversion Error")
+        # Fall back to PDF
+        return "pdf", pdf_data
+
+    store_preview(cache_key, img_data)
+    return "png", img_data
+
+
+@frappe.whitelist(allow_guest=False)
+def preview_single_label(label_type, sku, product_name, price):
+    """
+    Generate a preview image of a single label for a specific product
+    Used for showing individual product label previews in the Label Creator UI
+    Uses the same draw_label function as actual label generation
+    PNGs are cached by label content and Label Type version, and sent with an ETag
+    """
+    try:
+        import base64
+
+        # Repeated previews come from the browser cache (304) or the preview cache
+        config, cache_key = _single_preview_key(label_type, sku, product_name, price)
+        not_modified = _preview_not_modified(cache_key)
+        if not_modified:
+            return not_modified
+
+        image_type, data = _render_single_preview(config, cache_key, sku, product_name, price)
+        if image_type == "error":
+            return {
+                "success": False,
+                "message": data
+            }
+        if image_type == "pdf":
             return {
                 "success": True,
-                "pdf_data": pdf_base64,
+                "pdf_data": base64.b64encode(data).decode('utf-8'),
                 "image_type": "pdf"
             }
 
+        return _preview_response({
+            "success": True,
+            "image_data": base64.b64encode(data).decode('utf-8'),
+            "image_type": "png"
+        }, cache_key)
+
     except Exception as e:
         error_traceback = frappe.get_traceback()
         frappe.log_error(error_traceback, "Single Label Preview Error")
@@ -400,6 +647,261 @@ def preview_single_label(label_type, sku, product_name, price):
         }
 
 
+@frappe.whitelist(allow_guest=False, methods=["GET"])
+def preview_single_label_image(label_type, sku, product_name, price):
+    """
+    Send the preview of a single label as the image itself (image/png, or
+    application/pdf without PyMuPDF) so pages can use it as an <img src> URL
+    The browser caches it and revalidates it by ETag
+    """
+    config, cache_key = _single_preview_key(label_type, sku, product_name, price)
+    not_modified = _preview_not_modified(cache_key)
+    if not_modified:
+        return not_modified
+
+    image_type, data = _render_single_preview(config, cache_key, sku, product_name, price)
+    if image_type == "error":
+        frappe.throw(data)
+    return _preview_file_response(data, image_type, cache_key)
+
+
+@frappe.whitelist(allow_guest=False)
+def preview_labels_batch(label_type, items, cached="data"):
+    """
+    Generate preview images for many products in one request
+    items is a JSON list of {"sku", "product", "price"}; images come back in the same order,
+    each rendered exactly like preview_single_label. Cached previews are reused and
+    only the rest are rendered. With cached="url", previews already in the preview
+    cache come back as {"success": True, "cached": True} without image data, for
+    the page to load from preview_single_label_image.
+    """
+    try:
+        import base64
+        import hashlib
+        from label_creator.utils.label_config import get_label_type_preview_config
+        from label_creator.utils.label_generator import build_label_layout
+        from label_creator.utils.label_preview import (
+            HAS_PYMUPDF, PREVIEW_BATCH_MAX_ITEMS, get_cached_preview, preview_cache_keys,
+            preview_renderer, render_label_previews, store_preview
+        )
+
+        if isinstance(items, str):
+            items = json.loads(items)
+
+        if len(items) > PREVIEW_BATCH_MAX_ITEMS:
+            return {
+                "success": False,
+                "message": f"At most {PREVIEW_BATCH_MAX_ITEMS} previews can be generated per request"
+            }
+
+        config = get_label_type_preview_config(label_type)
+        rows = [(str(item.get('sku', '')), str(item.get('product', '')), str(item.get('price', ''))) for item in items]
+        cached_as_url = cached == "url"
+
+        cache_keys = preview_cache_keys(label_type, config, rows)
+        etag = hashlib.sha256("".join([cached] + cache_keys).encode()).hexdigest()
+        not_modified = _preview_not_modified(etag)
+        if not_modified:
+            return not_modified
+
+        # Look up and render each distinct label once
+        unique_rows = dict(zip(cache_keys, rows))
+        pngs = {key: get_cached_preview(key) for key in unique_rows}
+        missing = [key for key, png in pngs.items() if png is None]
+        errors = {}
+
+        # Only the PDF renderer needs PyMuPDF to rasterize
+        if missing and not HAS_PYMUPDF and preview_renderer(build_label_layout(config)) == "pdf":
+            return {
+                "success": False,
+                "message": "Batch previews require PyMuPDF"
+            }
+
+        if missing:
+            rendered = render_label_previews(config, [unique_rows[key] for key in missing])
+            for key, (img_data, error) in zip(missing, rendered):
+                if error is not None:
+                    errors[key] = error
+                else:
+                    pngs[key] = img_data
+                    store_preview(key, img_data)
+
+        missing = set(missing)
+        images = []
+        for key in cache_keys:
+            if key in errors:
+                images.append({
+                    "success": False,
+                    "message": f"Error drawing label: {errors[key]}"
+                })
+            elif cached_as_url and key not in missing:
+                images.append({
+                    "success": True,
+                    "cached": True
+                })
+            else:
+                images.append({
+                    "success": True,
+                    "image_data": base64.b64encode(pngs[key]).decode('utf-8'),
+                    "image_type": "png"
+                })
+
+        if errors:
+            frappe.log_error(
+                "\n".join(f"{unique_rows[key][0]}: {error}" for key, error in errors.items()),
+                "Batch Label Preview Draw Error"
+            )
+
+        return _preview_response({
+            "success": True,
+            "images": images
+        }, etag)
+
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), "Batch Label Preview Error")
+        return {
+            "success": False,
+            "message": str(e)
+        }
+
+
+def _page_preview_config(label_type_name):
+    """Return (config, sample_data) of a Label Type's sample page preview"""
+    from label_creator.utils.label_config import get_label_type_config, get_label_type_preview_config
+
+    config = dict(get_label_type_preview_config(label_type_name))
+    label_config = get_label_type_config(label_type_name)
+    # Add page layout fields
+    for field in ('labels_per_row', 'labels_per_column', 'page_width_inch', 'page_height_inch',
+                  'margin_top', 'margin_bottom', 'margin_left', 'margin_right'):
+        config[field] = label_config[field]
+    # Get sample data
+    sample_data = {
+        'sku': label_config['sku_sample'],
+        'product': label_config['product_name_sample'],
+        'display_price': str(label_config['price_sample'])
+    }
+    return config, sample_data
+
+
+def _render_page_preview(config, sample_data):
+    """
+    Draw a full page of sample labels and rasterize it when PyMuPDF is available
+    Returns (pdf_data, img_data, labels_drawn, conversion_error); img_data is None
+    when the page could not be converted to PNG
+    """
+    from label_creator.utils.label_generator import LabelFormStamper, build_label_layout, get_qr_dir
+    from reportlab.lib.units import inch
+
+    # Try to import PyMuPDF for PDF to image conversion
+    try:
+        import fitz  # PyMuPDF
+        has_pymupdf = True
+    except ImportError:
+        has_pymupdf = False
+
+    # Get page and label dimensions
+    page_width_inch = config.get('page_width_inch', 8.5)
+    page_height_inch = config.get('page_height_inch', 11)
+    label_width_inch = config.get('label_width', 1)
+    label_height_inch = config.get('label_height', 1)
+    labels_per_row = config.get('labels_per_row', 3)
+    labels_per_column = config.get('labels_per_column', 10)
+
+    # Convert to points for ReportLab canvas
+    page_width = page_width_inch * inch
+    page_height = page_height_inch * inch
+    label_width = label_width_inch * inch
+    label_height = label_height_inch * inch
+
+    margin_top = config.get('margin_top', 0.5) * inch
+    margin_bottom = config.get('margin_bottom', 0.5) * inch
+    margin_left = config.get('margin_left', 0.1875) * inch
+    margin_right = config.get('margin_right', 0.1875) * inch
+
+    # Barcode disk tier, when enabled in site config
+    qr_dir = get_qr_dir()
+
+    # Resolve the label layout once for every slot on the page
+    layout = build_label_layout(config)
+
+    # Create canvas in memory with full page size
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=(page_width, page_height))
+
+    # Every slot shows the same sample label, so record it once and stamp it
+    stamper = LabelFormStamper(c, layout, qr_dir, (page_width, page_height))
+
+    # Draw a border for debugging
+    c.setStrokeColorRGB(0.8, 0.8, 0.8)
+    c.rect(margin_left, margin_bottom,
+           page_width - margin_left - margin_right,
+           page_height - margin_top - margin_bottom)
+
+    # Draw all labels on the page
+    labels_drawn = 0
+    for row in range(labels_per_column):
+        for col in range(labels_per_row):
+            x = margin_left + (col * label_width)
+            # Calculate TOP-LEFT corner for draw_label (it draws downward from this point)
+            y_top = page_height - margin_top - (row * label_height)
+            # Calculate BOTTOM-LEFT corner for rect (ReportLab's rect uses bottom-left)
+            y_bottom = y_top - label_height
+
+            # Draw label border for visual reference
+            c.setStrokeColorRGB(0.7, 0.7, 0.7)  # Gray border
+            c.setLineWidth(0.5)
+            c.rect(x, y_bottom, label_width, label_height, stroke=1, fill=0)
+
+            # Draw the label
+            try:
+                stamper.draw(
+                    x,
+                    y_top,
+                    sample_data['sku'],
+                    sample_data['product'],
+                    sample_data['display_price']
+                )
+                labels_drawn += 1
+            except Exception as label_error:
+                frappe.log_error(f"Error drawing label at row {row}, col {col}: {str(label_error)}\n{frappe.get_traceback()}", "Label Draw Error")
+
+    c.save()
+
+    # Get the PDF data
+    pdf_data = buffer.getvalue()
+    buffer.close()
+
+    if not has_pymupdf:
+        return pdf_data, None, labels_drawn, None
+
+    # Convert PDF to image
+    try:
+        # Open PDF from bytes
+        pdf_document = fitz.open(stream=pdf_data, filetype="pdf")
+        page = pdf_document[0]  # Get first page
+
+        # Use higher zoom for small pages (< 3 inches in either dimension)
+        # to ensure labels are clearly visible
+        if page_width_inch < 3 or page_height_inch < 3:
+            zoom_factor = 4
+        else:
+            zoom_factor = 2
+
+        # Render page to image
+        mat = fitz.Matrix(zoom_factor, zoom_factor)
+        pix = page.get_pixmap(matrix=mat)
+
+        # Convert to PNG
+        img_data = pix.tobytes("png")
+        pdf_document.close()
+    except Exception as conv_error:
+        frappe.log_error(f"PDF to image conversion error: {str(conv_error)}\n{frappe.get_traceback()}", "Label Preview Conversion Error")
+        return pdf_data, None, labels_drawn, str(conv_error)
+
+    return pdf_data, img_data, labels_drawn, None
+
+
 @frappe.whitelist(allow_guest=False)
 def preview_label(label_type_name=None, label_type_config_json=None):
     """
@@ -408,37 +910,11 @@ def preview_label(label_type_name=None, label_type_config_json=None):
     Uses the same draw_label function as actual label generation
     """
     try:
-        import io
         import base64
-        from label_creator.utils.label_generator import draw_label, build_config_from_label_type
-        from reportlab.lib.units import inch
-
-        # Try to import PyMuPDF for PDF to image conversion
-        try:
-            import fitz  # PyMuPDF
-            has_pymupdf = True
-        except ImportError:
-            has_pymupdf = False
 
         # Get configuration using shared builder if label_type_name provided
         if label_type_name:
-            label_type_doc = frappe.get_doc("Label Type", label_type_name)
-            config = build_config_from_label_type(label_type_doc)
-            # Add page layout fields
-            config['labels_per_row'] = label_type_doc.labels_per_row
-            config['labels_per_column'] = label_type_doc.labels_per_column
-            config['page_width_inch'] = label_type_doc.page_width_inch
-            config['page_height_inch'] = label_type_doc.page_height_inch
-            config['margin_top'] = label_type_doc.margin_top or 0
-            config['margin_bottom'] = label_type_doc.margin_bottom or 0
-            config['margin_left'] = label_type_doc.margin_left or 0
-            config['margin_right'] = label_type_doc.margin_right or 0
-            # Get sample data
-            sample_data = {
-                'sku': label_type_doc.get('sku_sample') or 'SAM-PLE-SKU',
-                'product': label_type_doc.get('product_name_sample') or 'Sample Product Name',
-                'display_price': str(label_type_doc.get('price_sample') or 29.99)
-            }
+            config, sample_data = _page_preview_config(label_type_name)
         else:
             # Backwards compatibility: parse JSON config
             config = json.loads(label_type_config_json)
@@ -448,133 +924,83 @@ def preview_label(label_type_name=None, label_type_config_json=None):
                 'display_price': str(config.get('price_sample', 29.99))
             }
 
-        # Get page and label dimensions
-        page_width_inch = config.get('page_width_inch', 8.5)
-        page_height_inch = config.get('page_height_inch', 11)
-        label_width_inch = config.get('label_width', 1)
-        label_height_inch = config.get('label_height', 1)
-        labels_per_row = config.get('labels_per_row', 3)
-        labels_per_column = config.get('labels_per_column', 10)
-
-        # Convert to points for ReportLab canvas
-        page_width = page_width_inch * inch
-        page_height = page_height_inch * inch
-        label_width = label_width_inch * inch
-        label_height = label_height_inch * inch
-
-        margin_top = config.get('margin_top', 0.5) * inch
-        margin_bottom = config.get('margin_bottom', 0.5) * inch
-        margin_left = config.get('margin_left', 0.1875) * inch
-        margin_right = config.get('margin_right', 0.1875) * inch
-
-        # Create a temporary directory for QR codes
-        qr_dir = frappe.get_site_path('public', 'files', 'label_creator', 'qr_codes')
-        os.makedirs(qr_dir, exist_ok=True)
-
-        # Create canvas in memory with full page size
-        buffer = io.BytesIO()
-        c = canvas.Canvas(buffer, pagesize=(page_width, page_height))
-
-        # Draw a border for debugging
-        c.setStrokeColorRGB(0.8, 0.8, 0.8)
-        c.rect(margin_left, margin_bottom,
-               page_width - margin_left - margin_right,
-               page_height - margin_top - margin_bottom)
-
-        # Draw all labels on the page
-        labels_drawn = 0
-        for row in range(labels_per_column):
-            for col in range(labels_per_row):
-                x = margin_left + (col * label_width)
-                # Calculate TOP-LEFT corner for draw_label (it draws downward from this point)
-                y_top = page_height - margin_top - (row * label_height)
-                # Calculate BOTTOM-LEFT corner for rect (ReportLab's rect uses bottom-left)
-                y_bottom = y_top - label_height
-
-                # Draw label border for visual reference
-                c.setStrokeColorRGB(0.7, 0.7, 0.7)  # Gray border
-                c.setLineWidth(0.5)
-                c.rect(x, y_bottom, label_width, label_height, stroke=1, fill=0)
-
-                # Draw the label
-                try:
-                    draw_label(
-                        c,
-                        x,
-                        y_top,
-                        sample_data['sku'],
-                        sample_data['product'],
-                        sample_data['display_price'],
-                        label_width_inch,
-                        label_height_inch,
-                        config,
-                        qr_dir
-                    )
-                    labels_drawn += 1
-                except Exception as label_error:
-                    frappe.log_error(f"Error drawing label at row {row}, col {col}: {str(label_error)}\n{frappe.get_traceback()}", "Label Draw Error")
-
-        c.save()
-
-        # Get the PDF data
-        pdf_data = buffer.getvalue()
-        buffer.close()
-
-        # Convert PDF to image if PyMuPDF is available
-        if has_pymupdf:
-            try:
-                # Open PDF from bytes
-                pdf_document = fitz.open(stream=pdf_data, filetype="pdf")
-                page = pdf_document[0]  # Get first page
-
-                # Use higher zoom for small pages (< 3 inches in either dimension)
-                # to ensure labels are clearly visible
-                if page_width_inch < 3 or page_height_inch < 3:
-                    zoom_factor = 4
-                else:
-                    zoom_factor = 2
-
-                # Render page to image
-                mat = fitz.Matrix(zoom_factor, zoom_factor)
-                pix = page.get_pixmap(matrix=mat)
-
-                # Convert to PNG
-                img_data = pix.tobytes("png")
-                pdf_document.close()
+        pdf_data, img_data, labels_drawn, conversion_error = _render_page_preview(config, sample_data)
 
-                # Convert to base64
-                img_base64 = base64.b64encode(img_data).decode('utf-8')
-
-                return {
-                    "success": True,
-                    "image_data": img_base64,
-                    "image_type": "png",
-                    "labels_drawn": labels_drawn,
-                    "message": "Preview generated successfully"
-                }
-            except Exception as conv_error:
-                frappe.log_error(f"PDF to image conversion error: {str(conv_error)}\n{frappe.get_traceback()}", "Label Preview Conversion Error")
-                # Fall back to PDF
-                pdf_base64 = base64.b64encode(pdf_data).decode('utf-8')
-                return {
-                    "success": True,
-                    "pdf_data": pdf_base64,
-                    "image_type": "pdf",
-                    "message": f"Preview generated (conversion error: {str(conv_error)})"
-                }
-        else:
-            # Fallback to PDF if conversion library not available
-            pdf_base64 = base64.b64encode(pdf_data).decode('utf-8')
+        if img_data is not None:
             return {
                 "success": True,
-                "pdf_data": pdf_base64,
-                "image_type": "pdf",
-                "message": "Preview generated (install PyMuPDF for image preview)"
+                "image_data": base64.b64encode(img_data).decode('utf-8'),
+                "image_type": "png",
+                "labels_drawn": labels_drawn,
+                "message": "Preview generated successfully"
             }
 
+        # Fall back to PDF
+        return {
+            "success": True,
+            "pdf_data": base64.b64encode(pdf_data).decode('utf-8'),
+            "image_type": "pdf",
+            "message": (f"Preview generated (conversion error: {conversion_error})" if conversion_error
+                        else "Preview generated (install PyMuPDF for image preview)")
+        }
+
     except Exception as e:
         frappe.log_error(frappe.get_traceback(), "Label Preview Error")
         return {
             "success": False,
             "message": str(e)
         }
+
+
+@frappe.whitelist(allow_guest=False, methods=["GET"])
+def preview_label_image(label_type_name):
+    """
+    Send the sample page preview of a Label Type as the image itself (image/png,
+    or application/pdf without PyMuPDF) for use as an <img src> URL
+    PNGs are cached by Label Type version and revalidated by ETag
+    """
+    from label_creator.utils.label_preview import get_cached_preview, page_preview_cache_key, store_preview
+
+    config, sample_data = _page_preview_config(label_type_name)
+    cache_key = page_preview_cache_key(label_type_name, config)
+    not_modified = _preview_not_modified(cache_key)
+    if not_modified:
+        return not_modified
+
+    img_data = get_cached_preview(cache_key)
+    if img_data is None:
+        pdf_data, img_data, _labels_drawn, _conversion_error = _render_page_preview(config, sample_data)
+        if img_data is None:
+            return _preview_file_response(pdf_data, "pdf", cache_key)
+        store_preview(cache_key, img_data)
+
+    return _preview_file_response(img_data, "png", cache_key)
+
+
+@frappe.whitelist(allow_guest=False)
+def get_render_cache_stats():
+    """
+    Return hit/miss counters for the in-process label rendering caches
+    """
+    try:
+        from label_creator.utils.currency import get_currency_cache_stats
+        from label_creator.utils.barcodes import get_barcode_cache_stats
+        from label_creator.utils.label_config import get_label_type_cache_stats
+        from label_creator.utils.label_generator import get_wrap_cache_stats
+        from label_creator.utils.label_preview import get_preview_cache_stats
+
+        return {
+            "success": True,
+            "label_types": get_label_type_cache_stats(),
+            "wrap_text": get_wrap_cache_stats(),
+            "currency": get_currency_cache_stats(),
+            "barcodes": get_barcode_cache_stats(),
+            "previews": get_preview_cache_stats()
+        }
+
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), "Label Creator Cache Stats Error")
+        return {
+            "success": False,
+            "message": str(e)
+        }
@@ -146,6 +146,13 @@ fixtures = [
 #	}
 # }
 
+doc_events = {
+	"Currency": {
+		"on_update": "label_creator.utils.currency.clear_currency_cache",
+		"on_trash": "label_creator.utils.currency.clear_currency_cache"
+	}
+}
+
 # Scheduled Tasks
 # ---------------
 
@@ -167,6 +174,13 @@ fixtures = [
 #	],
 # }
 
+scheduler_events = {
+	"hourly": [
+		"label_creator.utils.label_jobs.cleanup_label_jobs",
+		"label_creator.utils.pdf_cache.prune_pdf_cache"
+	]
+}
+
 # Testing
 # -------
 
@@ -299,6 +299,65 @@ function generate_preview(frm) {
 		indicator: 'blue'
 	});
 
+	// Load the page preview as a plain image URL, which the browser caches and revalidates by ETag
+	const image_url = '/api/method/label_creator.api.labels.preview_label_image?'
+		+ new URLSearchParams({ label_type_name: frm.doc.name }).toString();
+	const img = new Image();
+	img.onload = function() {
+		show_preview_dialog(frm, preview_image_html(frm, image_url));
+	};
+	img.onerror = function() {
+		// Not a PNG (PDF fallback or an error) - the JSON endpoint explains which
+		generate_preview_data(frm);
+	};
+	img.src = image_url;
+}
+
+function preview_image_html(frm, src) {
+	return `
+		<div style="text-align: center; padding: 20px;">
+			<p style="margin-bottom: 15px; color: #666;">
+				<strong>Page Layout Preview</strong><br>
+				Labels per Row: ${frm.doc.labels_per_row}, Labels per Column: ${frm.doc.labels_per_column}<br>
+				Page Size: ${frm.doc.page_width_inch}" × ${frm.doc.page_height_inch}"
+			</p>
+			<div style="overflow: auto; max-height: 700px; border: 1px solid #ddd; border-radius: 4px; padding: 10px; background: #f5f5f5;">
+				<img
+					src="${src}"
+					style="max-width: 100%; height: auto; display: block; margin: 0 auto; background: white; box-shadow: 0 2px 8px rgba(0,0,0,0.1);"
+					alt="Label Preview">
+			</div>
+			<p style="margin-top: 15px; color: #888; font-size: 12px;">
+				<strong>Sample Data:</strong> SKU: ${frm.doc.sku_sample || 'SAM-PLE-SKU'}, Product: ${frm.doc.product_name_sample || 'Sample Product'}, Price: ${frm.doc.price_sample || '29.99'}<br>
+				Preview shows full page with all labels based on current configuration
+			</p>
+		</div>
+	`;
+}
+
+function show_preview_dialog(frm, html) {
+	// Create a dialog to show the preview
+	const d = new frappe.ui.Dialog({
+		title: __('Label Preview - ') + frm.doc.display_name,
+		size: 'extra-large',
+		fields: [
+			{
+				fieldtype: 'HTML',
+				fieldname: 'preview_html'
+			}
+		]
+	});
+
+	d.fields_dict.preview_html.$wrapper.html(html);
+	d.show();
+
+	frappe.show_alert({
+		message: __('Preview generated successfully'),
+		indicator: 'green'
+	});
+}
+
+function generate_preview_data(frm) {
 	// Call API with just the label type name - it will use the shared config builder
 	frappe.call({
 		method: 'label_creator.api.labels.preview_label',
@@ -307,42 +366,12 @@ function generate_preview(frm) {
 		},
 		callback: function(r) {
 			if (r.message && r.message.success) {
-				// Create a dialog to show the preview
-				const d = new frappe.ui.Dialog({
-					title: __('Label Preview - ') + frm.doc.display_name,
-					size: 'extra-large',
-					fields: [
-						{
-							fieldtype: 'HTML',
-							fieldname: 'preview_html'
-						}
-					]
-				});
-
 				let html = '';
 
 				// Check if we have image data or PDF data
 				if (r.message.image_data) {
 					// Display as PNG image
-					html = `
-						<div style="text-align: center; padding: 20px;">
-							<p style="margin-bottom: 15px; color: #666;">
-								<strong>Page Layout Preview</strong><br>
-								Labels per Row: ${frm.doc.labels_per_row}, Labels per Column: ${frm.doc.labels_per_column}<br>
-								Page Size: ${frm.doc.page_width_inch}" × ${frm.doc.page_height_inch}"
-							</p>
-							<div style="overflow: auto; max-height: 700px; border: 1px solid #ddd; border-radius: 4px; padding: 10px; background: #f5f5f5;">
-								<img
-									src="data:image/png;base64,${r.message.image_data}"
-									style="max-width: 100%; height: auto; display: block; margin: 0 auto; background: white; box-shadow: 0 2px 8px rgba(0,0,0,0.1);"
-									alt="Label Preview">
-							</div>
-							<p style="margin-top: 15px; color: #888; font-size: 12px;">
-								<strong>Sample Data:</strong> SKU: ${frm.doc.sku_sample || 'SAM-PLE-SKU'}, Product: ${frm.doc.product_name_sample || 'Sample Product'}, Price: ${frm.doc.price_sample || '29.99'}<br>
-								Preview shows full page with all labels based on current configuration
-							</p>
-						</div>
-					`;
+					html = preview_image_html(frm, `data:image/png;base64,${r.message.image_data}`);
 				} else if (r.message.pdf_data) {
 					// Fallback to PDF iframe
 					html = `
@@ -362,13 +391,7 @@ function generate_preview(frm) {
 					`;
 				}
 
-				d.fields_dict.preview_html.$wrapper.html(html);
-				d.show();
-
-				frappe.show_alert({
-					message: __('Preview generated successfully'),
-					indicator: 'green'
-				});
+				show_preview_dialog(frm, html);
 			} else {
 				frappe.msgprint({
 					title: __('Error'),
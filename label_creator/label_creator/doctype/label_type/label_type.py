@@ -3,6 +3,7 @@
 
 import frappe
 from frappe.model.document import Document
+from label_creator.utils.label_config import clear_label_type_cache
 
 class LabelType(Document):
 	def validate(self):
@@ -20,3 +21,10 @@ class LabelType(Document):
 			frappe.throw("Page width must be greater than 0")
 		if self.page_height_inch <= 0:
 			frappe.throw("Page height must be greater than 0")
+
+	def on_update(self):
+		"""Drop the cached generation/preview config of this label type"""
+		clear_label_type_cache(self.name)
+
+	def on_trash(self):
+		clear_label_type_cache(self.name)
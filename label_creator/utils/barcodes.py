@@ -0,0 +1,453 @@
+import hashlib
+import os
+from functools import lru_cache
+import qrcode
+import frappe
+from PIL import Image, ImageDraw, ImageFont
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.graphics import renderPDF
+from reportlab.graphics.barcode import createBarcodeDrawing
+from label_creator.utils.cache import LRUCache
+
+# Lazy import for barcode module - only imported when needed
+# This prevents the entire module from failing if barcode is not installed
+try:
+    import barcode
+    from barcode.writer import ImageWriter, mm2px, pt2mm
+    HAS_BARCODE = True
+except ImportError:
+    HAS_BARCODE = False
+    frappe.log_error(
+        "python-barcode module is not installed. Only QR codes will be available.\n\n"
+        "To install: bench pip install python-barcode",
+        "Barcode Module Not Found"
+    )
+
+# NumPy is optional: with it bitmaps are built from the module matrix / bar pattern
+# in one pass instead of one PIL rectangle per module; without it qrcode and
+# python-barcode draw them as before
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# QR code encoding parameters (pixels per module, quiet zone in modules)
+QR_BOX_SIZE = 10
+QR_BORDER = 1
+
+# Bi-level bitmaps (render_mode "bilevel", used by the compact PDF profile) are drawn at
+# module resolution: one pixel per QR module, and a whole number of pixels per linear
+# barcode module at about BILEVEL_LINEAR_DPI, so bars keep exact widths and the
+# human-readable text stays legible
+BILEVEL_QR_BOX_SIZE = 1
+BILEVEL_LINEAR_DPI = 254
+
+# Default number of rendered barcode bitmaps kept in memory per process.
+# Override with "label_creator_barcode_cache_size" in site_config.json.
+DEFAULT_BARCODE_CACHE_SIZE = 1024
+
+# python-barcode class names and the digit count each symbology encodes (checksum excluded)
+LINEAR_BARCODES = {
+    "Code 39": ("code39", None),
+    "Code 128": ("code128", None),
+    "EAN-13": ("ean13", 12),
+    "EAN-8": ("ean8", 7),
+    "UPC-A": ("upca", 11),
+}
+
+# python-barcode's module width and quiet zone (mm) for each symbology
+LINEAR_MODULE_SIZES = {
+    "Code 39": (0.2, 2.54),
+    "Code 128": (0.2, 2.54),
+    "EAN-13": (0.33, 6.5),
+    "EAN-8": (0.33, 6.5),
+    "UPC-A": (0.33, 6.5),
+}
+
+# reportlab.graphics.barcode names and options used for render_mode "vector"
+VECTOR_BARCODES = {
+    "QR Code": ("QR", {"barBorder": QR_BORDER}),
+    "Code 39": ("Standard39", {"humanReadable": True}),
+    "Code 128": ("Code128", {"humanReadable": True}),
+    "EAN-13": ("EAN13", {}),
+    "EAN-8": ("EAN8", {}),
+    "UPC-A": ("UPCA", {}),
+}
+
+# Bar height of vector Code 39/128 relative to symbol width, close to python-barcode's PNG proportions
+VECTOR_BAR_HEIGHT_RATIO = 0.6
+
+_image_cache = None
+
+
+@lru_cache(maxsize=16)
+def _truetype(font_path, size):
+    """python-barcode loads its font for every image; load each size once per process"""
+    return ImageFont.truetype(font_path, size)
+
+
+if HAS_BARCODE:
+    class _ArrayImageWriter(ImageWriter):
+        """
+        ImageWriter that lays out the bars as one NumPy row, broadcast down the bar
+        height, and only draws the human-readable text with PIL. Bar edges and text
+        position follow ImageWriter, so the image is the same pixel for pixel.
+        Guard bars (EAN "G" modules) and custom colours fall back to ImageWriter.
+        """
+
+        def _module_columns(self, xpos, width):
+            """First and past-the-end pixel column of a module (PIL truncates rectangle corners)"""
+            return int(mm2px(xpos, self.dpi)), int(mm2px(xpos + width, self.dpi) - 1) + 1
+
+        def render(self, code):
+            if not HAS_NUMPY or len(code) != 1 or "G" in code[0] or \
+                    (self.foreground, self.background) != ("black", "white"):
+                return super().render(code)
+
+            line = code[0]
+            width, height = self.calculate_size(len(line), 1)
+            size = (int(mm2px(width, self.dpi)), int(mm2px(height, self.dpi)))
+            bars = np.zeros(size[0], dtype=bool)
+            xpos = self.quiet_zone
+            for modules, _height_factor in self.packed(line):
+                if modules > 0:
+                    left, right = self._module_columns(xpos, self.module_width * modules)
+                    bars[max(left, 0):right] = True
+                xpos += self.module_width * abs(modules)
+
+            top = int(mm2px(self.margin_top, self.dpi))
+            bottom = int(mm2px(self.margin_top + self.module_height, self.dpi)) + 1
+            if self.mode == "1":
+                pixels = np.ones((size[1], size[0]), dtype=bool)
+                pixels[top:bottom] = ~bars
+            else:
+                pixels = np.full((size[1], size[0]), 255, dtype=np.uint8)
+                pixels[top:bottom] = np.where(bars, 0, 255)
+            self._image = Image.fromarray(pixels)
+            if self.mode not in ("1", "L"):
+                self._image = self._image.convert(self.mode)
+            self._draw = ImageDraw.Draw(self._image)
+
+            if self.text:
+                bxs = self.quiet_zone
+                text_x = bxs + (xpos - bxs) / 2.0 if self.center_text else bxs
+                self._paint_text(text_x, self.margin_top + self.module_height + self.text_distance)
+            return self._image
+
+        def _paint_text(self, xpos, ypos):
+            """ImageWriter._paint_text with the font loaded once per size"""
+            font_size = int(mm2px(pt2mm(self.font_size), self.dpi))
+            if font_size <= 0:
+                return
+            font = _truetype(self.font_path, font_size)
+            for subtext in (self.human if self.human != "" else self.text).split("\n"):
+                pos = (mm2px(xpos, self.dpi), mm2px(ypos, self.dpi))
+                self._draw.text(pos, subtext, font=font, fill=self.foreground, anchor="md")
+                ypos += pt2mm(self.font_size) / 2 + self.text_line_distance
+
+    class _BilevelImageWriter(_ArrayImageWriter):
+        """Writer that snaps bar edges to whole pixels, so every module has the same width"""
+
+        def _module_columns(self, xpos, width):
+            return round(mm2px(xpos, self.dpi)), round(mm2px(xpos + width, self.dpi))
+
+        def _paint_module(self, xpos, ypos, width, color):
+            left, right = self._module_columns(xpos, width)
+            size = [
+                (left, mm2px(ypos, self.dpi)),
+                (right - 1, mm2px(ypos + self.module_height, self.dpi))
+            ]
+            self._draw.rectangle(size, outline=color, fill=color)
+
+
+def _get_image_cache():
+    """Create the process-wide barcode bitmap cache on first use"""
+    global _image_cache
+    if _image_cache is None:
+        maxsize = frappe.conf.get("label_creator_barcode_cache_size") or DEFAULT_BARCODE_CACHE_SIZE
+        _image_cache = LRUCache(int(maxsize))
+    return _image_cache
+
+
+def resolve_barcode_type(barcode_type):
+    """
+    Return the barcode type that will actually be rendered.
+    If python-barcode module is not installed, falls back to QR Code.
+    """
+    if not HAS_BARCODE and barcode_type != "QR Code":
+        frappe.msgprint(
+            f"python-barcode module is not installed. Falling back to QR Code instead of {barcode_type}.<br><br>"
+            "To enable other barcode types, run: <code>bench pip install python-barcode</code>",
+            title="Barcode Module Not Available",
+            indicator="orange"
+        )
+        return "QR Code"  # Fallback to QR Code
+    return barcode_type
+
+
+def barcode_data(sku, barcode_type):
+    """
+    Return the value actually encoded for a SKU.
+    EAN/UPC symbologies take digits only, padded or truncated to their fixed length.
+    """
+    digits = LINEAR_BARCODES.get(barcode_type, (None, None))[1]
+    if digits:
+        return ''.join(filter(str.isdigit, sku))[:digits].zfill(digits)
+    return sku
+
+
+def _modules_bitmap(modules, box_size, border):
+    """A "1" mode image of a QR module matrix: box_size pixels per module, border modules of quiet zone"""
+    dark = np.pad(np.array(modules, dtype=bool), border)
+    return Image.fromarray(~np.kron(dark, np.ones((box_size, box_size), dtype=bool)))
+
+
+def _render_qr(sku, box_size=QR_BOX_SIZE):
+    qr = qrcode.QRCode(box_size=box_size, border=QR_BORDER)
+    qr.add_data(sku)
+    qr.make(fit=True)
+    if HAS_NUMPY:
+        return _modules_bitmap(qr.modules, box_size, QR_BORDER)
+    return qr.make_image(fill_color="black", back_color="white").get_image()
+
+
+def _render_bilevel_linear(barcode_class, value, barcode_type):
+    """
+    Render a linear barcode in "1" mode with each module a whole number of pixels.
+    The resolution is adjusted rather than the module width, so the symbol keeps
+    python-barcode's proportions; the quiet zone is rounded to whole pixels too.
+    """
+    module_width, quiet_zone = LINEAR_MODULE_SIZES[barcode_type]
+    pixels = max(1, round(module_width * BILEVEL_LINEAR_DPI / 25.4))
+    dpi = pixels * 25.4 / module_width
+    quiet_zone = round(quiet_zone * dpi / 25.4) * 25.4 / dpi
+    writer = _BilevelImageWriter(mode="1", dpi=dpi)
+    return barcode_class(value, writer=writer).render({"module_width": module_width, "quiet_zone": quiet_zone})
+
+
+def render_barcode(sku, barcode_type="QR Code", bilevel=False):
+    """
+    Render the barcode/QR code for a SKU as a PIL image, without touching disk:
+    QR codes in "1" mode, linear barcodes in "L" mode.
+    Supports: QR Code, Code 39, Code 128, EAN-13, EAN-8, UPC-A
+    Unknown types and encoding errors fall back to QR Code.
+
+    With bilevel, the image is black and white ("1" mode) at module resolution
+    (see BILEVEL_QR_BOX_SIZE / BILEVEL_LINEAR_DPI).
+    """
+    barcode_type = resolve_barcode_type(barcode_type)
+    box_size = BILEVEL_QR_BOX_SIZE if bilevel else QR_BOX_SIZE
+
+    try:
+        if barcode_type in LINEAR_BARCODES:
+            barcode_class = barcode.get_barcode_class(LINEAR_BARCODES[barcode_type][0])
+            if bilevel:
+                return _render_bilevel_linear(barcode_class, barcode_data(sku, barcode_type), barcode_type)
+            return barcode_class(barcode_data(sku, barcode_type), writer=_ArrayImageWriter(mode="L")).render()
+        return _render_qr(sku, box_size)
+    except Exception as e:
+        # On error, fallback to QR Code
+        frappe.log_error(f"Error generating {barcode_type} for {sku}: {str(e)}", "Barcode Generation Error")
+        return _render_qr(sku, box_size)
+
+
+def barcode_filename(sku, barcode_type):
+    """Sanitize SKU for filename"""
+    safe_sku = "".join(c if c.isalnum() or c in "-_" else "_" for c in sku)
+    return f"{safe_sku}_{barcode_type.replace(' ', '_').replace('-', '_')}.png"
+
+
+def get_or_create_barcode(sku, barcode_dir, barcode_type="QR Code"):
+    """
+    Retrieve (or generate) the barcode/QR code image file for a given SKU.
+    Supports: QR Code, Code 39, Code 128, EAN-13, EAN-8, UPC-A
+
+    If python-barcode module is not installed, falls back to QR Code.
+    """
+    barcode_type = resolve_barcode_type(barcode_type)
+    barcode_path = os.path.join(barcode_dir, barcode_filename(sku, barcode_type))
+
+    if not os.path.exists(barcode_path):
+        render_barcode(sku, barcode_type).save(barcode_path)
+
+    return barcode_path
+
+
+# Keep old function for backwards compatibility
+def get_or_create_qr(sku, qr_dir):
+    """
+    Backwards compatibility wrapper for get_or_create_barcode
+    """
+    return get_or_create_barcode(sku, qr_dir, "QR Code")
+
+
+def _compact(image):
+    """Keep cached bitmaps small: QR codes stay 1-bit, linear barcodes become grayscale"""
+    if image.mode not in ("1", "L"):
+        image = image.convert("L")
+    image.load()
+    return image
+
+
+def _barcode_bitmap(sku, barcode_type, barcode_dir=None):
+    """
+    Return a SKU's barcode bitmap (PIL image) and its form name.
+
+    Bitmaps are held in a process-wide LRU keyed by (sku, barcode type, encoding
+    parameters), so repeated SKUs never touch disk. New bitmaps go straight from
+    the renderer into the LRU. Only when barcode_dir is given (see
+    label_generator.get_qr_dir) does it act as a second tier: misses are loaded
+    from that directory, and new bitmaps are also saved there.
+    """
+    barcode_type = resolve_barcode_type(barcode_type)
+    key = (sku, barcode_type, QR_BOX_SIZE, QR_BORDER)
+    cache = _get_image_cache()
+
+    encoded = cache.get(key)
+    if encoded is None:
+        barcode_path = os.path.join(barcode_dir, barcode_filename(sku, barcode_type)) if barcode_dir else None
+        if barcode_path and os.path.exists(barcode_path):
+            with Image.open(barcode_path) as disk_image:
+                image = _compact(disk_image.copy())
+        else:
+            image = _compact(render_barcode(sku, barcode_type))
+            if barcode_path:
+                image.save(barcode_path)
+        name = "bitmap" + hashlib.md5(repr(key).encode()).hexdigest()
+        encoded = (name, image)
+        cache.set(key, encoded)
+    return encoded
+
+
+def get_barcode_image(sku, barcode_type="QR Code", barcode_dir=None):
+    """Return a ReportLab ImageReader for a SKU's barcode (see _barcode_bitmap for caching)"""
+    # ImageReader caches the decoded RGB data, so wrap per call and let it go with the page
+    return ImageReader(_barcode_bitmap(sku, barcode_type, barcode_dir)[1])
+
+
+def _draw_bitmap_form(c, name, image, x, y, size):
+    """
+    Draw a bitmap scaled to fit the size x size box at (x, y), centred like
+    drawImage(preserveAspectRatio=True). The bitmap is drawn inline into a form
+    named name the first time the document needs it and placed by name from then on.
+    """
+    width, height = image.size
+    if not c.hasForm(name):
+        c.beginForm(name, 0, 0, width, height)
+        c.drawInlineImage(image, 0, 0, width, height)
+        c.endForm()
+
+    scale = min(size / width, size / height)
+    c.saveState()
+    c.translate(x + (size - width * scale) / 2, y + (size - height * scale) / 2)
+    c.scale(scale, scale)
+    c.doForm(name)
+    c.restoreState()
+
+
+def draw_barcode_image(c, sku, barcode_type, x, y, size, barcode_dir=None):
+    """
+    Draw the barcode bitmap scaled to fit the size x size box at (x, y), like
+    drawImage(preserveAspectRatio=True).
+
+    drawImage decodes and hashes the whole bitmap on every call to find out
+    whether it is already in the document. On a ReportLab canvas each SKU's
+    bitmap becomes a form once per document instead; other canvases (see
+    label_raster) get drawImage.
+    """
+    name, image = _barcode_bitmap(sku, barcode_type, barcode_dir)
+    if isinstance(c, Canvas):
+        _draw_bitmap_form(c, name, image, x, y, size)
+    else:
+        c.drawImage(ImageReader(image), x, y, width=size, height=size, preserveAspectRatio=True, mask='auto')
+
+
+def get_bilevel_barcode(sku, barcode_type="QR Code"):
+    """
+    Return a SKU's barcode as (form name, black and white "1" mode image at module
+    resolution). The name follows the pixels, so SKUs that encode the same value
+    share one form. Shares the barcode LRU.
+    """
+    barcode_type = resolve_barcode_type(barcode_type)
+    key = (sku, barcode_type, "bilevel")
+    cache = _get_image_cache()
+
+    encoded = cache.get(key)
+    if encoded is None:
+        image = render_barcode(sku, barcode_type, bilevel=True)
+        if image.mode != "1":
+            image = image.convert("1")
+        digest = hashlib.md5(b"%dx%d:" % image.size + image.tobytes()).hexdigest()
+        encoded = ("barcode" + digest, image)
+        cache.set(key, encoded)
+    return encoded
+
+
+def draw_bilevel_barcode(c, sku, barcode_type, x, y, size):
+    """
+    Draw the barcode as a 1-bit image scaled to fit the size x size box at (x, y),
+    centred like drawImage(preserveAspectRatio=True).
+
+    canvas.drawImage expands every bitmap to 8 bits per pixel, while inline images
+    keep "1" mode bitmaps at one bit.
+    """
+    name, image = get_bilevel_barcode(sku, barcode_type)
+    _draw_bitmap_form(c, name, image, x, y, size)
+
+
+def _build_vector_drawing(sku, barcode_type):
+    code_name, options = VECTOR_BARCODES.get(barcode_type, VECTOR_BARCODES["QR Code"])
+    value = barcode_data(sku, barcode_type)
+    drawing = createBarcodeDrawing(code_name, value=value, **options)
+    if code_name in ("Standard39", "Code128"):
+        drawing = createBarcodeDrawing(
+            code_name, value=value, barHeight=drawing.width * VECTOR_BAR_HEIGHT_RATIO, **options
+        )
+    return drawing
+
+
+def get_vector_barcode(sku, barcode_type="QR Code"):
+    """
+    Return a ReportLab Drawing of the SKU's barcode made of PDF paths (no PNG).
+    Drawings share the barcode LRU with the raster bitmaps.
+    """
+    key = (sku, barcode_type, "vector")
+    cache = _get_image_cache()
+
+    drawing = cache.get(key)
+    if drawing is None:
+        try:
+            drawing = _build_vector_drawing(sku, barcode_type)
+        except Exception as e:
+            # On error, fallback to QR Code
+            frappe.log_error(f"Error generating vector {barcode_type} for {sku}: {str(e)}", "Barcode Generation Error")
+            drawing = _build_vector_drawing(sku, "QR Code")
+        cache.set(key, drawing)
+    return drawing
+
+
+def draw_vector_barcode(c, sku, barcode_type, x, y, size):
+    """
+    Draw the barcode as vector paths scaled to fit the size x size box at (x, y),
+    centred like drawImage(preserveAspectRatio=True).
+    """
+    drawing = get_vector_barcode(sku, barcode_type)
+    scale = min(size / drawing.width, size / drawing.height)
+
+    c.saveState()
+    c.translate(x + (size - drawing.width * scale) / 2, y + (size - drawing.height * scale) / 2)
+    c.scale(scale, scale)
+    renderPDF.draw(drawing, c, 0, 0)
+    c.restoreState()
+
+
+def get_barcode_cache_stats():
+    """Return size, hit rate and evictions for the barcode bitmap cache"""
+    return _get_image_cache().stats()
+
+
+def clear_barcode_cache():
+    """Drop all cached barcode bitmaps"""
+    _get_image_cache().clear()
@@ -0,0 +1,345 @@
+import codecs
+import csv
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# pyarrow is optional: without it Format 2 files are summed row by row
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from pyarrow import csv as pa_csv
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Format 1: product, sku, quantity, display_price
+FORMAT1_FIELDS = {'product', 'sku', 'quantity', 'display_price'}
+# Format 2: name, sku, retail_price (+ inventory_* quantity columns)
+FORMAT2_FIELDS = {'name', 'sku', 'retail_price'}
+
+# Under engine="auto", Format 2 files with at least this many inventory_* columns
+# are read with the pyarrow engine
+COLUMNAR_MIN_INVENTORY_COLUMNS = 8
+# Bytes pyarrow parses per record batch in the columnar engine
+COLUMNAR_BLOCK_SIZE = 1 << 20
+
+
+def open_text_stream(binary_stream, encoding="utf-8-sig"):
+    """
+    Wrap an uploaded file's binary stream for csv.reader without reading it into memory.
+    utf-8-sig drops the BOM Excel puts in front of the header.
+    """
+    return io.TextIOWrapper(binary_stream, encoding=encoding, errors="replace", newline="")
+
+
+def missing_columns_message(filename, header_map):
+    missing_from_format1 = FORMAT1_FIELDS - set(header_map.keys())
+    missing_from_format2 = FORMAT2_FIELDS - set(header_map.keys())
+
+    return (
+        f"File '{filename}' is missing required columns.\n\n"
+        f"Expected Format 1 columns: product, sku, quantity, display_price\n"
+        f"Missing: {', '.join(missing_from_format1)}\n\n"
+        f"OR\n\n"
+        f"Expected Format 2 columns: name, sku, retail_price\n"
+        f"Missing: {', '.join(missing_from_format2)}\n\n"
+        f"Found columns: {', '.join(header_map.keys())}"
+    )
+
+
+def new_aggregate():
+    """Per-file result: items by SKU (first occurrence wins product/price), label total, diagnostics"""
+    return {"items": {}, "total_labels": 0, "skipped_rows": [], "error": None}
+
+
+def _add(aggregate, sku, product, display_price, quantity):
+    items = aggregate["items"]
+    if sku not in items:
+        items[sku] = {
+            "sku": sku,
+            "product": product,
+            "display_price": display_price,
+            "quantity": 0
+        }
+    items[sku]["quantity"] += quantity
+    aggregate["total_labels"] += quantity
+
+
+def parse_labels_csv(text_stream, filename, engine="auto"):
+    """
+    Parse one CSV (Format 1 or Format 2) incrementally and aggregate it by SKU.
+
+    text_stream is any iterable of lines, e.g. open_text_stream(upload.stream);
+    rows are consumed one at a time, so memory grows with unique SKUs rather than
+    file size, and quoted fields may contain newlines. Blank lines are ignored.
+    Returns an aggregate (see new_aggregate); "error" is set when the file cannot
+    be used at all.
+
+    engine picks how Format 2 inventory columns are summed: "auto" uses the
+    columnar pyarrow engine for wide files when installed, "columnar" whenever
+    installed, "python" always row by row. The columnar engine needs a seekable
+    UTF-8 stream from open_text_stream: it reads the bytes underneath in blocks,
+    and starts over row by row on anything it cannot reproduce exactly (ragged or
+    blank rows, invalid UTF-8, non-ASCII or huge quantities).
+    """
+    aggregate = new_aggregate()
+    skipped_rows = aggregate["skipped_rows"]
+    byte_stream = _utf8_byte_stream(text_stream)
+    start = text_stream.tell() if byte_stream is not None else None
+    reader = csv.reader(text_stream)
+
+    # Header is the first non-blank row
+    row_number = 0
+    header = None
+    for row in reader:
+        row_number += 1
+        if any(col.strip() for col in row):
+            header = row
+            break
+
+    if header is None:
+        aggregate["error"] = f"File '{filename}' is empty"
+        return aggregate
+
+    # Normalize header names (strip whitespace, lowercase)
+    header_map = {col.strip().lower(): idx for idx, col in enumerate(header)}
+
+    has_format1 = FORMAT1_FIELDS.issubset(header_map)
+    has_format2 = FORMAT2_FIELDS.issubset(header_map)
+
+    if not has_format1 and not has_format2:
+        aggregate["error"] = missing_columns_message(filename, header_map)
+        return aggregate
+
+    sku_idx = header_map['sku']
+    if has_format1:
+        # Process File Type 1: product, sku, quantity, display_price
+        product_idx = header_map['product']
+        price_idx = header_map['display_price']
+        quantity_idxs = None
+        quantity_idx = header_map['quantity']
+    else:
+        # Process File Type 2: name, sku, retail_price
+        product_idx = header_map['name']
+        price_idx = header_map['retail_price']
+        quantity_idxs = [idx for col, idx in header_map.items() if col.startswith('inventory_')]
+
+    # pyarrow skips the header by lines, so it must not hold quoted line breaks
+    if (quantity_idxs is not None and byte_stream is not None and reader.line_num == row_number
+            and use_columnar(engine, len(quantity_idxs))):
+        text_stream.seek(start)
+        if _aggregate_format2_columnar(byte_stream, row_number, filename, len(header),
+                                       sku_idx, product_idx, price_idx, quantity_idxs, aggregate):
+            return aggregate
+        text_stream.seek(start)
+        return parse_labels_csv(text_stream, filename, engine="python")
+
+    for row in reader:
+        row_number += 1
+        if not row:
+            continue
+        try:
+            sku = row[sku_idx].strip()
+            product = row[product_idx].strip()
+            display_price = "{:.2f}".format(float(row[price_idx]))
+            if quantity_idxs is None:
+                quantity = int(row[quantity_idx])
+            else:
+                quantity = sum(int(row[idx]) for idx in quantity_idxs if row[idx].isdigit())
+
+            if not sku:  # Skip rows with empty SKU
+                skipped_rows.append(f"{filename}:row {row_number} - empty SKU")
+                continue
+
+            _add(aggregate, sku, product, display_price, quantity)
+        except ValueError as e:
+            skipped_rows.append(f"{filename}:row {row_number} - invalid value: {str(e)}")
+        except IndexError:
+            skipped_rows.append(f"{filename}:row {row_number} - missing column")
+
+    return aggregate
+
+
+def use_columnar(engine, inventory_columns):
+    """Whether a Format 2 file with this many inventory_* columns goes through pyarrow"""
+    if engine == "python" or not HAS_PYARROW or not inventory_columns:
+        return False
+    return engine == "columnar" or inventory_columns >= COLUMNAR_MIN_INVENTORY_COLUMNS
+
+
+def _utf8_byte_stream(text_stream):
+    """The seekable binary stream under a UTF-8 text stream, or None"""
+    buffer = getattr(text_stream, "buffer", None)
+    if buffer is None or not buffer.seekable():
+        return None
+    if codecs.lookup(text_stream.encoding).name not in ("utf-8", "utf-8-sig"):
+        return None
+    return buffer
+
+
+class _BlankLineWatch:
+    """
+    Byte stream handed to pyarrow that notes any blank line: csv.reader skips
+    those but still counts them, pyarrow turns them into rows of empty values
+    """
+    closed = False
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.last_byte = b""
+        self.blank_line = False
+
+    def read(self, size=-1):
+        data = self.stream.read(size)
+        if data and not self.blank_line:
+            window = self.last_byte + data
+            self.blank_line = b"\n\n" in window or b"\n\r" in window or b"\r\r" in window
+            self.last_byte = data[-1:]
+        return data
+
+
+def _aggregate_format2_columnar(byte_stream, row_number, filename, column_count,
+                                sku_idx, product_idx, price_idx, quantity_idxs, aggregate):
+    """
+    Columnar Format 2 path: byte_stream (positioned at the start of the file,
+    whose header ends at row_number) is parsed by pyarrow's streaming CSV reader
+    and aggregated one record batch at a time, so memory stays at one block plus
+    the SKUs seen. Returns False when the file needs the row-by-row rules;
+    aggregate may then hold part of the file.
+    """
+    names = [f"f{idx}" for idx in range(column_count)]
+    source = _BlankLineWatch(byte_stream)
+    try:
+        batches = pa_csv.open_csv(
+            source,
+            read_options=pa_csv.ReadOptions(column_names=names, skip_rows=row_number,
+                                              block_size=COLUMNAR_BLOCK_SIZE),
+            parse_options=pa_csv.ParseOptions(newlines_in_values=True, ignore_empty_lines=False),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=[names[idx] for idx in sorted({sku_idx, product_idx, price_idx, *quantity_idxs})],
+                column_types=dict.fromkeys(names, pa.string()),
+                strings_can_be_null=False,
+                quoted_strings_can_be_null=False
+            )
+        )
+        for batch in batches:
+            if source.blank_line:
+                return False
+            if not _aggregate_format2_batch(batch, row_number, filename, names,
+                                            sku_idx, product_idx, price_idx, quantity_idxs, aggregate):
+                return False
+            row_number += batch.num_rows
+    except pa.ArrowException:
+        return False
+    return not source.blank_line
+
+
+def _aggregate_format2_batch(batch, row_number, filename, names,
+                             sku_idx, product_idx, price_idx, quantity_idxs, aggregate):
+    """
+    Add one record batch (rows after row_number) to aggregate: the inventory_*
+    columns are summed as int64 arrays and valid rows are grouped by SKU in Arrow.
+    Prices and SKUs go through Python's float()/str.strip() once per distinct
+    value, so items and skipped-row messages match the row-by-row loop exactly.
+    Returns False, leaving aggregate untouched, when the batch needs the row-by-row rules.
+    """
+    row_count = batch.num_rows
+    if not row_count:
+        return True
+
+    quantities = None
+    for idx in quantity_idxs:
+        cells = batch.column(names[idx])
+        # Only 0-9 are digits in ASCII; elsewhere str.isdigit() and int() disagree with Arrow
+        if not pc.all(pc.string_is_ascii(cells)).as_py():
+            return False
+        # Values beyond int64 make the cast (or the checked add) raise
+        values = pc.cast(pc.if_else(pc.ascii_is_decimal(cells), cells, "0"), pa.int64())
+        quantities = values if quantities is None else pc.add_checked(quantities, values)
+    if (pc.max(quantities).as_py() or 0) * row_count >= 2 ** 63:
+        return False  # group sums could overflow int64
+
+    skus = batch.column(names[sku_idx])
+    prices = batch.column(names[price_idx])
+
+    display_prices = {}
+    price_errors = {}
+    for price in pc.unique(prices).to_pylist():
+        try:
+            display_prices[price] = "{:.2f}".format(float(price))
+        except ValueError as e:
+            price_errors[price] = f"invalid value: {str(e)}"
+    blank_skus = [sku for sku in pc.unique(skus).to_pylist() if not sku.strip()]
+
+    # Skipped rows in row order; a bad price is reported before an empty SKU
+    bad_price = pc.is_in(prices, value_set=pa.array(list(price_errors), pa.string()))
+    empty_sku = pc.and_not(pc.is_in(skus, value_set=pa.array(blank_skus, pa.string())), bad_price)
+    skipped = pc.indices_nonzero(pc.or_(bad_price, empty_sku)).to_pylist()
+    if skipped:
+        skipped_prices = prices.take(skipped).to_pylist()
+        for offset, price in zip(skipped, skipped_prices):
+            reason = price_errors.get(price, "empty SKU")
+            aggregate["skipped_rows"].append(f"{filename}:row {row_number + offset + 1} - {reason}")
+
+    valid = pa.table({"sku": skus, "row": pa.array(range(row_count), pa.int64()), "quantity": quantities})
+    valid = valid.filter(pc.invert(pc.or_(bad_price, empty_sku)))
+    groups = valid.group_by("sku").aggregate([("quantity", "sum"), ("row", "min")]).sort_by("row_min")
+    first_rows = groups.column("row_min")
+    products = batch.column(names[product_idx]).take(first_rows).to_pylist()
+    first_prices = prices.take(first_rows).to_pylist()
+
+    # Raw SKUs in first-occurrence order; _add merges the ones that strip to the same
+    # SKU and keeps the product and price of the earliest row
+    for sku, product, price, quantity in zip(groups.column("sku").to_pylist(), products,
+                                             first_prices, groups.column("quantity_sum").to_pylist()):
+        _add(aggregate, sku.strip(), product.strip(), display_prices[price], quantity)
+    return True
+
+
+def merge_aggregates(aggregates):
+    """
+    Combine per-file aggregates in the given (upload) order, exactly as if the
+    files had been parsed one after another: earlier files win product/price,
+    quantities add up. The first file error is returned as-is.
+    """
+    merged = new_aggregate()
+    for aggregate in aggregates:
+        if aggregate["error"]:
+            merged["error"] = aggregate["error"]
+            return merged
+
+        items = merged["items"]
+        for sku, item in aggregate["items"].items():
+            if sku in items:
+                items[sku]["quantity"] += item["quantity"]
+            else:
+                items[sku] = dict(item)
+        merged["total_labels"] += aggregate["total_labels"]
+        merged["skipped_rows"].extend(aggregate["skipped_rows"])
+    return merged
+
+
+def parse_source(source):
+    """
+    Parse one upload described as (kind, value, filename):
+    "path" - a CSV file on disk, "stream" - a binary stream, "text" - the CSV content.
+    Module-level so it can run in a worker process.
+    """
+    kind, value, filename = source
+    if kind == "path":
+        with open(value, "rb") as f:
+            return parse_labels_csv(open_text_stream(f), filename)
+    if kind == "stream":
+        return parse_labels_csv(open_text_stream(value), filename)
+    return parse_labels_csv(io.StringIO(value, newline=""), filename)
+
+
+def parse_sources_parallel(sources, workers):
+    """
+    Parse "path"/"text" sources concurrently in a process pool.
+    Aggregates come back in input order, ready for merge_aggregates.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(workers, len(sources)), mp_context=ctx) as pool:
+        return list(pool.map(parse_source, sources))
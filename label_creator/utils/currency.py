@@ -0,0 +1,191 @@
+import threading
+
+import frappe
+
+# Frappe number formats: (decimal separator, group separator, precision)
+NUMBER_FORMATS = {
+    "#,###.##": (".", ",", 2),
+    "#.###,##": (",", ".", 2),
+    "# ###.##": (".", " ", 2),
+    "# ###,##": (",", " ", 2),
+    "#'###.##": (".", "'", 2),
+    "#, ###.##": (".", ", ", 2),
+    "#,##,###.##": (".", ",", 2),
+    "#,###.###": (".", ",", 3),
+    "#.###": ("", ".", 0),
+    "#,###": ("", ",", 0),
+    "#.########": (".", "", 8),
+}
+
+DEFAULT_CURRENCY_INFO = {
+    'symbol': '$',
+    'symbol_on_right': 0,
+    'number_format': '#,##0.00'
+}
+
+# Bumped in redis on every Currency change so other workers drop their copies too
+GENERATION_KEY = "label_creator:currency_generation"
+
+_lock = threading.Lock()
+_cache = {}  # (site, currency_code) -> (currency_info, formatter)
+_generation = None
+_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def _group_digits(digits, group_sep, indian=False):
+    """Insert group separators into a string of integer digits"""
+    if not group_sep or len(digits) <= 3:
+        return digits
+
+    head, tail = digits[:-3], digits[-3:]
+    step = 2 if indian else 3
+    groups = []
+    while head:
+        groups.insert(0, head[-step:])
+        head = head[:-step]
+    return group_sep.join(groups + [tail])
+
+
+def make_price_formatter(currency_info):
+    """
+    Compile a currency's symbol placement and number_format into a function
+    price -> formatted string. Formats Frappe does not define keep the plain
+    two-decimal rendering.
+    """
+    symbol = currency_info.get('symbol', '$')
+    symbol_on_right = currency_info.get('symbol_on_right', 0)
+    number_format = currency_info.get('number_format')
+
+    if number_format in NUMBER_FORMATS:
+        decimal_sep, group_sep, precision = NUMBER_FORMATS[number_format]
+        indian = number_format == "#,##,###.##"
+
+        def format_number(value):
+            sign = "-" if value < 0 else ""
+            whole, _, fraction = f"{abs(value):.{precision}f}".partition(".")
+            number = _group_digits(whole, group_sep, indian)
+            if precision:
+                number += decimal_sep + fraction
+            return sign + number
+    else:
+        def format_number(value):
+            return f"{value:.2f}"
+
+    # Place symbol based on symbol_on_right setting
+    if symbol_on_right:
+        def formatter(price):
+            return f"{format_number(float(price))}{symbol}"
+    else:
+        def formatter(price):
+            return f"{symbol}{format_number(float(price))}"
+
+    return formatter
+
+
+def _load_currency_info(currency_code):
+    """Read a Currency document; falls back to USD formatting"""
+    try:
+        if currency_code and frappe.db.exists("Currency", currency_code):
+            currency = frappe.get_doc("Currency", currency_code)
+            return {
+                'symbol': currency.symbol or '$',
+                'symbol_on_right': currency.symbol_on_right or 0,
+                'number_format': currency.number_format or '#,##0.00'
+            }
+    except Exception as e:
+        frappe.log_error(f"Error fetching currency {currency_code}: {str(e)}", "Currency Fetch Error")
+
+    # Default to USD format
+    return dict(DEFAULT_CURRENCY_INFO)
+
+
+def sync_currency_cache():
+    """
+    Drop local entries when another worker has invalidated the currency cache.
+    One redis read; called once per request or job (see label_config), so
+    lookups themselves stay in-process.
+    """
+    global _generation
+    try:
+        generation = frappe.cache().get_value(GENERATION_KEY)
+    except Exception:
+        # Redis unavailable - rely on local doc_events invalidation only
+        return
+
+    with _lock:
+        if generation != _generation:
+            _cache.clear()
+            _generation = generation
+
+
+def _resolve(currency_code):
+    key = (getattr(frappe.local, "site", None), currency_code)
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None:
+            _stats["hits"] += 1
+            return entry
+        _stats["misses"] += 1
+
+    info = _load_currency_info(currency_code)
+    entry = (info, make_price_formatter(info))
+    with _lock:
+        _cache[key] = entry
+    return entry
+
+
+def get_currency_info(currency_code):
+    """
+    Get currency information from ERPNext Currency doctype
+    Returns dict with symbol, symbol_on_right, and number_format
+
+    Results are cached per process and invalidated by Currency doc_events
+    (other workers pick up the change at their next sync_currency_cache).
+    """
+    return dict(_resolve(currency_code)[0])
+
+
+def get_price_formatter(currency_code):
+    """Return the cached price formatter for a currency"""
+    return _resolve(currency_code)[1]
+
+
+def format_price(price, currency_info):
+    """
+    Format price with currency symbol based on currency settings
+    """
+    return make_price_formatter(currency_info)(price)
+
+
+def clear_currency_cache(doc=None, method=None):
+    """
+    Invalidate cached currency info.
+    Wired to Currency on_update/on_trash in hooks.py; with no doc, clears everything.
+    """
+    global _generation
+    with _lock:
+        if doc is None:
+            _cache.clear()
+        else:
+            for key in [k for k in _cache if k[1] == doc.name]:
+                del _cache[key]
+        _stats["invalidations"] += 1
+
+        try:
+            _generation = frappe.generate_hash(length=10)
+            frappe.cache().set_value(GENERATION_KEY, _generation)
+        except Exception:
+            pass
+
+
+def get_currency_cache_stats():
+    """Return hit/miss counters for the currency cache"""
+    with _lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        return {
+            "size": len(_cache),
+            "hits": _stats["hits"],
+            "misses": _stats["misses"],
+            "invalidations": _stats["invalidations"],
+            "hit_rate": round(_stats["hits"] / lookups, 4) if lookups else 0.0
+        }
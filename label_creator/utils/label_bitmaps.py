@@ -0,0 +1,176 @@
+import io
+import multiprocessing
+import os
+import tempfile
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import frappe
+from PIL import Image, TiffImagePlugin
+
+from label_creator.utils.label_generator import _init_render_worker, get_label_config, write_labels_pdf
+from label_creator.utils.label_thermal import get_printer_dpi
+from label_creator.utils.pdf_cache import get_cached_pdf, pdf_cache_key, store_pdf
+
+# PyMuPDF rasterizes the rendered PDF pages
+try:
+    import fitz  # PyMuPDF
+    HAS_PYMUPDF = True
+except ImportError:
+    HAS_PYMUPDF = False
+
+# Bitmap output formats and their file extensions: a multi-page TIFF, or a ZIP of PNG pages
+BITMAP_FORMATS = {"tiff": "tiff", "png": "zip"}
+
+# "1" is black and white, "L" 8-bit grayscale
+BITMAP_MODES = ("1", "L")
+
+# Resolutions accepted for bitmap pages (a 600 dpi Letter page is ~34 MB in grayscale)
+MIN_BITMAP_DPI = 72
+MAX_BITMAP_DPI = 600
+
+# Pages per worker task; a worker keeps one uncompressed page in memory at a time
+PAGES_PER_TASK = 4
+
+# Black and white pages are thresholded rather than dithered so bar edges stay sharp
+_THRESHOLD = [0] * 128 + [255] * 128
+
+
+def get_raster_workers():
+    """Worker processes for rasterizing pages ("label_creator_raster_workers" in site config)"""
+    return int(frappe.conf.get("label_creator_raster_workers") or min(os.cpu_count() or 1, 4))
+
+
+def _rasterize_pages(pdf_path, first, last, dpi, mode, image_format):
+    """
+    Worker entry point: rasterize pages first..last-1 of a PDF and return each
+    one encoded (single-page TIFF or PNG bytes), in order.
+    """
+    pages = []
+    matrix = fitz.Matrix(dpi / 72, dpi / 72)
+    with fitz.open(pdf_path) as document:
+        for number in range(first, last):
+            pix = document[number].get_pixmap(matrix=matrix, colorspace=fitz.csGRAY, alpha=False)
+            image = Image.frombytes("L", (pix.width, pix.height), pix.samples)
+            pix = None
+            if mode == "1":
+                image = image.point(_THRESHOLD, "1")
+
+            buffer = io.BytesIO()
+            if image_format == "tiff":
+                compression = "group4" if mode == "1" else "tiff_adobe_deflate"
+                image.save(buffer, format="TIFF", compression=compression, dpi=(dpi, dpi))
+            else:
+                image.save(buffer, format="PNG", dpi=(dpi, dpi))
+            pages.append(buffer.getvalue())
+    return pages
+
+
+def _rasterized_pages(pdf_path, page_count, dpi, mode, image_format, workers):
+    """
+    Yield encoded pages in order. With several workers, page ranges are
+    rasterized in a process pool (PyMuPDF is not thread-safe) with at most two
+    tasks per worker in flight, so finished pages never pile up in memory.
+    """
+    tasks = [(first, min(first + PAGES_PER_TASK, page_count)) for first in range(0, page_count, PAGES_PER_TASK)]
+    if workers <= 1 or len(tasks) <= 1:
+        for first, last in tasks:
+            yield from _rasterize_pages(pdf_path, first, last, dpi, mode, image_format)
+        return
+
+    # spawn: never fork a web worker holding DB connections
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(tasks)),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_render_worker,
+        initargs=(frappe.local.site, frappe.local.sites_path)
+    ) as executor:
+        pending = deque()
+        for first, last in tasks:
+            pending.append(executor.submit(_rasterize_pages, pdf_path, first, last, dpi, mode, image_format))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def _write_pages(f, pages, output_format):
+    """Stream encoded pages into a multi-page TIFF or a ZIP of PNGs"""
+    if output_format == "tiff":
+        # Appends each page's TIFF data and chains the IFDs, without decoding the pages
+        with TiffImagePlugin.AppendingTiffWriter(f, new=True) as tiff:
+            for page in pages:
+                tiff.write(page)
+                tiff.newFrame()
+        return
+
+    # PNG data is already compressed
+    with zipfile.ZipFile(f, "w", zipfile.ZIP_STORED) as archive:
+        for number, page in enumerate(pages, 1):
+            archive.writestr(f"page_{number:04d}.png", page)
+
+
+def write_labels_bitmaps(output, labels_data, config, output_format, dpi=None, mode="1", workers=None):
+    """
+    Render labels as print-ready bitmaps into output, a file path or a seekable
+    read/write binary file object: output_format "tiff" writes one multi-page
+    TIFF (Group 4 for black and white), "png" a ZIP with one PNG per page.
+
+    The job is rendered to a temporary PDF with write_labels_pdf and its pages
+    rasterized at dpi (default: label_creator_printer_dpi) by PyMuPDF, across
+    `workers` processes (default: label_creator_raster_workers).
+    """
+    if not HAS_PYMUPDF:
+        raise ImportError("PyMuPDF is required for bitmap output. Install it with: bench pip install PyMuPDF")
+    if output_format not in BITMAP_FORMATS:
+        raise ValueError(f"Unsupported bitmap format: {output_format}")
+    if mode not in BITMAP_MODES:
+        raise ValueError(f"Unsupported bitmap mode: {mode} (use '1' for black and white or 'L' for grayscale)")
+    dpi = int(dpi or get_printer_dpi())
+    if not MIN_BITMAP_DPI <= dpi <= MAX_BITMAP_DPI:
+        raise ValueError(f"Bitmap resolution must be between {MIN_BITMAP_DPI} and {MAX_BITMAP_DPI} dpi")
+
+    with tempfile.TemporaryDirectory(prefix="label_bitmaps_") as tmp_dir:
+        pdf_path = os.path.join(tmp_dir, "labels.pdf")
+        # Compact PDFs carry module-resolution barcodes; rasterize from the full-resolution ones
+        write_labels_pdf(pdf_path, labels_data, config, profile="standard")
+        with fitz.open(pdf_path) as document:
+            page_count = document.page_count
+
+        pages = _rasterized_pages(pdf_path, page_count, dpi, mode, output_format, workers or get_raster_workers())
+        if isinstance(output, str):
+            with open(output, "w+b") as f:
+                _write_pages(f, pages, output_format)
+        else:
+            _write_pages(output, pages, output_format)
+
+
+def labels_bitmap_filename(config, output_format):
+    """Download name for bitmap pages: {YYYYMMDD}_{file_name}.tiff / .zip"""
+    return f"{datetime.now().strftime('%Y%m%d')}_{config['file_name']}.{BITMAP_FORMATS[output_format]}"
+
+
+def create_labels_bitmaps(labels_data, label_type, output_format, dpi=None, mode="1"):
+    """
+    Render labels as a multi-page TIFF or ZIP of PNGs into the PDF cache
+    (private files) and return the path. Cached next to the PDFs under a content hash
+    that includes the format, resolution and mode.
+    """
+    try:
+        config = get_label_config(label_type)
+        dpi = int(dpi or get_printer_dpi())
+
+        key = pdf_cache_key(label_type, config, labels_data, output_format=output_format, dpi=dpi, bitmap_mode=mode)
+        extension = BITMAP_FORMATS.get(output_format, output_format)
+        cached_path = get_cached_pdf(key, extension)
+        if cached_path:
+            return cached_path
+
+        return store_pdf(key, lambda path: write_labels_bitmaps(path, labels_data, config, output_format, dpi, mode),
+                         extension)
+
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), "Create Label Bitmaps Error")
+        raise
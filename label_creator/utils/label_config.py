@@ -0,0 +1,210 @@
+import threading
+
+import frappe
+
+from label_creator.utils.currency import sync_currency_cache
+
+# Redis hash (site-scoped by frappe.cache) holding resolved configs by Label Type name
+REDIS_KEY = "label_creator:label_type_config"
+
+_lock = threading.Lock()
+_cache = {}  # (site, label_type) -> {"modified", "label", "preview"}
+_stats = {"hits": 0, "redis_hits": 0, "misses": 0, "invalidations": 0}
+
+
+def build_config_from_label_type(label_type_doc):
+    """
+    Build a complete configuration dictionary from a Label Type document
+    This ensures consistency between preview and label generation
+    """
+    return {
+        "label_width": label_type_doc.label_width,
+        "label_height": label_type_doc.label_height,
+        "label_orientation": label_type_doc.label_orientation or "portrait",
+        "offset_input_mode": label_type_doc.get("offset_input_mode") or "Percentage",
+        "barcode_type": label_type_doc.get("barcode_type") or "QR Code",
+        "barcode_render_mode": label_type_doc.get("barcode_render_mode") or "raster",
+        "qrcode_x_offset": label_type_doc.qrcode_x_offset or 0,
+        "qrcode_y_offset": label_type_doc.qrcode_y_offset or 0,
+        "qrcode_x_offset_pct": label_type_doc.get("qrcode_x_offset_pct") or 0,
+        "qrcode_y_offset_pct": label_type_doc.get("qrcode_y_offset_pct") or 0,
+        "qrcode_size_inch": label_type_doc.get("qrcode_size_inch") or None,
+        "qrcode_size_pct": label_type_doc.get("qrcode_size_pct") or None,
+        "sku_x_offset": label_type_doc.sku_x_offset or 0,
+        "sku_y_offset": label_type_doc.sku_y_offset or 0,
+        "sku_x_offset_pct": label_type_doc.get("sku_x_offset_pct") or 0,
+        "sku_y_offset_pct": label_type_doc.get("sku_y_offset_pct") or 0,
+        "sku_font_type": label_type_doc.get("sku_font_type") or "Helvetica",
+        "sku_font_size": label_type_doc.get("sku_font_size") or 7,
+        "sku_max_word_length": label_type_doc.get("sku_max_word_length") or 9,
+        "sku_text_align": label_type_doc.get("sku_text_align") or "Centre",
+        "product_name_x_offset": label_type_doc.get("product_name_x_offset") or 0,
+        "product_name_y_offset": label_type_doc.get("product_name_y_offset") or 0,
+        "product_name_x_offset_pct": label_type_doc.get("product_name_x_offset_pct") or 0,
+        "product_name_y_offset_pct": label_type_doc.get("product_name_y_offset_pct") or 0,
+        "product_name_font_type": label_type_doc.get("product_name_font_type") or "Helvetica",
+        "product_name_font_size": label_type_doc.get("product_name_font_size") or 6,
+        "product_name_max_word_length": label_type_doc.get("product_name_max_word_length") or 9,
+        "product_name_text_align": label_type_doc.get("product_name_text_align") or "Left",
+        "currency": label_type_doc.get("currency") or "CAD",
+        "price_x_offset": label_type_doc.price_x_offset or 0,
+        "price_y_offset": label_type_doc.price_y_offset or 0,
+        "price_x_offset_pct": label_type_doc.get("price_x_offset_pct") or 0,
+        "price_y_offset_pct": label_type_doc.get("price_y_offset_pct") or 0,
+        "price_rotation": label_type_doc.price_rotation or 0,
+        "price_font_type": label_type_doc.get("price_font_type") or "Helvetica-Bold",
+        "price_font_size": label_type_doc.get("price_font_size") or 8,
+        "show_qr_code": label_type_doc.get("show_qr_code", 1),
+        "show_sku": label_type_doc.get("show_sku", 1),
+        "show_product_name": label_type_doc.show_product_name or 0,
+        "show_price": label_type_doc.get("show_price", 1)
+    }
+
+
+def build_label_config(lt):
+    """
+    Build the page and label configuration used for PDF generation from a
+    Label Type document or get_all row
+    """
+    return {
+        "name": lt.display_name,
+        "label_width": lt.label_width,
+        "label_height": lt.label_height,
+        "labels_per_row": lt.labels_per_row,
+        "labels_per_column": lt.labels_per_column,
+        "label_orientation": lt.label_orientation or "portrait",
+        "page_width_inch": lt.page_width_inch,
+        "page_height_inch": lt.page_height_inch,
+        "margin_top": lt.margin_top or 0,
+        "margin_bottom": lt.margin_bottom or 0,
+        "margin_left": lt.margin_left or 0,
+        "margin_right": lt.margin_right or 0,
+        "offset_input_mode": lt.get("offset_input_mode") or "Percentage",
+        "barcode_type": lt.get("barcode_type") or "QR Code",
+        "barcode_render_mode": lt.get("barcode_render_mode") or "raster",
+        "show_qr_code": lt.get("show_qr_code", 1),
+        "qrcode_x_offset": lt.qrcode_x_offset or 0,
+        "qrcode_y_offset": lt.qrcode_y_offset or 0,
+        "qrcode_x_offset_pct": lt.get("qrcode_x_offset_pct") or 0,
+        "qrcode_y_offset_pct": lt.get("qrcode_y_offset_pct") or 0,
+        "qrcode_size_inch": lt.get("qrcode_size_inch") or None,
+        "qrcode_size_pct": lt.get("qrcode_size_pct") or None,
+        "show_sku": lt.get("show_sku", 1),
+        "sku_sample": lt.get("sku_sample") or "SAM-PLE-SKU",
+        "sku_x_offset": lt.sku_x_offset or 0,
+        "sku_y_offset": lt.sku_y_offset or 0,
+        "sku_font_type": lt.get("sku_font_type") or "Helvetica",
+        "sku_font_size": lt.get("sku_font_size") or 7,
+        "sku_max_word_length": lt.get("sku_max_word_length") or 9,
+        "sku_text_align": lt.get("sku_text_align") or "Centre",
+        "show_product_name": lt.get("show_product_name", 0),
+        "product_name_sample": lt.get("product_name_sample") or "Sample Product Name",
+        "product_name_x_offset": lt.get("product_name_x_offset") or 0,
+        "product_name_y_offset": lt.get("product_name_y_offset") or 0,
+        "product_name_font_type": lt.get("product_name_font_type") or "Helvetica",
+        "product_name_font_size": lt.get("product_name_font_size") or 6,
+        "product_name_max_word_length": lt.get("product_name_max_word_length") or 9,
+        "product_name_text_align": lt.get("product_name_text_align") or "Left",
+        "show_price": lt.get("show_price", 1),
+        "price_sample": lt.get("price_sample") or 29.99,
+        "currency": lt.get("currency") or "CAD",
+        "price_x_offset": lt.price_x_offset or 0,
+        "price_y_offset": lt.price_y_offset or 0,
+        "price_rotation": lt.price_rotation or 0,
+        "price_font_type": lt.get("price_font_type") or "Helvetica-Bold",
+        "price_font_size": lt.get("price_font_size") or 10,
+        "file_name": lt.file_name or "labels"
+    }
+
+
+def _resolve(label_type):
+    """
+    Return the cached entry for a Label Type, rebuilding it when the document's
+    `modified` timestamp no longer matches. Local dict first, then redis.
+    Every request or job resolves its Label Type before formatting prices, so
+    this is also where Currency changes from other workers are picked up.
+    """
+    sync_currency_cache()
+    modified = frappe.db.get_value("Label Type", label_type, "modified")
+    if modified is None:
+        raise ValueError(f"Unsupported label type: {label_type}")
+    modified = str(modified)
+
+    key = (getattr(frappe.local, "site", None), label_type)
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry["modified"] == modified:
+            _stats["hits"] += 1
+            return entry
+
+    try:
+        entry = frappe.cache().hget(REDIS_KEY, label_type)
+    except Exception:
+        # Redis unavailable - fall back to the local tier only
+        entry = None
+
+    if entry and entry.get("modified") == modified:
+        stat = "redis_hits"
+    else:
+        stat = "misses"
+        doc = frappe.get_doc("Label Type", label_type)
+        entry = {
+            "modified": modified,
+            "label": build_label_config(doc),
+            "preview": build_config_from_label_type(doc)
+        }
+        try:
+            frappe.cache().hset(REDIS_KEY, label_type, entry)
+        except Exception:
+            pass
+
+    with _lock:
+        _stats[stat] += 1
+        _cache[key] = entry
+    return entry
+
+
+def get_label_type_config(label_type):
+    """
+    Return the PDF generation config of one Label Type (see build_label_config).
+    Raises ValueError for unknown types.
+    """
+    return dict(_resolve(label_type)["label"])
+
+
+def get_label_type_preview_config(label_type):
+    """Return the preview config of one Label Type (see build_config_from_label_type)"""
+    return dict(_resolve(label_type)["preview"])
+
+
+def clear_label_type_cache(label_type=None):
+    """
+    Drop cached configs for one Label Type, or all of them.
+    Called from LabelType.on_update/on_trash.
+    """
+    with _lock:
+        for key in [k for k in _cache if label_type is None or k[1] == label_type]:
+            del _cache[key]
+        _stats["invalidations"] += 1
+
+    try:
+        if label_type is None:
+            frappe.cache().delete_value(REDIS_KEY)
+        else:
+            frappe.cache().hdel(REDIS_KEY, label_type)
+    except Exception:
+        pass
+
+
+def get_label_type_cache_stats():
+    """Return hit/miss counters for the Label Type config cache"""
+    with _lock:
+        lookups = _stats["hits"] + _stats["redis_hits"] + _stats["misses"]
+        return {
+            "size": len(_cache),
+            "hits": _stats["hits"],
+            "redis_hits": _stats["redis_hits"],
+            "misses": _stats["misses"],
+            "invalidations": _stats["invalidations"],
+            "hit_rate": round((_stats["hits"] + _stats["redis_hits"]) / lookups, 4) if lookups else 0.0
+        }
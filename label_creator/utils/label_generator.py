@@ -1,115 +1,37 @@
 import os
 import json
-import qrcode
 import frappe
+from collections.abc import Callable
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
 from datetime import datetime
+from reportlab import rl_config
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import inch
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.platypus import Paragraph
+from label_creator.utils.label_config import build_config_from_label_type, build_label_config, get_label_type_config
+from label_creator.utils.currency import get_currency_info, get_price_formatter, make_price_formatter, format_price
+from label_creator.utils.barcodes import (
+    HAS_BARCODE, get_or_create_barcode, get_or_create_qr, get_barcode_image, draw_barcode_image, draw_bilevel_barcode, draw_vector_barcode
+)
+from label_creator.utils.pdf_cache import get_cached_pdf, pdf_cache_key, store_pdf
+from label_creator.utils.cache import LRUCache
+from label_creator.utils.text_metrics import text_width, text_width_units
+from reportlab.pdfbase import pdfmetrics
 
-# Lazy import for barcode module - only imported when needed
-# This prevents the entire module from failing if barcode is not installed
-try:
-    import barcode
-    from barcode.writer import ImageWriter
-    HAS_BARCODE = True
-except ImportError:
-    HAS_BARCODE = False
-    frappe.log_error(
-        "python-barcode module is not installed. Only QR codes will be available.\n\n"
-        "To install: bench pip install python-barcode",
-        "Barcode Module Not Found"
-    )
-
-
-def get_currency_info(currency_code):
-    """
-    Get currency information from ERPNext Currency doctype
-    Returns dict with symbol, symbol_on_right, and number_format
-    """
-    try:
-        if currency_code and frappe.db.exists("Currency", currency_code):
-            currency = frappe.get_doc("Currency", currency_code)
-            return {
-                'symbol': currency.symbol or '$',
-                'symbol_on_right': currency.symbol_on_right or 0,
-                'number_format': currency.number_format or '#,##0.00'
-            }
-    except Exception as e:
-        frappe.log_error(f"Error fetching currency {currency_code}: {str(e)}", "Currency Fetch Error")
-
-    # Default to USD format
-    return {
-        'symbol': '$',
-        'symbol_on_right': 0,
-        'number_format': '#,##0.00'
-    }
+# Smallest job (in pages) worth the start-up cost of worker processes
+PARALLEL_MIN_PAGES = 20
 
+# Number of wrapped texts memoized per process
+WRAP_CACHE_SIZE = 4096
 
-def format_price(price, currency_info):
-    """
-    Format price with currency symbol based on currency settings
-    """
-    symbol = currency_info.get('symbol', '$')
-    symbol_on_right = currency_info.get('symbol_on_right', 0)
+# PDF output profiles. "compact" writes binary (not ASCII85) compressed streams,
+# 1-bit barcode images at module resolution and standard PDF fonts only.
+# The default is "label_creator_pdf_profile" in site_config.json, else "standard".
+PDF_PROFILES = ("standard", "compact")
 
-    # Format the price as a float with 2 decimal places
-    formatted_price = f"{float(price):.2f}"
-
-    # Place symbol based on symbol_on_right setting
-    if symbol_on_right:
-        return f"{formatted_price}{symbol}"
-    else:
-        return f"{symbol}{formatted_price}"
-
-
-def build_config_from_label_type(label_type_doc):
-    """
-    Build a complete configuration dictionary from a Label Type document
-    This ensures consistency between preview and label generation
-    """
-    return {
-        "label_width": label_type_doc.label_width,
-        "label_height": label_type_doc.label_height,
-        "label_orientation": label_type_doc.label_orientation or "portrait",
-        "offset_input_mode": label_type_doc.get("offset_input_mode") or "Percentage",
-        "barcode_type": label_type_doc.get("barcode_type") or "QR Code",
-        "qrcode_x_offset": label_type_doc.qrcode_x_offset or 0,
-        "qrcode_y_offset": label_type_doc.qrcode_y_offset or 0,
-        "qrcode_x_offset_pct": label_type_doc.get("qrcode_x_offset_pct") or 0,
-        "qrcode_y_offset_pct": label_type_doc.get("qrcode_y_offset_pct") or 0,
-        "qrcode_size_inch": label_type_doc.get("qrcode_size_inch") or None,
-        "qrcode_size_pct": label_type_doc.get("qrcode_size_pct") or None,
-        "sku_x_offset": label_type_doc.sku_x_offset or 0,
-        "sku_y_offset": label_type_doc.sku_y_offset or 0,
-        "sku_x_offset_pct": label_type_doc.get("sku_x_offset_pct") or 0,
-        "sku_y_offset_pct": label_type_doc.get("sku_y_offset_pct") or 0,
-        "sku_font_type": label_type_doc.get("sku_font_type") or "Helvetica",
-        "sku_font_size": label_type_doc.get("sku_font_size") or 7,
-        "sku_max_word_length": label_type_doc.get("sku_max_word_length") or 9,
-        "sku_text_align": label_type_doc.get("sku_text_align") or "Centre",
-        "product_name_x_offset": label_type_doc.get("product_name_x_offset") or 0,
-        "product_name_y_offset": label_type_doc.get("product_name_y_offset") or 0,
-        "product_name_x_offset_pct": label_type_doc.get("product_name_x_offset_pct") or 0,
-        "product_name_y_offset_pct": label_type_doc.get("product_name_y_offset_pct") or 0,
-        "product_name_font_type": label_type_doc.get("product_name_font_type") or "Helvetica",
-        "product_name_font_size": label_type_doc.get("product_name_font_size") or 6,
-        "product_name_max_word_length": label_type_doc.get("product_name_max_word_length") or 9,
-        "product_name_text_align": label_type_doc.get("product_name_text_align") or "Left",
-        "currency": label_type_doc.get("currency") or "CAD",
-        "price_x_offset": label_type_doc.price_x_offset or 0,
-        "price_y_offset": label_type_doc.price_y_offset or 0,
-        "price_x_offset_pct": label_type_doc.get("price_x_offset_pct") or 0,
-        "price_y_offset_pct": label_type_doc.get("price_y_offset_pct") or 0,
-        "price_rotation": label_type_doc.price_rotation or 0,
-        "price_font_type": label_type_doc.get("price_font_type") or "Helvetica-Bold",
-        "price_font_size": label_type_doc.get("price_font_size") or 8,
-        "show_qr_code": label_type_doc.get("show_qr_code", 1),
-        "show_sku": label_type_doc.get("show_sku", 1),
-        "show_product_name": label_type_doc.show_product_name or 0,
-        "show_price": label_type_doc.get("show_price", 1)
-    }
+_wrap_cache = LRUCache(WRAP_CACHE_SIZE)
 
 
 def get_label_dimensions():
@@ -123,149 +45,161 @@ def get_label_dimensions():
         )
 
         # Convert to dictionary format for compatibility
-        data = {}
-        for lt in label_types_list:
-            data[lt.label_type_name] = {
-                "name": lt.display_name,
-                "label_width": lt.label_width,
-                "label_height": lt.label_height,
-                "labels_per_row": lt.labels_per_row,
-                "labels_per_column": lt.labels_per_column,
-                "label_orientation": lt.label_orientation or "portrait",
-                "page_width_inch": lt.page_width_inch,
-                "page_height_inch": lt.page_height_inch,
-                "margin_top": lt.margin_top or 0,
-                "margin_bottom": lt.margin_bottom or 0,
-                "margin_left": lt.margin_left or 0,
-                "margin_right": lt.margin_right or 0,
-                "offset_input_mode": lt.get("offset_input_mode") or "Percentage",
-                "barcode_type": lt.get("barcode_type") or "QR Code",
-                "show_qr_code": lt.get("show_qr_code", 1),
-                "qrcode_x_offset": lt.qrcode_x_offset or 0,
-                "qrcode_y_offset": lt.qrcode_y_offset or 0,
-                "qrcode_x_offset_pct": lt.get("qrcode_x_offset_pct") or 0,
-                "qrcode_y_offset_pct": lt.get("qrcode_y_offset_pct") or 0,
-                "qrcode_size_inch": lt.get("qrcode_size_inch") or None,
-                "qrcode_size_pct": lt.get("qrcode_size_pct") or None,
-                "show_sku": lt.get("show_sku", 1),
-                "sku_sample": lt.get("sku_sample") or "SAM-PLE-SKU",
-                "sku_x_offset": lt.sku_x_offset or 0,
-                "sku_y_offset": lt.sku_y_offset or 0,
-                "sku_font_type": lt.get("sku_font_type") or "Helvetica",
-                "sku_font_size": lt.get("sku_font_size") or 7,
-                "sku_max_word_length": lt.get("sku_max_word_length") or 9,
-                "sku_text_align": lt.get("sku_text_align") or "Centre",
-                "show_product_name": lt.get("show_product_name", 0),
-                "product_name_sample": lt.get("product_name_sample") or "Sample Product Name",
-                "product_name_x_offset": lt.get("product_name_x_offset") or 0,
-                "product_name_y_offset": lt.get("product_name_y_offset") or 0,
-                "product_name_font_type": lt.get("product_name_font_type") or "Helvetica",
-                "product_name_font_size": lt.get("product_name_font_size") or 6,
-                "product_name_max_word_length": lt.get("product_name_max_word_length") or 9,
-                "product_name_text_align": lt.get("product_name_text_align") or "Left",
-                "show_price": lt.get("show_price", 1),
-                "price_sample": lt.get("price_sample") or 29.99,
-                "currency": lt.get("currency") or "CAD",
-                "price_x_offset": lt.price_x_offset or 0,
-                "price_y_offset": lt.price_y_offset or 0,
-                "price_rotation": lt.price_rotation or 0,
-                "price_font_type": lt.get("price_font_type") or "Helvetica-Bold",
-                "price_font_size": lt.get("price_font_size") or 10,
-                "file_name": lt.file_name or "labels"
-            }
-        return data
+        return {lt.label_type_name: build_label_config(lt) for lt in label_types_list}
     except Exception as e:
         frappe.log_error(frappe.get_traceback(), "Load Label Dimensions Error")
         raise
 
 
-def get_or_create_barcode(sku, barcode_dir, barcode_type="QR Code"):
+@dataclass(frozen=True, slots=True)
+class BarcodeLayout:
+    """Resolved barcode placement; x/y is the image's bottom-left corner relative to the label's top-left"""
+    x: float
+    y: float
+    size: float
+
+
+@dataclass(frozen=True, slots=True)
+class TextLayout:
+    """Resolved text block; x/y is the first line's baseline relative to the label's top-left"""
+    x: float
+    y: float
+    font_name: str
+    font_size: float
+    leading: float
+    align: str
+    available_width: float
+    max_word_length: int | None
+
+
+@dataclass(frozen=True, slots=True)
+class PriceLayout:
     """
-    Retrieve (or generate) the barcode/QR code image for a given SKU.
-    Supports: QR Code, Code 39, Code 128, EAN-13, EAN-8, UPC-A
+    Resolved price placement relative to the label's top-left.
+    rotation is None for the portrait baseline layout; otherwise x/y is the rotation centre.
+    """
+    x: float
+    y: float
+    font_name: str
+    font_size: float
+    rotation: float | None
+
 
-    If python-barcode module is not installed, falls back to QR Code.
+@dataclass(frozen=True, slots=True)
+class LabelLayout:
     """
-    # Check if barcode module is available for non-QR code types
-    if not HAS_BARCODE and barcode_type != "QR Code":
-        frappe.msgprint(
-            f"python-barcode module is not installed. Falling back to QR Code instead of {barcode_type}.<br><br>"
-            "To enable other barcode types, run: <code>bench pip install python-barcode</code>",
-            title="Barcode Module Not Available",
-            indicator="orange"
-        )
-        barcode_type = "QR Code"  # Fallback to QR Code
+    Compiled, immutable layout for one Label Type.
+
+    Built once per job by build_label_layout so that draw_label does not
+    re-read the config dict, convert units or resolve fonts for every label.
+    All values are in points. Hidden elements are None.
+    """
+    width: float
+    height: float
+    orientation: str
+    barcode_type: str
+    barcode_render_mode: str
+    price_formatter: Callable[[object], str]
+    qr: BarcodeLayout | None
+    sku: TextLayout | None
+    product_name: TextLayout | None
+    price: PriceLayout | None
+
+
+def _build_text_layout(config, prefix, default_font, default_size, default_align, label_width_pts):
+    """Resolve one wrapped text block (SKU or product name) from config"""
+    # Offsets: X from LEFT edge (positive = right), Y from TOP edge (positive = down)
+    x_offset = config.get(f"{prefix}_x_offset", 0) * 72
+    y_offset = config.get(f"{prefix}_y_offset", 0) * 72
+    font_size = config.get(f"{prefix}_font_size", default_size)
+
+    return TextLayout(
+        x=x_offset,
+        y=-y_offset - font_size,
+        font_name=config.get(f"{prefix}_font_type", default_font),
+        font_size=font_size,
+        leading=font_size * 1.2,  # 1.2 = line spacing
+        align=config.get(f"{prefix}_text_align", default_align),
+        available_width=label_width_pts - x_offset - 10,  # 10pt right margin
+        max_word_length=config.get(f"{prefix}_max_word_length")
+    )
 
-    # Sanitize SKU for filename
-    safe_sku = "".join(c if c.isalnum() or c in "-_" else "_" for c in sku)
-    barcode_filename = f"{safe_sku}_{barcode_type.replace(' ', '_').replace('-', '_')}.png"
-    barcode_path = os.path.join(barcode_dir, barcode_filename)
 
-    if os.path.exists(barcode_path):
-        return barcode_path
+def build_label_layout(config, currency_info=None):
+    """
+    Compile a label configuration dictionary into a LabelLayout.
+    Accepts the dicts produced by build_config_from_label_type and get_label_dimensions.
 
-    try:
-        if barcode_type == "QR Code":
-            # Generate QR Code
-            qr = qrcode.QRCode(box_size=10, border=1)
-            qr.add_data(sku)
-            qr.make(fit=True)
-            qr_img = qr.make_image(fill_color="black", back_color="white")
-            qr_img.save(barcode_path)
-        elif barcode_type == "Code 39":
-            # Generate Code 39 barcode
-            code39 = barcode.get_barcode_class('code39')
-            barcode_img = code39(sku, writer=ImageWriter())
-            barcode_img.save(barcode_path.replace('.png', ''))  # Library adds .png automatically
-        elif barcode_type == "Code 128":
-            # Generate Code 128 barcode
-            code128 = barcode.get_barcode_class('code128')
-            barcode_img = code128(sku, writer=ImageWriter())
-            barcode_img.save(barcode_path.replace('.png', ''))
-        elif barcode_type == "EAN-13":
-            # EAN-13 requires exactly 12 digits (13th is checksum)
-            # Pad or truncate SKU to 12 digits
-            ean_sku = ''.join(filter(str.isdigit, sku))[:12].zfill(12)
-            ean13 = barcode.get_barcode_class('ean13')
-            barcode_img = ean13(ean_sku, writer=ImageWriter())
-            barcode_img.save(barcode_path.replace('.png', ''))
-        elif barcode_type == "EAN-8":
-            # EAN-8 requires exactly 7 digits (8th is checksum)
-            ean_sku = ''.join(filter(str.isdigit, sku))[:7].zfill(7)
-            ean8 = barcode.get_barcode_class('ean8')
-            barcode_img = ean8(ean_sku, writer=ImageWriter())
-            barcode_img.save(barcode_path.replace('.png', ''))
-        elif barcode_type == "UPC-A":
-            # UPC-A requires exactly 11 digits (12th is checksum)
-            upc_sku = ''.join(filter(str.isdigit, sku))[:11].zfill(11)
-            upca = barcode.get_barcode_class('upca')
-            barcode_img = upca(upc_sku, writer=ImageWriter())
-            barcode_img.save(barcode_path.replace('.png', ''))
+    currency_info may be passed pre-resolved (worker processes do this to skip the
+    Currency lookup); otherwise the cached formatter for config["currency"] is used.
+    """
+    orientation = config.get("label_orientation", "portrait").lower()
+    landscape = orientation == "landscape"
+
+    # Convert label dimensions from inches to points (1 inch = 72 points)
+    label_width_pts = config.get("label_width", 1) * 72
+    label_height_pts = config.get("label_height", 1) * 72
+
+    qr = None
+    if config.get("show_qr_code", True):
+        # Default: 80% of label height (landscape) or smaller of width / 40% height (portrait)
+        if landscape:
+            default_size = label_height_pts * 0.8
         else:
-            # Fallback to QR Code
-            qr = qrcode.QRCode(box_size=10, border=1)
-            qr.add_data(sku)
-            qr.make(fit=True)
-            qr_img = qr.make_image(fill_color="black", back_color="white")
-            qr_img.save(barcode_path)
-    except Exception as e:
-        # On error, fallback to QR Code
-        frappe.log_error(f"Error generating {barcode_type} for {sku}: {str(e)}", "Barcode Generation Error")
-        qr = qrcode.QRCode(box_size=10, border=1)
-        qr.add_data(sku)
-        qr.make(fit=True)
-        qr_img = qr.make_image(fill_color="black", back_color="white")
-        qr_img.save(barcode_path)
+            default_size = min(label_width_pts, label_height_pts * 0.4)
 
-    return barcode_path
+        # Calculate QR code size based on offset input mode
+        if config.get("offset_input_mode", "Percentage") == "Inches":
+            qr_size_inch = config.get("qrcode_size_inch")
+            qr_size_pts = qr_size_inch * inch if qr_size_inch else default_size
+        else:
+            qr_size_pct = config.get("qrcode_size_pct")
+            qr_size_pts = (qr_size_pct / 100.0) * label_width_pts if qr_size_pct else default_size
+
+        # Subtract the size because drawImage uses the bottom-left corner
+        qr = BarcodeLayout(
+            x=config.get("qrcode_x_offset", 0) * 72,
+            y=-config.get("qrcode_y_offset", 0) * 72 - qr_size_pts,
+            size=qr_size_pts
+        )
 
+    sku = None
+    if config.get("show_sku", True):
+        sku = _build_text_layout(config, "sku", "Helvetica", 7, "Centre", label_width_pts)
+
+    product_name = None
+    if config.get("show_product_name", False):
+        product_name = _build_text_layout(config, "product_name", "Helvetica", 6, "Left", label_width_pts)
+
+    price = None
+    if config.get("show_price", True):
+        price_font_size = config.get("price_font_size", 10)
+        price_y = -config.get("price_y_offset", 0) * 72
+        price = PriceLayout(
+            x=config.get("price_x_offset", 0) * 72,
+            # Landscape rotates around the offset point; portrait uses it as the top of the text
+            y=price_y if landscape else price_y - price_font_size,
+            font_name=config.get("price_font_type", "Helvetica-Bold"),
+            font_size=price_font_size,
+            rotation=config.get("price_rotation", 90) if landscape else None
+        )
 
-# Keep old function for backwards compatibility
-def get_or_create_qr(sku, qr_dir):
-    """
-    Backwards compatibility wrapper for get_or_create_barcode
-    """
-    return get_or_create_barcode(sku, qr_dir, "QR Code")
+    return LabelLayout(
+        width=label_width_pts,
+        height=label_height_pts,
+        orientation=orientation,
+        barcode_type=config.get("barcode_type", "QR Code"),
+        barcode_render_mode=(config.get("barcode_render_mode") or "raster").lower(),
+        # Currency symbol and number_format compiled once (cached per process)
+        price_formatter=(
+            make_price_formatter(currency_info) if currency_info
+            else get_price_formatter(config.get("currency", "CAD"))
+        ),
+        qr=qr,
+        sku=sku,
+        product_name=product_name,
+        price=price
+    )
 
 
 def wrap_text(c, text, font_name, font_size, max_width_pts, max_word_length=None):
@@ -279,80 +213,114 @@ def wrap_text(c, text, font_name, font_size, max_width_pts, max_word_length=None
     3. If max_word_length is set and any part exceeds it, split at character boundaries
 
     This ensures Max Word Length takes precedence before breaking on hyphens or spaces.
+
+    Results are memoized per (text, font, size, width, max_word_length), so a
+    product name repeated across labels is only wrapped once per process.
     """
-    import re
+    key = (text, font_name, font_size, max_width_pts, max_word_length)
+    lines = _wrap_cache.get(key)
+    if lines is None:
+        lines = tuple(_wrap_text(text, font_name, font_size, max_width_pts, max_word_length))
+        _wrap_cache.set(key, lines)
+    return list(lines)
 
-    # Split on spaces first
-    words = text.split()
-    lines = []
-    current_line = ""
 
-    for word in words:
-        # PRIORITY 1: Try to fit the whole word first (including hyphens)
-        test_line = current_line + (" " if current_line else "") + word
-        test_width = c.stringWidth(test_line, font_name, font_size)
+def get_wrap_cache_stats():
+    """Return size and hit rate of the wrap_text memo"""
+    return _wrap_cache.stats()
+
+
+def _split_word(word, max_word_length):
+    """
+    Break points for a word that does not fit on a line: hyphen parts
+    ("ABC-DEF" -> "ABC-", "DEF"), each cut into max_word_length chunks;
+    a word without hyphens is only chunked when longer than max_word_length.
+    """
+    if '-' in word:
+        parts = word.split('-')
+        parts = [p + '-' for p in parts[:-1]] + [parts[-1]]
+    elif max_word_length and len(word) > max_word_length:
+        parts = [word]
+    else:
+        return None
+
+    if not max_word_length:
+        return parts
+    return [
+        chunk
+        for part in parts
+        for chunk in ([part[i:i + max_word_length] for i in range(0, len(part), max_word_length)]
+                      if len(part) > max_word_length else [part])
+    ]
+
+
+def _wrap_text(text, font_name, font_size, max_width_pts, max_word_length=None):
+    """
+    Single-pass line breaker behind wrap_text.
+
+    Every token (word, hyphen part or chunk) is measured once in font units and
+    lines are packed by adding widths, instead of re-measuring the growing line.
+    Type 1 widths are integers, so the sums - and the fit decisions - are exactly
+    those of measuring the joined string. Widths are compared with the same
+    units * 0.001 * size expression ReportLab uses.
+    """
+    if text_width_units(" ", font_name) is None:
+        # No width table (e.g. TrueType): per-token widths from ReportLab
+        def units(token):
+            return pdfmetrics.stringWidth(token, font_name, 1000)
+    else:
+        def units(token):
+            return text_width_units(token, font_name)
 
-        if test_width <= max_width_pts:
-            # Word fits, add it
-            current_line = test_line
+    space = units(" ")
+    lines = []
+    pieces = []     # tokens of the current line, joined with single spaces
+    line_len = 0    # len(" ".join(pieces)); 0 means the line is empty
+    line_units = 0
+
+    def add(token, token_units):
+        nonlocal pieces, line_len, line_units
+        if line_len:
+            pieces.append(token)
+            line_len += 1 + len(token)
+            line_units += space + token_units
         else:
-            # Word doesn't fit within available width
-            if current_line:
-                lines.append(current_line)
-                current_line = ""
-
-            # PRIORITY 2: Check if word has hyphens - break on hyphens if needed
-            if '-' in word:
-                # Split on hyphens: "ABC-DEF-GHI" -> ["ABC-", "DEF-", "GHI"]
-                parts = word.split('-')
-                hyphen_parts = [p + '-' for p in parts[:-1]] + [parts[-1]]
-
-                # PRIORITY 3: If max_word_length is set, check each part and split if needed
-                if max_word_length:
-                    final_parts = []
-                    for part in hyphen_parts:
-                        if len(part) > max_word_length:
-                            # Split this part at character boundaries
-                            for i in range(0, len(part), max_word_length):
-                                final_parts.append(part[i:i+max_word_length])
-                        else:
-                            final_parts.append(part)
-                    hyphen_parts = final_parts
-
-                # Now try to fit parts on lines
-                for part in hyphen_parts:
-                    test_line = current_line + (" " if current_line else "") + part
-                    test_width = c.stringWidth(test_line, font_name, font_size)
-
-                    if test_width <= max_width_pts:
-                        current_line = test_line
-                    else:
-                        if current_line:
-                            lines.append(current_line)
-                        current_line = part
-            else:
-                # No hyphens in word
-                # PRIORITY 3: If max_word_length is set and word is too long, split at character boundaries
-                if max_word_length and len(word) > max_word_length:
-                    word_chunks = [word[i:i+max_word_length] for i in range(0, len(word), max_word_length)]
-
-                    for chunk in word_chunks:
-                        test_line = current_line + (" " if current_line else "") + chunk
-                        test_width = c.stringWidth(test_line, font_name, font_size)
-
-                        if test_width <= max_width_pts:
-                            current_line = test_line
-                        else:
-                            if current_line:
-                                lines.append(current_line)
-                            current_line = chunk
-                else:
-                    # Word doesn't fit and no way to split it, add it anyway
-                    current_line = word
-
-    if current_line:
-        lines.append(current_line)
+            pieces = [token]
+            line_len = len(token)
+            line_units = token_units
 
+    def flush():
+        nonlocal pieces, line_len, line_units
+        if line_len:
+            lines.append(" ".join(pieces))
+        pieces, line_len, line_units = [], 0, 0
+
+    for word in text.split():
+        # PRIORITY 1: Try to fit the whole word first (including hyphens)
+        word_units = units(word)
+        test_units = line_units + space + word_units if line_len else word_units
+        if test_units * 0.001 * font_size <= max_width_pts:
+            add(word, word_units)
+            continue
+
+        # Word doesn't fit within available width
+        flush()
+
+        # PRIORITY 2/3: break on hyphens, then at max_word_length characters
+        parts = _split_word(word, max_word_length)
+        if parts is None:
+            # Word doesn't fit and no way to split it, add it anyway
+            add(word, word_units)
+            continue
+
+        for part in parts:
+            part_units = units(part)
+            test_units = line_units + space + part_units if line_len else part_units
+            if test_units * 0.001 * font_size > max_width_pts:
+                flush()
+            add(part, part_units)
+
+    flush()
     return lines if lines else [text]
 
 
@@ -370,20 +338,20 @@ def draw_aligned_text(c, text, x, y, font_name, font_size, alignment="Left", ava
         alignment: "Left", "Centre", or "Right"
         available_width: Available width for Centre/Right alignment (in points)
     """
-    text_width = c.stringWidth(text, font_name, font_size)
+    width = text_width(text, font_name, font_size)
 
     if alignment == "Centre":
         # Center the text within available width
         if available_width:
-            draw_x = x + (available_width - text_width) / 2
+            draw_x = x + (available_width - width) / 2
         else:
-            draw_x = x - text_width / 2
+            draw_x = x - width / 2
     elif alignment == "Right":
         # Right align the text within available width
         if available_width:
-            draw_x = x + available_width - text_width
+            draw_x = x + available_width - width
         else:
-            draw_x = x - text_width
+            draw_x = x - width
     else:  # Left alignment (default)
         draw_x = x
 
@@ -398,15 +366,18 @@ def draw_rotated_text(c, text, center_x, center_y, angle, font_name="Helvetica-B
     c.translate(center_x, center_y)
     c.rotate(angle)
     c.setFont(font_name, font_size)
-    text_width = c.stringWidth(text, font_name, font_size)
-    c.drawString(-text_width/2, -font_size/2, text)
+    c.drawString(-text_width(text, font_name, font_size)/2, -font_size/2, text)
     c.restoreState()
 
 
-def draw_label(c, x, y, sku, name, price, label_width, label_height, config, qr_dir):
+def draw_label(c, x, y, sku, name, price, layout, qr_dir=None):
     """
     Draw a single label on the ReportLab canvas.
 
+    All geometry, fonts and sizes come pre-resolved from a LabelLayout (see
+    build_label_layout), so this only translates the layout to the label's
+    top-left corner (x, y) and fills in the per-label data.
+
     For landscape orientation:
       - The QR code is drawn on the left.
       - The SKU (and optionally the product name) is drawn to the right of the QR.
@@ -417,274 +388,395 @@ def draw_label(c, x, y, sku, name, price, label_width, label_height, config, qr_
       - The SKU (and optionally the product name) is drawn below the QR.
       - The price is drawn near the bottom.
     """
-    orientation = config.get("label_orientation", "portrait").lower()
+    # Draw the barcode/QR code if enabled
+    qr = layout.qr
+    if qr and layout.barcode_render_mode == "vector":
+        draw_vector_barcode(c, sku, layout.barcode_type, x + qr.x, y + qr.y, qr.size)
+    elif qr and layout.barcode_render_mode == "bilevel":
+        draw_bilevel_barcode(c, sku, layout.barcode_type, x + qr.x, y + qr.y, qr.size)
+    elif qr:
+        draw_barcode_image(c, sku, layout.barcode_type, x + qr.x, y + qr.y, qr.size, qr_dir)
+
+    # Draw the SKU and product name text with wrapping if enabled
+    for text, block in ((sku, layout.sku), (name, layout.product_name)):
+        if not block:
+            continue
+        lines = wrap_text(c, text, block.font_name, block.font_size, block.available_width, block.max_word_length)
+        text_x = x + block.x
+        text_y = y + block.y
+        c.setFont(block.font_name, block.font_size)
+
+        for i, line in enumerate(lines):
+            line_y = text_y - (i * block.leading)
+            draw_aligned_text(c, line, text_x, line_y, block.font_name, block.font_size, block.align, block.available_width)
+
+    # Draw the price if enabled
+    price_block = layout.price
+    if price_block:
+        price_text = layout.price_formatter(price)
+        if price_block.rotation is not None:
+            draw_rotated_text(c, price_text, x + price_block.x, y + price_block.y, angle=price_block.rotation,
+                              font_name=price_block.font_name, font_size=price_block.font_size)
+        else:
+            c.setFont(price_block.font_name, price_block.font_size)
+            c.drawString(x + price_block.x, y + price_block.y, price_text)
 
-    # Convert label dimensions from inches to points (1 inch = 72 points)
-    label_width_pts = label_width * 72
-    label_height_pts = label_height * 72
-
-    # Offsets are specified as positive values:
-    # - X offset: distance from LEFT edge of label (positive = move right)
-    # - Y offset: distance from TOP edge of label (positive = move down)
-    # Convert from inches to points here
-    qr_x_offset = config.get("qrcode_x_offset", 0) * 72
-    qr_y_offset = config.get("qrcode_y_offset", 0) * 72
-    sku_x_offset = config.get("sku_x_offset", 0) * 72
-    sku_y_offset = config.get("sku_y_offset", 0) * 72
-    product_name_x_offset = config.get("product_name_x_offset", 0) * 72
-    product_name_y_offset = config.get("product_name_y_offset", 0) * 72
-    price_x_offset = config.get("price_x_offset", 0) * 72
-    price_y_offset = config.get("price_y_offset", 0) * 72
-
-    # Font settings
-    sku_font_type = config.get("sku_font_type", "Helvetica")
-    sku_font_size = config.get("sku_font_size", 7)
-    sku_max_word_length = config.get("sku_max_word_length")
-    sku_text_align = config.get("sku_text_align", "Centre")
-    product_name_font_type = config.get("product_name_font_type", "Helvetica")
-    product_name_font_size = config.get("product_name_font_size", 6)
-    product_name_max_word_length = config.get("product_name_max_word_length")
-    product_name_text_align = config.get("product_name_text_align", "Left")
-    price_font_type = config.get("price_font_type", "Helvetica-Bold")
-    price_font_size = config.get("price_font_size", 10)
-
-    # Get currency information from ERPNext Currency doctype
-    currency_code = config.get("currency", "CAD")
-    currency_info = get_currency_info(currency_code)
-
-    # Retrieve (or generate) the barcode/QR code image
-    barcode_type = config.get("barcode_type", "QR Code")
-    qr_path = get_or_create_barcode(sku, qr_dir, barcode_type)
-
-    if orientation == "landscape":
-        # Landscape Layout
-        # Offsets are from: X = left edge, Y = top edge (positive Y goes down)
-
-        # Draw the QR code if enabled
-        if config.get("show_qr_code", True):
-            # Calculate QR code size based on offset input mode
-            offset_mode = config.get("offset_input_mode", "Percentage")
-            if offset_mode == "Inches":
-                # Use absolute size if specified, otherwise auto-calculate
-                qr_size_inch = config.get("qrcode_size_inch")
-                if qr_size_inch:
-                    qr_size_pts = qr_size_inch * inch
-                else:
-                    qr_size_pts = label_height_pts * 0.8  # Default: 80% of label height
-            else:  # Percentage mode
-                # Use percentage if specified, otherwise auto-calculate
-                qr_size_pct = config.get("qrcode_size_pct")
-                if qr_size_pct:
-                    qr_size_pts = (qr_size_pct / 100.0) * label_width_pts
-                else:
-                    qr_size_pts = label_height_pts * 0.8  # Default: 80% of label height
-
-            # Position from left edge + offset, and from top edge - offset
-            # (subtract qr_size_pts because drawImage uses bottom-left corner)
-            qr_x = x + qr_x_offset
-            qr_y = y - qr_y_offset - qr_size_pts
-
-            c.drawImage(
-                qr_path,
-                qr_x,
-                qr_y,
-                width=qr_size_pts,
-                height=qr_size_pts,
-                preserveAspectRatio=True,
-                mask='auto'
-            )
-
-        # Draw the SKU text with wrapping if enabled
-        if config.get("show_sku", True):
-            # Calculate available width (label width minus x offset and right margin)
-            available_width = label_width_pts - sku_x_offset - 10  # 10pt right margin
-            sku_lines = wrap_text(c, sku, sku_font_type, sku_font_size, available_width, sku_max_word_length)
-
-            sku_text_x = x + sku_x_offset
-            sku_text_y = y - sku_y_offset - sku_font_size
-            c.setFont(sku_font_type, sku_font_size)
-
-            for i, line in enumerate(sku_lines):
-                line_y = sku_text_y - (i * sku_font_size * 1.2)  # 1.2 = line spacing
-                draw_aligned_text(c, line, sku_text_x, line_y, sku_font_type, sku_font_size, sku_text_align, available_width)
-
-        # Draw product name if enabled with wrapping
-        if config.get("show_product_name", False):
-            available_width = label_width_pts - product_name_x_offset - 10  # 10pt right margin
-            product_lines = wrap_text(c, name, product_name_font_type, product_name_font_size, available_width, product_name_max_word_length)
-
-            product_text_x = x + product_name_x_offset
-            product_text_y = y - product_name_y_offset - product_name_font_size
-            c.setFont(product_name_font_type, product_name_font_size)
-
-            for i, line in enumerate(product_lines):
-                line_y = product_text_y - (i * product_name_font_size * 1.2)
-                draw_aligned_text(c, line, product_text_x, line_y, product_name_font_type, product_name_font_size, product_name_text_align, available_width)
-
-        # Draw the price if enabled
-        if config.get("show_price", True):
-            price_text = format_price(price, currency_info)
-            price_x = x + price_x_offset
-            price_y = y - price_y_offset
-            price_rotation = config.get("price_rotation", 90)
-            draw_rotated_text(c, price_text, price_x, price_y, angle=price_rotation,
-                              font_name=price_font_type, font_size=price_font_size)
 
-    else:
-        # Portrait Layout
-        # Pure offset positioning: X from left edge, Y from top edge
-        # When offsets are 0, elements appear at top-left corner
-
-        # Draw QR code if enabled
-        if config.get("show_qr_code", True):
-            # Calculate QR code size based on offset input mode
-            offset_mode = config.get("offset_input_mode", "Percentage")
-            if offset_mode == "Inches":
-                # Use absolute size if specified, otherwise auto-calculate
-                qr_size_inch = config.get("qrcode_size_inch")
-                if qr_size_inch:
-                    qr_size_pts = qr_size_inch * inch
-                else:
-                    qr_size_pts = min(label_width_pts, label_height_pts * 0.4)  # Default: smaller of width or 40% height
-            else:  # Percentage mode
-                # Use percentage if specified, otherwise auto-calculate
-                qr_size_pct = config.get("qrcode_size_pct")
-                if qr_size_pct:
-                    qr_size_pts = (qr_size_pct / 100.0) * label_width_pts
-                else:
-                    qr_size_pts = min(label_width_pts, label_height_pts * 0.4)  # Default: smaller of width or 40% height
-
-            # Position purely from offsets (no automatic centering)
-            qr_x = x + qr_x_offset
-            qr_y = y - qr_y_offset - qr_size_pts
-            c.drawImage(
-                qr_path,
-                qr_x,
-                qr_y,
-                width=qr_size_pts,
-                height=qr_size_pts,
-                preserveAspectRatio=True,
-                mask='auto'
-            )
-
-        # Draw SKU text with wrapping if enabled
-        if config.get("show_sku", True):
-            # Calculate available width (label width minus x offset and right margin)
-            available_width = label_width_pts - sku_x_offset - 10  # 10pt right margin
-            sku_lines = wrap_text(c, sku, sku_font_type, sku_font_size, available_width, sku_max_word_length)
-
-            sku_text_x = x + sku_x_offset
-            sku_text_y = y - sku_y_offset - sku_font_size
-            c.setFont(sku_font_type, sku_font_size)
-
-            for i, line in enumerate(sku_lines):
-                line_y = sku_text_y - (i * sku_font_size * 1.2)  # 1.2 = line spacing
-                draw_aligned_text(c, line, sku_text_x, line_y, sku_font_type, sku_font_size, sku_text_align, available_width)
-
-        # Draw product name if enabled with wrapping
-        if config.get("show_product_name", False):
-            available_width = label_width_pts - product_name_x_offset - 10  # 10pt right margin
-            product_lines = wrap_text(c, name, product_name_font_type, product_name_font_size, available_width, product_name_max_word_length)
-
-            product_text_x = x + product_name_x_offset
-            product_text_y = y - product_name_y_offset - product_name_font_size
-            c.setFont(product_name_font_type, product_name_font_size)
-
-            for i, line in enumerate(product_lines):
-                line_y = product_text_y - (i * product_name_font_size * 1.2)
-                draw_aligned_text(c, line, product_text_x, line_y, product_name_font_type, product_name_font_size, product_name_text_align, available_width)
-
-        # Draw price if enabled
-        if config.get("show_price", True):
-            price_text_x = x + price_x_offset
-            price_text_y = y - price_y_offset - price_font_size
-            c.setFont(price_font_type, price_font_size)
-            c.drawString(price_text_x, price_text_y, format_price(price, currency_info))
-
-
-def create_labels_pdf(labels_data, label_type):
+class LabelFormStamper:
     """
-    Generate a PDF with labels based on the specified label type and product data
+    Draw labels by recording each distinct (sku, name, price) label once as a
+    PDF Form XObject and stamping it with doForm for every copy.
+
+    Repeated copies then cost one "Do" operator instead of re-running text
+    wrapping, price formatting and image placement, and the PDF carries a
+    single content stream per distinct label. One stamper belongs to one canvas.
     """
-    try:
-        LABEL_DIMENSIONS = get_label_dimensions()
-
-        if label_type not in LABEL_DIMENSIONS:
-            raise ValueError(f"Unsupported label type: {label_type}")
-
-        config = LABEL_DIMENSIONS[label_type]
-        label_width = config["label_width"]
-        label_height = config["label_height"]
-        labels_per_row = config["labels_per_row"]
-        labels_per_column = config["labels_per_column"]
-        margin_top = config["margin_top"] * 72
-        margin_bottom = config["margin_bottom"] * 72
-        margin_left = config["margin_left"] * 72
-        margin_right = config["margin_right"] * 72
-        file_name = config["file_name"]
-
-        page_width_pts = config["page_width_inch"] * 72
-        page_height_pts = config["page_height_inch"] * 72
-
-        usable_width = page_width_pts - margin_left - margin_right
-        usable_height = page_height_pts - margin_top - margin_bottom
-
-        horizontal_spacing = (
-            (usable_width - (labels_per_row * label_width * 72)) / (labels_per_row - 1)
-            if labels_per_row > 1 else 0
-        )
-        vertical_spacing = (
-            (usable_height - (labels_per_column * label_height * 72)) / (labels_per_column - 1)
-            if labels_per_column > 1 else 0
-        )
 
-        # Get current date
-        current_date = datetime.now().strftime('%Y%m%d')
+    def __init__(self, c, layout, qr_dir, page_size):
+        self.c = c
+        self.layout = layout
+        self.qr_dir = qr_dir
+        # Forms clip to their bounding box, so allow anything that could land on the page
+        page_width, page_height = page_size
+        self.bbox = (-page_width, -page_height, page_width, page_height)
+        self.forms = {}
+
+    def draw(self, x, y, sku, name, price):
+        """Stamp the label with its top-left corner at (x, y), recording the form on first use"""
+        c = self.c
+        key = (sku, name, price)
+        form_name = self.forms.get(key)
+        if form_name is None:
+            form_name = f"label{len(self.forms)}"
+            lowerx, lowery, upperx, uppery = self.bbox
+            c.beginForm(form_name, lowerx=lowerx, lowery=lowery, upperx=upperx, uppery=uppery)
+            # Form space origin is the label's bottom-left corner
+            draw_label(c, 0, self.layout.height, sku, name, price, self.layout, self.qr_dir)
+            c.endForm()
+            self.forms[key] = form_name
+
+        c.saveState()
+        c.translate(x, y - self.layout.height)
+        c.doForm(form_name)
+        c.restoreState()
+
+
+def page_grid(config):
+    """
+    Resolve the page grid of a label configuration, in points.
+    Returns (page_size, x_start, y_start, x_step, y_step, labels_per_row, labels_per_page)
+    """
+    label_width = config["label_width"]
+    label_height = config["label_height"]
+    labels_per_row = config["labels_per_row"]
+    labels_per_column = config["labels_per_column"]
+    margin_top = config["margin_top"] * 72
+    margin_bottom = config["margin_bottom"] * 72
+    margin_left = config["margin_left"] * 72
+    margin_right = config["margin_right"] * 72
+
+    page_width_pts = config["page_width_inch"] * 72
+    page_height_pts = config["page_height_inch"] * 72
+
+    usable_width = page_width_pts - margin_left - margin_right
+    usable_height = page_height_pts - margin_top - margin_bottom
+
+    horizontal_spacing = (
+        (usable_width - (labels_per_row * label_width * 72)) / (labels_per_row - 1)
+        if labels_per_row > 1 else 0
+    )
+    vertical_spacing = (
+        (usable_height - (labels_per_column * label_height * 72)) / (labels_per_column - 1)
+        if labels_per_column > 1 else 0
+    )
+
+    return (
+        (page_width_pts, page_height_pts),
+        margin_left,
+        page_height_pts - margin_top,
+        label_width * 72 + horizontal_spacing,
+        label_height * 72 + vertical_spacing,
+        labels_per_row,
+        labels_per_row * labels_per_column
+    )
 
-        # Create output directory in site's public folder
-        site_path = frappe.utils.get_site_path()
-        output_dir = os.path.join(site_path, 'public', 'files', 'label_creator')
-        os.makedirs(output_dir, exist_ok=True)
 
-        output_path = os.path.join(output_dir, f"{current_date}_{file_name}.pdf")
+def label_runs(labels_data):
+    """Convert processed items into (sku, product, price, quantity) runs"""
+    return [
+        (item["sku"], item["product"], item["display_price"], item["quantity"])
+        for item in labels_data
+    ]
 
-        # QR codes directory
-        qr_dir = os.path.join(site_path, 'public', 'files', 'label_creator', 'qr_codes')
-        os.makedirs(qr_dir, exist_ok=True)
 
-        # Create canvas
-        c = canvas.Canvas(output_path, pagesize=(page_width_pts, page_height_pts))
+def render_labels(c, runs, config, layout, qr_dir, use_forms=True, progress=None):
+    """
+    Draw label runs onto a canvas, starting on a fresh page and breaking pages
+    as the grid fills. Used by both the serial and the page-parallel paths.
 
-        x_start = margin_left
-        y_start = page_height_pts - margin_top
-        x_offset = x_start
-        y_offset = y_start
-        label_count = 0
+    progress, if given, is called as progress(labels_done, pages_done) after
+    every completed page.
+    """
+    page_size, x_start, y_start, x_step, y_step, labels_per_row, labels_per_page = page_grid(config)
+    stamper = LabelFormStamper(c, layout, qr_dir, page_size) if use_forms else None
+
+    x_offset = x_start
+    y_offset = y_start
+    label_count = 0
+
+    for sku, product, price, quantity in runs:
+        for _ in range(quantity):
+            if label_count > 0 and label_count % labels_per_page == 0:
+                c.showPage()
+                x_offset = x_start
+                y_offset = y_start
+                if progress:
+                    progress(label_count, label_count // labels_per_page)
+
+            if stamper:
+                stamper.draw(x_offset, y_offset, sku, product, price)
+            else:
+                draw_label(c, x_offset, y_offset, sku, product, price, layout, qr_dir)
 
-        for item in labels_data:
-            sku = item["sku"]
-            product = item["product"]
-            price = item["display_price"]
-            quantity = item["quantity"]
+            x_offset += x_step
+            if (label_count + 1) % labels_per_row == 0:
+                x_offset = x_start
+                y_offset -= y_step
 
-            for _ in range(quantity):
-                if label_count > 0 and label_count % (labels_per_row * labels_per_column) == 0:
-                    c.showPage()
-                    x_offset = x_start
-                    y_offset = y_start
+            label_count += 1
 
-                draw_label(c, x_offset, y_offset, sku, product, price,
-                          label_width, label_height, config, qr_dir)
+    if progress and label_count:
+        progress(label_count, -(-label_count // labels_per_page))
 
-                x_offset += label_width * 72 + horizontal_spacing
-                if (label_count + 1) % labels_per_row == 0:
-                    x_offset = x_start
-                    y_offset -= label_height * 72 + vertical_spacing
+    return label_count
 
-                label_count += 1
 
+def split_runs_by_pages(runs, labels_per_page, pages_per_chunk):
+    """
+    Split label runs into chunks of whole pages, keeping each chunk run-length
+    encoded so it stays small when sent to a worker process.
+    """
+    chunk_size = labels_per_page * pages_per_chunk
+    chunks = []
+    current = []
+    room = chunk_size
+
+    for sku, product, price, quantity in runs:
+        while quantity > 0:
+            take = min(quantity, room)
+            current.append((sku, product, price, take))
+            quantity -= take
+            room -= take
+            if room == 0:
+                chunks.append(current)
+                current = []
+                room = chunk_size
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _init_render_worker(site, sites_path):
+    """Give each worker process its own Frappe context (needed for logging and site config)"""
+    frappe.init(site=site, sites_path=sites_path)
+    frappe.connect()
+
+
+def get_pdf_profile(profile=None):
+    """Validate a PDF profile name, defaulting to "label_creator_pdf_profile" in site config"""
+    profile = (profile or frappe.conf.get("label_creator_pdf_profile") or "standard").lower()
+    if profile not in PDF_PROFILES:
+        raise ValueError(f"Unsupported PDF profile: {profile}")
+    return profile
+
+
+def profile_layout(layout, profile):
+    """
+    The layout as drawn under a PDF profile. "compact" draws raster barcodes as
+    1-bit images and replaces fonts outside the 14 standard PDF fonts (which are
+    never embedded) with Helvetica; vector barcodes are already compact.
+    """
+    if profile != "compact":
+        return layout
+
+    changes = {}
+    if layout.barcode_render_mode == "raster":
+        changes["barcode_render_mode"] = "bilevel"
+    for field in ("sku", "product_name", "price"):
+        block = getattr(layout, field)
+        if block and block.font_name not in pdfmetrics.standardFonts:
+            changes[field] = replace(block, font_name="Helvetica")
+    return replace(layout, **changes)
+
+
+@contextmanager
+def _binary_streams(profile):
+    """
+    ReportLab ASCII85-encodes every compressed stream by default (a quarter
+    larger); compact PDFs keep them binary. The setting is read while the
+    document is written, so only wrap c.save() in this.
+    """
+    if profile != "compact":
+        yield
+        return
+    use_a85 = rl_config.useA85
+    rl_config.useA85 = 0
+    try:
+        yield
+    finally:
+        rl_config.useA85 = use_a85
+
+
+def _render_canvas(output, runs, config, layout, qr_dir, use_forms, profile, progress=None):
+    """Draw label runs on a new canvas for the profile and write it to output"""
+    c = canvas.Canvas(output, pagesize=page_grid(config)[0], pageCompression=1 if profile == "compact" else None)
+    render_labels(c, runs, config, profile_layout(layout, profile), qr_dir, use_forms, progress)
+    with _binary_streams(profile):
         c.save()
-        return output_path
+
+
+def _render_chunk(config, currency_info, runs, qr_dir, use_forms, profile="standard"):
+    """Worker entry point: render one chunk of whole pages and return the PDF bytes"""
+    import io
+
+    layout = build_label_layout(config, currency_info)
+    buffer = io.BytesIO()
+    _render_canvas(buffer, runs, config, layout, qr_dir, use_forms, profile)
+    return buffer.getvalue()
+
+
+def get_pdf_workers():
+    """Worker processes for page-parallel rendering ("label_creator_pdf_workers" in site config)"""
+    return int(frappe.conf.get("label_creator_pdf_workers") or 1)
+
+
+def render_labels_parallel(output, runs, config, qr_dir, workers, use_forms=True, progress=None, profile="standard"):
+    """
+    Render label runs across worker processes and concatenate the page ranges
+    into output (a path or writable file object) with PyMuPDF. Chunks always
+    start on a page boundary, so the pages are laid out exactly as the serial
+    path lays them out.
+    """
+    import fitz  # PyMuPDF
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    labels_per_page = page_grid(config)[6]
+    total_pages = -(-sum(run[3] for run in runs) // labels_per_page)
+    # Two chunks per worker keeps the pool busy when page costs are uneven
+    pages_per_chunk = max(1, -(-total_pages // (workers * 2)))
+    chunks = split_runs_by_pages(runs, labels_per_page, pages_per_chunk)
+
+    currency_info = get_currency_info(config.get("currency", "CAD"))
+
+    # spawn: never fork a web worker holding DB connections
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(chunks)),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_render_worker,
+        initargs=(frappe.local.site, frappe.local.sites_path)
+    ) as executor:
+        futures = [
+            executor.submit(_render_chunk, config, currency_info, chunk, qr_dir, use_forms, profile)
+            for chunk in chunks
+        ]
+
+        merged = fitz.open()
+        labels_done = 0
+        for chunk, future in zip(chunks, futures):
+            with fitz.open(stream=future.result(), filetype="pdf") as part:
+                merged.insert_pdf(part)
+            labels_done += sum(run[3] for run in chunk)
+            if progress:
+                progress(labels_done, len(merged))
+
+    # garbage=3 merges barcode images repeated across chunks
+    pdf_data = merged.tobytes(garbage=3, deflate=True)
+    merged.close()
+
+    if isinstance(output, str):
+        with open(output, "wb") as f:
+            f.write(pdf_data)
+    else:
+        output.write(pdf_data)
+
+
+def get_label_config(label_type):
+    """
+    Return the configuration dict for a label type, raising for unknown types.
+    Served from the per-type config cache (see label_config).
+    """
+    return get_label_type_config(label_type)
+
+
+def get_qr_dir():
+    """
+    QR codes directory (second-tier barcode cache) in the site's public folder, or
+    None when the tier is off. Rendered barcodes only live in the in-process LRU
+    unless "label_creator_barcode_disk_cache" is set in site_config.json.
+    """
+    if not frappe.conf.get("label_creator_barcode_disk_cache"):
+        return None
+    qr_dir = os.path.join(frappe.utils.get_site_path(), 'public', 'files', 'label_creator', 'qr_codes')
+    os.makedirs(qr_dir, exist_ok=True)
+    return qr_dir
+
+
+def write_labels_pdf(output, labels_data, config, use_forms=True, workers=None, progress=None, profile=None):
+    """
+    Render labels for a resolved label configuration into output, which may be a
+    file path or any writable binary file object (e.g. a spooled buffer).
+
+    Jobs of at least PARALLEL_MIN_PAGES pages are split into page ranges and
+    rendered by `workers` processes (default: label_creator_pdf_workers site
+    config, 1 = serial). progress is passed through to render_labels.
+    profile is one of PDF_PROFILES (default: see get_pdf_profile).
+    """
+    qr_dir = get_qr_dir()
+    runs = label_runs(labels_data)
+    workers = workers or get_pdf_workers()
+    profile = get_pdf_profile(profile)
+    total_pages = -(-sum(run[3] for run in runs) // page_grid(config)[6])
+
+    if workers > 1 and total_pages >= PARALLEL_MIN_PAGES:
+        render_labels_parallel(output, runs, config, qr_dir, workers, use_forms, progress, profile)
+        return
+
+    # Resolve fonts, sizes and offsets once for the whole job
+    layout = build_label_layout(config)
+    _render_canvas(output, runs, config, layout, qr_dir, use_forms, profile, progress)
+
+
+def labels_pdf_filename(config):
+    """Download name for a labels PDF: {YYYYMMDD}_{file_name}.pdf"""
+    return f"{datetime.now().strftime('%Y%m%d')}_{config['file_name']}.pdf"
+
+
+def create_labels_pdf(labels_data, label_type, use_forms=True, workers=None, profile=None):
+    """
+    Generate a PDF with labels based on the specified label type and product data
+    and save it in the PDF cache (private files)
+
+    With use_forms (default), each distinct label is rendered once as a PDF
+    Form XObject and stamped for every copy; pass use_forms=False to draw every
+    label directly. See write_labels_pdf for parallel rendering and PDF profiles.
+
+    PDFs are cached under a content hash of the Label Type version, the profile
+    and the normalized items (see pdf_cache), so reprinting the same batch
+    returns the existing file without rendering.
+    """
+    try:
+        config = get_label_config(label_type)
+        profile = get_pdf_profile(profile)
+
+        key = pdf_cache_key(label_type, config, labels_data, use_forms, pdf_profile=profile)
+        cached_path = get_cached_pdf(key)
+        if cached_path:
+            return cached_path
+
+        return store_pdf(key, lambda path: write_labels_pdf(path, labels_data, config, use_forms, workers,
+                                                            profile=profile))
 
     except Exception as e:
         frappe.log_error(frappe.get_traceback(), "Create Labels PDF Error")
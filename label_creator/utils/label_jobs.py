@@ -0,0 +1,175 @@
+import os
+import time
+
+import frappe
+
+from label_creator.utils.label_generator import (
+    get_label_config, get_pdf_profile, get_wrap_cache_stats, labels_pdf_filename, write_labels_pdf
+)
+
+# PyMuPDF is optional here; without it job stats only carry the output size
+try:
+    import fitz  # PyMuPDF
+    HAS_PYMUPDF = True
+except ImportError:
+    HAS_PYMUPDF = False
+
+# Realtime event carrying progress of background label jobs
+PROGRESS_EVENT = "label_creator_progress"
+
+# Minimum seconds between two progress events of the same job
+PROGRESS_INTERVAL = 1.0
+
+# Job status and result files are kept this long after the job is queued
+JOB_TTL = 24 * 60 * 60
+
+# RQ timeout for a single label job
+JOB_TIMEOUT = 60 * 60
+
+
+def _status_key(job_id):
+    return f"label_creator:job:{job_id}"
+
+
+def get_job_dir():
+    """Private directory holding finished job PDFs (not served under /files)"""
+    job_dir = frappe.get_site_path('private', 'label_creator', 'jobs')
+    os.makedirs(job_dir, exist_ok=True)
+    return job_dir
+
+
+def get_job_pdf_path(job_id):
+    return os.path.join(get_job_dir(), f"{job_id}.pdf")
+
+
+def get_job_status(job_id):
+    """Return the stored status dict of a label job, or None if unknown/expired"""
+    return frappe.cache().get_value(_status_key(job_id))
+
+
+def set_job_status(job_id, **values):
+    """Merge values into the stored status of a label job"""
+    status = get_job_status(job_id) or {}
+    status.update(values)
+    frappe.cache().set_value(_status_key(job_id), status, expires_in_sec=JOB_TTL)
+    return status
+
+
+def _cache_delta(before, after):
+    """Hits/misses of an LRU cache between two stats() snapshots"""
+    hits = after["hits"] - before["hits"]
+    misses = after["misses"] - before["misses"]
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0
+    }
+
+
+def _output_stats(path, profile):
+    """
+    Size of the job PDF and, as a baseline for the profile's compression, the
+    size it would have with every stream stored decoded. The streams are read
+    back from the file one at a time; nothing is rendered again.
+    """
+    stats = {"profile": profile, "bytes": os.path.getsize(path)}
+    if not HAS_PYMUPDF:
+        return stats
+
+    growth = 0
+    with fitz.open(path) as document:
+        for xref in range(1, document.xref_length()):
+            if document.xref_is_stream(xref):
+                growth += len(document.xref_stream(xref)) - len(document.xref_stream_raw(xref))
+    stats["uncompressed_bytes"] = stats["bytes"] + growth
+    stats["compression_ratio"] = round(stats["uncompressed_bytes"] / stats["bytes"], 2) if stats["bytes"] else None
+    return stats
+
+
+def enqueue_label_job(labels_data, label_type, profile=None):
+    """
+    Queue a PDF render on the long queue and return its job id.
+    The label type and PDF profile are validated here so configuration errors
+    surface immediately.
+    """
+    get_label_config(label_type)
+    profile = get_pdf_profile(profile)
+
+    job_id = frappe.generate_hash(length=16)
+    set_job_status(
+        job_id,
+        status="queued",
+        user=frappe.session.user,
+        label_type=label_type,
+        profile=profile,
+        labels_total=sum(int(item['quantity']) for item in labels_data),
+        labels_done=0,
+        pages_done=0
+    )
+
+    frappe.enqueue(
+        "label_creator.utils.label_jobs.run_label_job",
+        queue="long",
+        timeout=JOB_TIMEOUT,
+        label_job_id=job_id,
+        labels_data=labels_data,
+        label_type=label_type,
+        profile=profile,
+        user=frappe.session.user
+    )
+    return job_id
+
+
+def run_label_job(label_job_id, labels_data, label_type, user, profile="standard"):
+    """
+    Background worker entry point: render the PDF to the private job directory,
+    keeping the stored status and the user's realtime progress up to date.
+    """
+    job_id = label_job_id
+    labels_total = sum(int(item['quantity']) for item in labels_data)
+    last_publish = 0.0
+
+    def publish(status):
+        frappe.publish_realtime(PROGRESS_EVENT, dict(status, job_id=job_id), user=user)
+
+    def progress(labels_done, pages_done):
+        nonlocal last_publish
+        now = time.monotonic()
+        # Throttle intermediate updates; the final one always goes out
+        if now - last_publish < PROGRESS_INTERVAL and labels_done < labels_total:
+            return
+        last_publish = now
+        publish(set_job_status(job_id, labels_done=labels_done, pages_done=pages_done))
+
+    publish(set_job_status(job_id, status="running"))
+    wrap_stats = get_wrap_cache_stats()
+
+    try:
+        config = get_label_config(label_type)
+        write_labels_pdf(get_job_pdf_path(job_id), labels_data, config, progress=progress, profile=profile)
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), "Label Creator Job Error")
+        publish(set_job_status(job_id, status="failed", message=str(e)))
+        return
+
+    # Memo counters of this process only; page-parallel workers keep their own
+    stats = {"wrap_text": _cache_delta(wrap_stats, get_wrap_cache_stats())}
+    try:
+        stats["output"] = _output_stats(get_job_pdf_path(job_id), profile)
+    except Exception:
+        # The PDF is done; a failed measurement must not fail the job
+        frappe.log_error(frappe.get_traceback(), "Label Creator Job Stats Error")
+    publish(set_job_status(job_id, status="finished", filename=labels_pdf_filename(config), stats=stats))
+
+
+def cleanup_label_jobs():
+    """Delete job PDFs older than JOB_TTL. Runs hourly from scheduler_events."""
+    job_dir = get_job_dir()
+    cutoff = time.time() - JOB_TTL
+    for name in os.listdir(job_dir):
+        path = os.path.join(job_dir, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,241 @@
+import hashlib
+import io
+import json
+import math
+import threading
+
+import frappe
+from reportlab.pdfgen import canvas
+
+from label_creator.utils.cache import LRUCache
+from label_creator.utils.currency import get_currency_info
+from label_creator.utils.label_generator import build_label_layout, draw_label, get_qr_dir
+from label_creator.utils.label_raster import raster_supported, render_label_raster
+
+# PyMuPDF is optional here; batch previews need it to rasterize
+try:
+    import fitz  # PyMuPDF
+    HAS_PYMUPDF = True
+except ImportError:
+    HAS_PYMUPDF = False
+
+# Zoom for label thumbnails; small labels need it to stay legible
+PREVIEW_ZOOM = 4
+
+# Most labels a single batch request may ask for
+PREVIEW_BATCH_MAX_ITEMS = 500
+
+# Largest page side (in points) PDF readers accept
+MAX_SHEET_SIZE = 14400
+
+# Part of every preview cache key; bump when preview rendering changes
+PREVIEW_CACHE_VERSION = 1
+
+# Default number of preview PNGs kept in memory per process.
+# Override with "label_creator_preview_cache_size" in site_config.json.
+DEFAULT_PREVIEW_CACHE_SIZE = 2048
+
+# Optional redis tier shared by all workers, enabled with
+# "label_creator_preview_cache_redis": 1 in site_config.json
+PREVIEW_REDIS_PREFIX = "label_creator:preview:"
+PREVIEW_REDIS_TTL = 24 * 3600
+
+_preview_cache = None
+_preview_lock = threading.Lock()
+_preview_stats = {"redis_hits": 0}
+
+
+def sheet_grid(layout, count):
+    """
+    Lay count labels out on sheets no larger than MAX_SHEET_SIZE.
+    Labels start on whole points so each one rasterizes on the same pixel grid
+    as a label-sized page. Returns (pitch_x, pitch_y, columns, labels_per_sheet).
+    """
+    pitch_x = max(1, math.ceil(layout.width))
+    pitch_y = max(1, math.ceil(layout.height))
+    columns = max(1, min(count, int(MAX_SHEET_SIZE // pitch_x)))
+    rows = max(1, int(MAX_SHEET_SIZE // pitch_y))
+    return pitch_x, pitch_y, columns, columns * rows
+
+
+def preview_renderer(layout):
+    """
+    The renderer for a layout's thumbnails: "raster" draws straight to a bitmap
+    (see label_raster), "pdf" goes through ReportLab and PyMuPDF. Layouts the
+    raster canvas cannot draw use "pdf", as does every layout when
+    "label_creator_preview_renderer" is "pdf" in site_config.json.
+    """
+    if frappe.conf.get("label_creator_preview_renderer") == "pdf" or not raster_supported(layout):
+        return "pdf"
+    return "raster"
+
+
+def render_label_previews(config, items, zoom=PREVIEW_ZOOM):
+    """
+    Render PNG thumbnails for many labels of one label configuration.
+
+    items are (sku, product_name, price) tuples. With the raster renderer each
+    label is drawn straight to its own bitmap. Otherwise all labels are drawn onto
+    one ReportLab canvas (one page per MAX_SHEET_SIZE sheet), each clipped to its own
+    rectangle, and the PDF is opened once: every page is interpreted into a
+    PyMuPDF display list a single time and each label is rasterized from it with
+    a clip rectangle. Images match preview_single_label's page-per-label render
+    (to within a level of anti-aliasing on scaled barcode images).
+
+    Returns one (png_bytes, error) tuple per item, in order; error is the
+    exception message when the label could not be drawn.
+    """
+    layout = build_label_layout(config)
+    qr_dir = get_qr_dir()
+    if preview_renderer(layout) == "raster":
+        results = []
+        for sku, product_name, price in items:
+            try:
+                results.append((render_label_raster(layout, sku, product_name, price, zoom, qr_dir), None))
+            except Exception as e:
+                results.append((None, str(e)))
+        return results
+
+    pitch_x, pitch_y, columns, per_sheet = sheet_grid(layout, len(items))
+
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer)
+    errors = []
+    sheets = []
+    for start in range(0, len(items), per_sheet):
+        sheet_items = items[start:start + per_sheet]
+        rows = math.ceil(len(sheet_items) / columns)
+        sheet_width = min(len(sheet_items), columns) * pitch_x
+        sheet_height = rows * pitch_y
+        c.setPageSize((sheet_width, sheet_height))
+
+        for index, (sku, product_name, price) in enumerate(sheet_items):
+            x = (index % columns) * pitch_x
+            y_top = sheet_height - (index // columns) * pitch_y
+            c.saveState()
+            path = c.beginPath()
+            path.rect(x, y_top - layout.height, layout.width, layout.height)
+            c.clipPath(path, stroke=0, fill=0)
+            try:
+                draw_label(c, x, y_top, sku, product_name, price, layout, qr_dir)
+                errors.append(None)
+            except Exception as e:
+                errors.append(str(e))
+            c.restoreState()
+
+        c.showPage()
+        sheets.append(len(sheet_items))
+    c.save()
+
+    results = []
+    matrix = fitz.Matrix(zoom, zoom)
+    document = fitz.open(stream=buffer.getvalue(), filetype="pdf")
+    try:
+        for page, count in zip(document, sheets):
+            display_list = page.get_displaylist()
+            for index in range(count):
+                error = errors[len(results)]
+                if error is not None:
+                    results.append((None, error))
+                    continue
+                x = (index % columns) * pitch_x
+                y = (index // columns) * pitch_y
+                clip = fitz.Rect(x, y, x + layout.width, y + layout.height)
+                pix = display_list.get_pixmap(matrix=matrix, clip=clip)
+                results.append((pix.tobytes("png"), None))
+    finally:
+        document.close()
+    return results
+
+
+def _get_preview_cache():
+    """Create the process-wide preview PNG cache on first use"""
+    global _preview_cache
+    if _preview_cache is None:
+        maxsize = frappe.conf.get("label_creator_preview_cache_size") or DEFAULT_PREVIEW_CACHE_SIZE
+        _preview_cache = LRUCache(int(maxsize))
+    return _preview_cache
+
+
+def preview_cache_keys(label_type, config, items, zoom=PREVIEW_ZOOM):
+    """
+    Content hashes of label previews, one per (sku, product_name, price) item:
+    Label Type name and `modified` timestamp, currency formatting, the label's
+    text, the zoom and the renderer. Each key is also the preview's ETag.
+    """
+    modified = frappe.db.get_value("Label Type", label_type, "modified")
+    prefix = [
+        PREVIEW_CACHE_VERSION,
+        label_type,
+        str(modified),
+        get_currency_info(config.get('currency', 'CAD')),
+        zoom,
+        preview_renderer(build_label_layout(config))
+    ]
+    keys = []
+    for sku, product_name, price in items:
+        data = json.dumps(prefix + [str(sku), str(product_name), str(price)],
+                          sort_keys=True, separators=(",", ":"), default=str)
+        keys.append(hashlib.sha256(data.encode()).hexdigest())
+    return keys
+
+
+def page_preview_cache_key(label_type, config):
+    """Content hash (and ETag) of a Label Type's sample page preview"""
+    modified = frappe.db.get_value("Label Type", label_type, "modified")
+    data = json.dumps([
+        PREVIEW_CACHE_VERSION,
+        "page",
+        label_type,
+        str(modified),
+        get_currency_info(config.get('currency', 'CAD'))
+    ], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def _use_redis():
+    return bool(frappe.conf.get("label_creator_preview_cache_redis"))
+
+
+def get_cached_preview(key):
+    """Return the cached PNG for key from this process, then redis when enabled, or None"""
+    cache = _get_preview_cache()
+    png = cache.get(key)
+    if png is not None or not _use_redis():
+        return png
+
+    try:
+        png = frappe.cache().get_value(PREVIEW_REDIS_PREFIX + key)
+    except Exception:
+        # Redis unavailable - fall back to the local tier only
+        return None
+
+    if png is not None:
+        cache.set(key, png)
+        with _preview_lock:
+            _preview_stats["redis_hits"] += 1
+    return png
+
+
+def store_preview(key, png):
+    """Keep a rendered preview PNG in this process and, when enabled, in redis"""
+    _get_preview_cache().set(key, png)
+    if _use_redis():
+        try:
+            frappe.cache().set_value(PREVIEW_REDIS_PREFIX + key, png, expires_in_sec=PREVIEW_REDIS_TTL)
+        except Exception:
+            pass
+
+
+def get_preview_cache_stats():
+    """Return size, hit rate and evictions for the preview PNG cache"""
+    stats = _get_preview_cache().stats()
+    with _preview_lock:
+        stats["redis_hits"] = _preview_stats["redis_hits"]
+    stats["redis"] = _use_redis()
+    return stats
+
+
+def clear_preview_cache():
+    """Drop all preview PNGs cached in this process"""
+    _get_preview_cache().clear()
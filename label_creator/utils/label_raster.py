@@ -0,0 +1,258 @@
+import io
+import math
+import threading
+
+from PIL import Image, ImageDraw, ImageFont
+from reportlab.lib.boxstuff import aspectRatioFix
+from reportlab.pdfbase import pdfmetrics
+
+from label_creator.utils.cache import LRUCache
+from label_creator.utils.label_generator import draw_label, get_qr_dir
+
+# PyMuPDF ships the standard 14 PDF fonts it renders PDFs with; text is drawn
+# from the same font files so raster previews match the PDF path
+try:
+    import fitz  # PyMuPDF
+    HAS_PYMUPDF = True
+except ImportError:
+    HAS_PYMUPDF = False
+
+# Standard PDF font name -> PyMuPDF built-in font code
+BASE14_FONTS = {
+    "Helvetica": "helv",
+    "Helvetica-Bold": "hebo",
+    "Helvetica-Oblique": "heit",
+    "Helvetica-BoldOblique": "hebi",
+    "Times-Roman": "tiro",
+    "Times-Bold": "tibo",
+    "Times-Italic": "tiit",
+    "Times-BoldItalic": "tibi",
+    "Courier": "cour",
+    "Courier-Bold": "cobo",
+    "Courier-Oblique": "coit",
+    "Courier-BoldOblique": "cobi",
+}
+
+_font_data = {}
+_fonts = {}
+_font_lock = threading.Lock()
+
+# Rendered glyph masks by (font name, pixel size, character)
+_glyphs = LRUCache(4096)
+
+
+def _get_font(font_name, size_px):
+    """FreeType font for a standard PDF font at a pixel size, loaded once per process"""
+    key = (font_name, size_px)
+    font = _fonts.get(key)
+    if font is None:
+        with _font_lock:
+            data = _font_data.get(font_name)
+            if data is None:
+                data = _font_data[font_name] = fitz.Font(BASE14_FONTS[font_name]).buffer
+            font = _fonts[key] = ImageFont.truetype(io.BytesIO(data), size_px)
+    return font
+
+
+def _get_glyph(font_name, size_px, char):
+    """(mask, left, top) of one glyph placed at a baseline origin, or (None, 0, 0) for blank glyphs"""
+    key = (font_name, size_px, char)
+    glyph = _glyphs.get(key)
+    if glyph is None:
+        font = _get_font(font_name, size_px)
+        left, top, right, bottom = font.getbbox(char, anchor="ls")
+        if right <= left or bottom <= top:
+            glyph = (None, 0, 0)
+        else:
+            mask = Image.new("L", (right - left, bottom - top))
+            ImageDraw.Draw(mask).text((-left, -top), char, fill=255, font=font, anchor="ls")
+            glyph = (mask, left, top)
+        _glyphs.set(key, glyph)
+    return glyph
+
+
+def _draw_glyphs(image, x, y, text, font_name, size_px, fill):
+    """
+    Draw text glyph by glyph from the baseline point (x, y), advancing by the
+    font's PDF metrics as a PDF viewer does, without hinted advances or kerning.
+    Glyphs land on whole pixels, as PIL draws them.
+    """
+    for char in text:
+        mask, left, top = _get_glyph(font_name, size_px, char)
+        if mask is not None:
+            px, py = math.floor(x + 0.5) + left, math.floor(y + 0.5) + top
+            image.paste(fill, (px, py, px + mask.width, py + mask.height), mask)
+        x += pdfmetrics.stringWidth(char, font_name, size_px)
+
+
+def raster_supported(layout):
+    """
+    Whether a resolved LabelLayout can be drawn by RasterCanvas: bitmap barcodes
+    and standard PDF fonts only. Vector barcodes need the PDF path.
+    """
+    if not HAS_PYMUPDF or (layout.qr and layout.barcode_render_mode == "vector"):
+        return False
+    blocks = (layout.sku, layout.product_name, layout.price)
+    return all(block.font_name in BASE14_FONTS for block in blocks if block)
+
+
+class RasterCanvas:
+    """
+    The subset of the ReportLab canvas API that draw_label uses, drawing straight
+    into a PIL image instead of writing PDF operators.
+
+    Coordinates are ReportLab points (origin bottom-left, y up); the page is
+    rasterized at zoom pixels per point like PyMuPDF's
+    page.get_pixmap(matrix=fitz.Matrix(zoom, zoom)), but onto a grayscale image:
+    labels are black on white, and one channel makes the PNG a third of the work.
+    """
+
+    def __init__(self, width, height, zoom):
+        self.image = Image.new("L", (math.ceil(width * zoom), math.ceil(height * zoom)), 255)
+        # Affine map from user space to pixels: (a, b, c, d, e, f) as in PDF's cm operator
+        self._matrix = (zoom, 0, 0, -zoom, 0, height * zoom)
+        self._font = ("Helvetica", 12)
+        self._states = []
+
+    def saveState(self):
+        self._states.append((self._matrix, self._font))
+
+    def restoreState(self):
+        self._matrix, self._font = self._states.pop()
+
+    def _concat(self, a, b, c, d, e, f):
+        A, B, C, D, E, F = self._matrix
+        self._matrix = (a * A + b * C, a * B + b * D,
+                        c * A + d * C, c * B + d * D,
+                        e * A + f * C + E, e * B + f * D + F)
+
+    def translate(self, dx, dy):
+        self._concat(1, 0, 0, 1, dx, dy)
+
+    def rotate(self, theta):
+        radians = math.radians(theta)
+        cos, sin = math.cos(radians), math.sin(radians)
+        self._concat(cos, sin, -sin, cos, 0, 0)
+
+    def _to_pixels(self, x, y):
+        a, b, c, d, e, f = self._matrix
+        return a * x + c * y + e, b * x + d * y + f
+
+    def setFont(self, psfontname, size, leading=None):
+        self._font = (psfontname, size)
+
+    def stringWidth(self, text, fontName=None, fontSize=None):
+        font_name, font_size = self._font
+        return pdfmetrics.stringWidth(text, fontName or font_name, fontSize or font_size)
+
+    def drawString(self, x, y, text):
+        font_name, font_size = self._font
+        a, b, c, d, e, f = self._matrix
+        scale = math.hypot(a, b)
+        if b == 0 and c == 0 and a > 0 and d < 0:
+            px, py = self._to_pixels(x, y)
+            _draw_glyphs(self.image, px, py, text, font_name, font_size * scale, 0)
+            return
+
+        # Rotated text: draw it upright at the same scale, then map the glyph
+        # mask through the current transform
+        ascent, descent = _get_font(font_name, font_size * scale).getmetrics()
+        pad = math.ceil(font_size * scale / 4)
+        width = pdfmetrics.stringWidth(text, font_name, font_size * scale)
+        mask = Image.new("L", (math.ceil(width) + 2 * pad, ascent + descent + 2 * pad))
+        left, top = -pad, -(ascent + pad)
+        _draw_glyphs(mask, -left, -top, text, font_name, font_size * scale, 255)
+
+        # Upright mask pixel (u, v) sits at user point (x + (u + left) / scale, y - (v + top) / scale)
+        ox, oy = self._to_pixels(x, y)
+        ux, uy = a / scale, b / scale
+        vx, vy = -c / scale, -d / scale
+        self._fill_transformed(mask, (ux, vx, ox + ux * left + vx * top,
+                                      uy, vy, oy + uy * left + vy * top), Image.BICUBIC)
+
+    def drawImage(self, image, x, y, width=None, height=None, mask=None,
+                  preserveAspectRatio=False, anchor='c', **kwargs):
+        """Draw an ImageReader, PIL image or image path into the box at (x, y)"""
+        source = getattr(image, "_image", None)
+        if source is None:
+            source = image if isinstance(image, Image.Image) else Image.open(image)
+        image_width, image_height = source.size
+        x, y, width, height, _scaled = aspectRatioFix(preserveAspectRatio, anchor, x, y, width, height,
+                                                      image_width, image_height)
+
+        alpha = source.getchannel("A") if source.mode in ("RGBA", "LA") else None
+        source = source.convert("L")
+        a, b, c, d, e, f = self._matrix
+        if b == 0 and c == 0 and a > 0 and d < 0:
+            # Like MuPDF, stretch axis-aligned images over whole pixels and resample
+            # them to that size; the image rectangle grows outwards to the pixel grid
+            x0, y0 = self._to_pixels(x, y + height)
+            x1, y1 = self._to_pixels(x + width, y)
+            left, top = math.floor(x0 + 1e-4), math.floor(y0 + 1e-4)
+            size = (max(1, math.ceil(x1 - left - 1e-4)), max(1, math.ceil(y1 - top - 1e-4)))
+            self.image.paste(source.resize(size, Image.BILINEAR), (left, top),
+                             alpha.resize(size, Image.BILINEAR) if alpha else None)
+            return
+
+        # Image pixel (u, v) covers user space x + u * width / w, y + height - v * height / h
+        sx, sy = width / image_width, -height / image_height
+        ox, oy = self._to_pixels(x, y + height)
+        self._paste_transformed(source, (a * sx, c * sy, ox, b * sx, d * sy, oy), Image.BILINEAR, alpha)
+
+    def _transform_box(self, forward, size):
+        """
+        Page pixels covered by a size-sized source under the forward affine map
+        (page_x = p0 * u + p1 * v + p2, page_y = p3 * u + p4 * v + p5), as
+        ((left, top, right, bottom), inverse) with the inverse map PIL's
+        Image.transform wants, from box pixels back to source pixels; None when off the page.
+        """
+        p0, p1, p2, p3, p4, p5 = forward
+        w, h = size
+        corners = [(p0 * u + p1 * v + p2, p3 * u + p4 * v + p5) for u in (0, w) for v in (0, h)]
+        left = max(0, math.floor(min(px for px, _ in corners)))
+        top = max(0, math.floor(min(py for _, py in corners)))
+        right = min(self.image.width, math.ceil(max(px for px, _ in corners)))
+        bottom = min(self.image.height, math.ceil(max(py for _, py in corners)))
+        if right <= left or bottom <= top:
+            return None
+
+        det = p0 * p4 - p1 * p3
+        i0, i1 = p4 / det, -p1 / det
+        i3, i4 = -p3 / det, p0 / det
+        tx, ty = p2 - left, p5 - top
+        return (left, top, right, bottom), (i0, i1, -(i0 * tx + i1 * ty), i3, i4, -(i3 * tx + i4 * ty))
+
+    def _fill_transformed(self, mask, forward, resample):
+        """Paint black through a coverage mask mapped onto the page by forward"""
+        placed = self._transform_box(forward, mask.size)
+        if placed:
+            box, inverse = placed
+            size = (box[2] - box[0], box[3] - box[1])
+            self.image.paste(0, box, mask.transform(size, Image.AFFINE, inverse, resample))
+
+    def _paste_transformed(self, source, forward, resample, alpha=None):
+        """Paste a grayscale image mapped onto the page by forward, optionally through its alpha"""
+        placed = self._transform_box(forward, source.size)
+        if placed:
+            box, inverse = placed
+            size = (box[2] - box[0], box[3] - box[1])
+            # Pixels outside the source get no coverage
+            inside = Image.new("L", source.size, 255) if alpha is None else alpha
+            self.image.paste(source.transform(size, Image.AFFINE, inverse, resample), box[:2],
+                             inside.transform(size, Image.AFFINE, inverse, resample))
+
+    def to_png(self):
+        buffer = io.BytesIO()
+        self.image.save(buffer, format="PNG")
+        return buffer.getvalue()
+
+
+def render_label_raster(layout, sku, product_name, price, zoom, qr_dir=None):
+    """
+    Draw one label with draw_label onto a RasterCanvas the size of the label and
+    return it as PNG bytes. The layout must pass raster_supported.
+    """
+    c = RasterCanvas(layout.width, layout.height, zoom)
+    draw_label(c, 0, layout.height, sku, product_name, str(price), layout, qr_dir or get_qr_dir())
+    return c.to_png()
+
@@ -0,0 +1,303 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+import frappe
+import qrcode
+from reportlab.pdfbase import pdfmetrics
+
+from label_creator.utils.barcodes import LINEAR_BARCODES, QR_BORDER, VECTOR_BAR_HEIGHT_RATIO, barcode_data
+from label_creator.utils.label_generator import build_label_layout, get_label_config, label_runs, wrap_text
+from label_creator.utils.pdf_cache import get_cached_pdf, pdf_cache_key, store_pdf
+
+# Printer languages labels can be written in besides PDF
+THERMAL_FORMATS = ("zpl", "epl")
+
+# Print head resolution used to convert points to dots; override with
+# "label_creator_printer_dpi" in site_config.json (203 and 300 are common)
+DEFAULT_PRINTER_DPI = 203
+
+# Module width/magnification limits of the printers' barcode commands
+MAX_MODULE_DOTS = 10
+
+# ZPL 1D barcode commands after ^FO/^BY: {height} is the bar height in dots,
+# followed by the human readable line below the bars
+ZPL_BARCODES = {
+    "Code 39": "^B3N,N,{height},Y,N",
+    "Code 128": "^BCN,{height},Y,N,N,A",
+    "EAN-13": "^BEN,{height},Y,N",
+    "EAN-8": "^B8N,{height},Y,N",
+    "UPC-A": "^BUN,{height},Y,N,Y",
+}
+
+# EPL2 B command barcode selections
+EPL_BARCODES = {
+    "Code 39": "3",
+    "Code 128": "1",
+    "EAN-13": "E30",
+    "EAN-8": "E80",
+    "UPC-A": "UA0",
+}
+
+# EPL2 resident fonts: font number -> (height, character pitch) in dots, by print head resolution
+EPL_FONTS = {
+    203: {1: (12, 10), 2: (16, 12), 3: (20, 14), 4: (24, 16), 5: (48, 34)},
+    300: {1: (20, 14), 2: (28, 18), 3: (36, 22), 4: (44, 26), 5: (80, 50)},
+}
+
+
+@dataclass(frozen=True, slots=True)
+class TextField:
+    """
+    Text placed in dots from the label's top-left corner. x/y is the top-left of
+    the field's box; width is the box width for alignment (0 = left aligned at x).
+    turns counts counter-clockwise quarter turns, as ReportLab's rotate does.
+    """
+    x: int
+    y: int
+    width: int
+    height: int
+    leading: int
+    align: str
+    lines: tuple
+    turns: int
+
+
+@dataclass(frozen=True, slots=True)
+class BarcodeField:
+    """A barcode in dots: x/y is the symbol's top-left, module the narrow bar or QR module width"""
+    x: int
+    y: int
+    barcode_type: str
+    data: str
+    module: int
+    height: int
+
+
+def get_printer_dpi():
+    """Print head resolution in dots per inch ("label_creator_printer_dpi" in site config)"""
+    return int(frappe.conf.get("label_creator_printer_dpi") or DEFAULT_PRINTER_DPI)
+
+
+def _linear_modules(barcode_type, data):
+    """Modules across a 1D symbol, quiet zones excluded (Code 39 with 3:1 wide bars)"""
+    if barcode_type == "Code 39":
+        return (len(data) + 2) * 16 - 1
+    if barcode_type == "Code 128":
+        return (len(data) + 3) * 11 + 2
+    return 67 if barcode_type == "EAN-8" else 95
+
+
+def _barcode_field(layout, sku, dots):
+    """
+    Fit the SKU's barcode into the layout's square barcode box, centred like
+    drawImage(preserveAspectRatio=True): whole-dot modules as large as fit.
+    """
+    qr = layout.qr
+    left, top, size = max(0, dots(qr.x)), max(0, dots(-qr.y - qr.size)), dots(qr.size)
+    barcode_type = layout.barcode_type if layout.barcode_type in LINEAR_BARCODES else "QR Code"
+    data = barcode_data(sku, barcode_type)
+
+    if barcode_type == "QR Code":
+        # Same symbol version as the bitmaps (only the version is worked out, not the matrix);
+        # the printer adds no quiet zone, so keep the border's space
+        symbol = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_M, border=0)
+        symbol.add_data(data)
+        modules = symbol.best_fit() * 4 + 17 + 2 * QR_BORDER
+        module = max(1, min(MAX_MODULE_DOTS, size // modules))
+        offset = max(0, (size - modules * module) // 2) + QR_BORDER * module
+        return BarcodeField(left + offset, top + offset, barcode_type, data, module, 0)
+
+    if barcode_type == "Code 39":
+        data = data.upper()
+    width_modules = _linear_modules(barcode_type, data)
+    module = max(1, min(MAX_MODULE_DOTS, size // width_modules))
+    width = width_modules * module
+    # Bars plus the printer's human readable line (about ten modules tall); symbols
+    # wider than the box even at one dot per module start at its left edge
+    height = max(1, min(round(width * VECTOR_BAR_HEIGHT_RATIO), size - 10 * module))
+    return BarcodeField(left + max(0, (size - width) // 2), top + max(0, (size - height - 10 * module) // 2),
+                        barcode_type, data, module, height)
+
+
+def _text_fields(layout, sku, name, price, dots):
+    """
+    TextFields for the SKU, product name and price of one label. Printers take
+    no negative positions, so fields hanging off the top or left edge start on it.
+    """
+    fields = []
+    for text, block in ((sku, layout.sku), (name, layout.product_name)):
+        if not block:
+            continue
+        lines = wrap_text(None, str(text), block.font_name, block.font_size, block.available_width,
+                          block.max_word_length)
+        fields.append(TextField(
+            x=max(0, dots(block.x)),
+            # block.y is the first baseline; the field starts one font size above it
+            y=max(0, dots(-block.y - block.font_size)),
+            width=dots(block.available_width),
+            height=dots(block.font_size),
+            leading=dots(block.leading),
+            align=block.align,
+            lines=tuple(lines),
+            turns=0
+        ))
+
+    price_block = layout.price
+    if price_block:
+        price_text = layout.price_formatter(price)
+        height = price_block.font_size
+        if price_block.rotation is None:
+            fields.append(TextField(max(0, dots(price_block.x)), max(0, dots(-price_block.y - height)), 0,
+                                    dots(height), dots(height), "Left", (price_text,), 0))
+        else:
+            # Printers only turn text in quarter turns; the text is centred on the rotation point
+            turns = round(price_block.rotation / 90) % 4
+            width = pdfmetrics.stringWidth(price_text, price_block.font_name, height)
+            box_width, box_height = (height, width) if turns % 2 else (width, height)
+            fields.append(TextField(max(0, dots(price_block.x - box_width / 2)),
+                                    max(0, dots(-price_block.y - box_height / 2)),
+                                    dots(width), dots(height), dots(height), "Left", (price_text,), turns))
+    return fields
+
+
+def _zpl_data(text):
+    """Field data with ZPL's control characters hex-escaped for ^FH_"""
+    return "".join(f"_{ord(ch):02X}" if ch in "^~_\\" else ch for ch in text)
+
+
+def _zpl_label(layout, sku, name, price, quantity, dpi, dots):
+    """One ^XA...^XZ label format, printed quantity times with ^PQ"""
+    commands = [f"^XA^CI28^PW{dots(layout.width)}^LL{dots(layout.height)}^LH0,0"]
+
+    if layout.qr:
+        field = _barcode_field(layout, sku, dots)
+        if field.barcode_type == "QR Code":
+            commands.append(f"^FO{field.x},{field.y}^BQN,2,{field.module}^FH_^FDMA,{_zpl_data(field.data)}^FS")
+        else:
+            command = ZPL_BARCODES[field.barcode_type].format(height=field.height)
+            commands.append(f"^FO{field.x},{field.y}^BY{field.module},3{command}^FH_^FD{_zpl_data(field.data)}^FS")
+
+    for field in _text_fields(layout, sku, name, price, dots):
+        font = f"^A0{'NBIR'[field.turns]},{field.height},{field.height}"
+        if field.width and field.turns == 0:
+            # A field block wraps nothing itself here: lines come pre-wrapped and are joined with \&
+            justify = {"Centre": "C", "Right": "R"}.get(field.align, "L")
+            block = f"^FB{field.width},{len(field.lines)},{field.leading - field.height},{justify},0"
+            data = "\\&".join(_zpl_data(line) for line in field.lines)
+            commands.append(f"^FO{field.x},{field.y}{font}{block}^FH_^FD{data}^FS")
+        else:
+            commands.append(f"^FO{field.x},{field.y}{font}^FH_^FD{_zpl_data(field.lines[0])}^FS")
+
+    commands.append(f"^PQ{quantity}^XZ")
+    return "\n".join(commands) + "\n"
+
+
+def _epl_data(text):
+    """A quoted EPL2 string"""
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _epl_font(height, dpi):
+    """The largest resident font (number, height, pitch) no taller than height, else the smallest"""
+    fonts = EPL_FONTS[300 if dpi >= 300 else 203]
+    number = max((n for n, (h, _pitch) in fonts.items() if h <= height), default=1)
+    return (number,) + fonts[number]
+
+
+def _epl_label(layout, sku, name, price, quantity, dpi, dots):
+    """One EPL2 form (N ... P), printed quantity times"""
+    commands = ["N", f"q{dots(layout.width)}"]
+
+    if layout.qr:
+        field = _barcode_field(layout, sku, dots)
+        if field.barcode_type == "QR Code":
+            commands.append(f"b{field.x},{field.y},Q,m2,s{field.module},eM,{_epl_data(field.data)}")
+        else:
+            selection = EPL_BARCODES[field.barcode_type]
+            commands.append(f"B{field.x},{field.y},0,{selection},{field.module},{3 * field.module},"
+                            f"{field.height},B,{_epl_data(field.data)}")
+
+    for field in _text_fields(layout, sku, name, price, dots):
+        number, height, pitch = _epl_font(field.height, dpi)
+        if field.turns:
+            # EPL rotates clockwise about the text's start corner: top-right (90), bottom-right (180), bottom-left (270)
+            rotation = -field.turns % 4
+            width = len(field.lines[0]) * pitch
+            box_width, box_height = (height, width) if rotation % 2 else (width, height)
+            x = field.x + (box_width if rotation in (1, 2) else 0)
+            y = field.y + (box_height if rotation in (2, 3) else 0)
+            commands.append(f"A{x},{y},{rotation},{number},1,1,N,{_epl_data(field.lines[0])}")
+            continue
+
+        for index, line in enumerate(field.lines):
+            # Resident fonts are monospaced, so alignment is worked out here
+            slack = field.width - len(line) * pitch if field.width else 0
+            offset = {"Centre": slack // 2, "Right": slack}.get(field.align, 0) if slack > 0 else 0
+            commands.append(f"A{field.x + offset},{field.y + index * field.leading},0,{number},1,1,N,{_epl_data(line)}")
+
+    commands.append(f"P{quantity}")
+    return "\n".join(commands) + "\n"
+
+
+def write_labels_thermal(output, labels_data, config, output_format, dpi=None):
+    """
+    Write labels as printer commands (output_format "zpl" or "epl") into output,
+    a file path or writable binary file object.
+
+    Each distinct label is sent once with a print quantity, using the printer's
+    own barcode commands and resident fonts, so jobs stay a few hundred bytes
+    per distinct label. Labels come off the roll one at a time: the page grid
+    and margins of the Label Type are not used. Text is wrapped with the same
+    metrics as the PDF; printer fonts differ in shape, and rotated prices snap
+    to the nearest quarter turn.
+    """
+    if output_format not in THERMAL_FORMATS:
+        raise ValueError(f"Unsupported printer format: {output_format}")
+
+    dpi = dpi or get_printer_dpi()
+    layout = build_label_layout(config)
+    write_label = _zpl_label if output_format == "zpl" else _epl_label
+
+    def dots(points):
+        return round(points * dpi / 72)
+
+    parts = [
+        write_label(layout, sku, product, price, quantity, dpi, dots)
+        for sku, product, price, quantity in label_runs(labels_data)
+        if int(quantity) > 0
+    ]
+    # EPL's resident fonts use code page 437; ZPL is switched to UTF-8 by ^CI28
+    data = "".join(parts).encode("utf-8" if output_format == "zpl" else "cp437", errors="replace")
+
+    if isinstance(output, str):
+        with open(output, "wb") as f:
+            f.write(data)
+    else:
+        output.write(data)
+
+
+def labels_thermal_filename(config, output_format):
+    """Download name for printer commands: {YYYYMMDD}_{file_name}.zpl / .epl"""
+    return f"{datetime.now().strftime('%Y%m%d')}_{config['file_name']}.{output_format}"
+
+
+def create_labels_thermal(labels_data, label_type, output_format):
+    """
+    Write labels as ZPL or EPL into the PDF cache (private files) and return the path.
+    Cached next to the PDFs under a content hash that includes the format and DPI.
+    """
+    try:
+        config = get_label_config(label_type)
+        dpi = get_printer_dpi()
+
+        key = pdf_cache_key(label_type, config, labels_data, output_format=output_format, dpi=dpi)
+        cached_path = get_cached_pdf(key, output_format)
+        if cached_path:
+            return cached_path
+
+        return store_pdf(key, lambda path: write_labels_thermal(path, labels_data, config, output_format, dpi),
+                         output_format)
+
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), "Create Thermal Labels Error")
+        raise
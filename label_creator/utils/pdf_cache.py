@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import frappe
+
+from label_creator.utils.currency import get_currency_info
+
+# Part of every cache key; bump when rendering output changes so old PDFs are not served
+CACHE_VERSION = 1
+
+# Eviction limits, overridable with label_creator_pdf_cache_max_mb /
+# label_creator_pdf_cache_max_age_hours in site_config.json
+DEFAULT_MAX_SIZE_MB = 512
+DEFAULT_MAX_AGE_HOURS = 7 * 24
+
+# Cached outputs: PDFs plus printer command files (see label_thermal) and bitmap pages (see label_bitmaps)
+CACHED_EXTENSIONS = (".pdf", ".zpl", ".epl", ".tiff", ".zip")
+
+
+def get_pdf_cache_dir():
+    """
+    Directory of cached label PDFs in the site's private files; they are
+    downloaded through api.labels.download_cached_labels, not under /files
+    """
+    cache_dir = frappe.get_site_path('private', 'files', 'label_creator', 'cache')
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
+def normalize_items(labels_data):
+    """
+    Reduce items to what affects the rendered PDF, in print order:
+    prices compare as numbers and zero-quantity rows are dropped.
+    """
+    items = []
+    for item in labels_data:
+        quantity = int(item['quantity'])
+        if quantity > 0:
+            items.append([str(item['sku']), str(item['product']), float(item['display_price']), quantity])
+    return items
+
+
+def pdf_cache_key(label_type, config, labels_data, use_forms=True, output_format="pdf", dpi=None, bitmap_mode=None,
+                  pdf_profile="standard"):
+    """
+    Content hash of a label job: Label Type name and `modified` timestamp,
+    currency formatting, rendering options (output format, PDF profile, printer
+    DPI, bitmap mode) and the normalized item list.
+    """
+    modified = frappe.db.get_value("Label Type", label_type, "modified")
+    payload = {
+        "version": CACHE_VERSION,
+        "label_type": label_type,
+        "modified": str(modified),
+        "currency": get_currency_info(config.get('currency', 'CAD')),
+        "use_forms": bool(use_forms),
+        "output_format": output_format,
+        "pdf_profile": pdf_profile,
+        "dpi": dpi,
+        "bitmap_mode": bitmap_mode,
+        "items": normalize_items(labels_data)
+    }
+    data = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def get_cached_pdf_path(key, extension="pdf"):
+    return os.path.join(get_pdf_cache_dir(), f"{key}.{extension}")
+
+
+def get_cached_pdf(key, extension="pdf"):
+    """Return the path of a cached PDF, or None on a miss. Hits refresh the file's age."""
+    path = get_cached_pdf_path(key, extension)
+    try:
+        os.utime(path)
+    except OSError:
+        return None
+    return path
+
+
+def store_pdf(key, write, extension="pdf"):
+    """
+    Create the cached PDF for key by calling write(path) on a temporary file
+    and moving it into place, so readers never see a partial PDF.
+    """
+    path = get_cached_pdf_path(key, extension)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    prune_pdf_cache()
+    return path
+
+
+def prune_pdf_cache():
+    """
+    Evict cached PDFs older than the age limit, then the least recently used
+    ones until the directory fits the size limit. Also runs hourly from scheduler_events.
+    """
+    # The cache used to live in public files, where anyone with the hash could fetch it
+    shutil.rmtree(frappe.get_site_path('public', 'files', 'label_creator', 'cache'), ignore_errors=True)
+
+    max_size = int(frappe.conf.get("label_creator_pdf_cache_max_mb") or DEFAULT_MAX_SIZE_MB) * 1024 * 1024
+    max_age = float(frappe.conf.get("label_creator_pdf_cache_max_age_hours") or DEFAULT_MAX_AGE_HOURS) * 3600
+    cutoff = time.time() - max_age
+
+    entries = []
+    for entry in os.scandir(get_pdf_cache_dir()):
+        if not entry.name.endswith(CACHED_EXTENSIONS):
+            continue
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    entries.sort()
+    total = sum(size for _mtime, size, _path in entries)
+    for mtime, size, path in entries:
+        if mtime >= cutoff and total <= max_size:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
@@ -0,0 +1,49 @@
+import threading
+
+from reportlab.pdfbase import pdfmetrics
+
+_lock = threading.Lock()
+_width_tables = {}  # font name -> {char: glyph width in 1/1000 em}, or None if not tabulable
+
+
+def get_width_table(font_name):
+    """
+    Return the per-character glyph width table of a Type 1 font, filled lazily.
+    TrueType and other fonts return None and are measured by ReportLab directly.
+    """
+    table = _width_tables.get(font_name, False)
+    if table is False:
+        font = pdfmetrics.getFont(font_name)
+        table = {} if isinstance(font, pdfmetrics.Font) and not getattr(font, "_dynamicFont", 0) else None
+        with _lock:
+            table = _width_tables.setdefault(font_name, table)
+    return table
+
+
+def _char_width(table, char, font_name):
+    width = table.get(char)
+    if width is None:
+        # Type 1 widths are integer font units, so the per-character sum is exact
+        width = round(pdfmetrics.stringWidth(char, font_name, 1000))
+        table[char] = width
+    return width
+
+
+def text_width_units(text, font_name):
+    """Width of text in 1/1000 em, or None when the font has no width table"""
+    table = get_width_table(font_name)
+    if table is None:
+        return None
+    return sum(table[char] if char in table else _char_width(table, char, font_name) for char in text)
+
+
+def text_width(text, font_name, font_size):
+    """
+    Width of text in points, equal to pdfmetrics.stringWidth but measured from the
+    cached per-font table in O(len(text)) without re-encoding the string.
+    """
+    units = text_width_units(text, font_name)
+    if units is None:
+        return pdfmetrics.stringWidth(text, font_name, font_size)
+    # Same expression (and rounding) as ReportLab's instanceStringWidthT1
+    return units * 0.001 * font_size